@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# bench_compression.py
+"""On-disk size and decode cost of compressed file-note bodies"""
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source"))
+from storage_engine import CODECS, compress_body, decode_body  # noqa: E402
+
+
+def synthetic_log(size, seed):
+    """Log-like text: repetitive structure, varying numbers"""
+    rng = random.Random(seed)
+    levels = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+    lines = []
+    total = 0
+    while total < size:
+        line = (f"2024-03-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                f"{rng.randint(0, 59):02d} {rng.choice(levels):5} worker-{rng.randint(1, 16)} "
+                f"request id={rng.getrandbits(48):012x} took {rng.randint(1, 900)}ms\n")
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)[:size]
+
+
+def synthetic_sql(size, seed):
+    """SQL-dump-like text: INSERT rows with mixed values"""
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "omega", "sigma", "kappa"]
+    lines = []
+    total = 0
+    while total < size:
+        line = (f"INSERT INTO events VALUES ({rng.randint(1, 10**6)}, '{rng.choice(words)}', "
+                f"'{rng.choice(words)} {rng.choice(words)}', {rng.random():.6f});\n")
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)[:size]
+
+
+def timed(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-kb", type=int, default=1024, help="size of each body")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = args.size_kb * 1024
+    bodies = {"log": synthetic_log(size, 1), "sql": synthetic_sql(size, 2)}
+
+    print(f"{'body':6} {'codec':6} {'on disk':>10} {'ratio':>7} {'encode':>10} {'decode':>10} {'decode MB/s':>12}")
+    for name, body in bodies.items():
+        plain = len(json.dumps(body))
+        print(f"{name:6} {'none':6} {plain / 1024:8.0f} KB {1.0:6.1f}x")
+        for codec in CODECS:
+            value = compress_body(body, codec)
+            stored = len(json.dumps(value))
+            encode = timed(args.repeat, compress_body, body, codec)
+            decode = timed(args.repeat, decode_body, value)
+            print(f"{name:6} {codec:6} {stored / 1024:8.0f} KB {plain / stored:6.1f}x "
+                  f"{encode * 1000:7.1f} ms {decode * 1000:7.1f} ms {size / decode / 2**20:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
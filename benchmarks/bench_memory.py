@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# bench_memory.py
+"""Bytes per note for a synthetic notebook, dict-based vs slotted items"""
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import gc
+import json
+import uuid
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source"))
+from terminal_notes_core import Notebook  # noqa: E402
+
+EXTENSIONS = ["py", "md", "txt", "json", "sh", None, None, None]
+EDITORS = ["internal", "vim"]
+
+
+class LegacyNote:
+    """The pre-slots Note layout: a __dict__ and two datetimes per note"""
+
+    def __init__(self, data):
+        self.id = data["id"]
+        self.title = data["title"]
+        self.content = ""
+        self.created = datetime.fromisoformat(data["created"])
+        self.updated = datetime.fromisoformat(data["updated"])
+        self.created_with = data.get("created_with", "internal")
+        self.file_extension = data.get("file_extension")
+
+
+class LegacyNotebook:
+    def __init__(self, data):
+        self.id = data["id"]
+        self.name = data["name"]
+        self.parent_id = data["parent_id"]
+        self.notes = [LegacyNote(note_data) for note_data in data["notes"]]
+        self.subnotebooks = [LegacyNotebook(nb_data) for nb_data in data["subnotebooks"]]
+        self.custom_path = data.get("custom_path")
+
+
+def synthetic_structure(note_count, per_subnotebook):
+    """A root notebook whose notes are spread over subnotebooks"""
+    start = datetime(2024, 1, 1)
+    root = {"id": str(uuid.uuid4()), "name": "Synthetic", "parent_id": None,
+            "notes": [], "subnotebooks": []}
+    for first in range(0, note_count, per_subnotebook):
+        sub = {"id": str(uuid.uuid4()), "name": f"Sub {first // per_subnotebook}",
+               "parent_id": root["id"], "notes": [], "subnotebooks": []}
+        for i in range(first, min(first + per_subnotebook, note_count)):
+            stamp = start + timedelta(seconds=i * 37, microseconds=i)
+            note = {
+                "id": str(uuid.uuid4()),
+                "title": f"Note {i}",
+                "created": stamp.isoformat(),
+                "updated": (stamp + timedelta(hours=1)).isoformat(),
+                "created_with": EDITORS[i % len(EDITORS)],
+            }
+            extension = EXTENSIONS[i % len(EXTENSIONS)]
+            if extension:
+                note["file_extension"] = extension
+            sub["notes"].append(note)
+        root["subnotebooks"].append(sub)
+    return root
+
+
+def measure(build, payload):
+    """Bytes held by the objects build() creates from a freshly parsed payload"""
+    data = json.loads(payload)  # fresh strings, like a real load
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    notebook = build(data)
+    del data
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del notebook
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=100_000)
+    parser.add_argument("--per-subnotebook", type=int, default=1000)
+    args = parser.parse_args()
+
+    payload = json.dumps(synthetic_structure(args.notes, args.per_subnotebook))
+    legacy = measure(LegacyNotebook, payload)
+    slotted = measure(Notebook.from_dict, payload)
+
+    print(f"notes:              {args.notes}")
+    print(f"dict + datetimes:   {legacy / args.notes:8.1f} bytes/note")
+    print(f"slots + epoch ints: {slotted / args.notes:8.1f} bytes/note")
+    print(f"saved:              {(1 - slotted / legacy) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
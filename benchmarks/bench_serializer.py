@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# bench_serializer.py
+"""Size and encode time of the three-file schema per JSON format"""
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source"))
+import serializer  # noqa: E402
+from serializer import FORMAT_COMPACT, FORMAT_PRETTY, JsonSerializer  # noqa: E402
+from bench_memory import synthetic_structure  # noqa: E402
+
+LINE = "    result = compute(value, *args, **kwargs)  # keep the indentation\n"
+
+
+def synthetic_contents(structure, lines_per_file):
+    """note id -> body for every note in structure"""
+    contents = {}
+    stack = [structure]
+    while stack:
+        notebook_data = stack.pop()
+        for note_data in notebook_data["notes"]:
+            contents[note_data["id"]] = LINE * lines_per_file
+        stack.extend(notebook_data["subnotebooks"])
+    return contents
+
+
+def encode_all(codec, structure, contents):
+    entries = []
+    for note_id, body in contents.items():
+        entries.append((note_id, codec.dump_value(body), len(body)))
+    data, _ = codec.encode_content_map(entries)
+    return len(codec.dumps(structure)) + len(data)
+
+
+def best_of(repeat, func, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=20_000)
+    parser.add_argument("--lines", type=int, default=20, help="lines per note body")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    structure = synthetic_structure(args.notes, 1000)
+    contents = synthetic_contents(structure, args.lines)
+
+    # What every save did before: json.dumps(indent=2) for all three files
+    legacy_time, legacy_size = best_of(
+        args.repeat,
+        lambda: len(json.dumps(structure, indent=2)) + len(json.dumps(contents, indent=2)),
+    )
+    print(f"notes: {args.notes}, {args.lines} lines each")
+    print(f"{'json indent=2 (legacy)':28} {legacy_size / 1e6:8.2f} MB {legacy_time * 1000:9.1f} ms")
+
+    backends = [("stdlib", None)]
+    if serializer.orjson is not None:
+        backends.append(("orjson", serializer.orjson))
+    installed = serializer.orjson
+    try:
+        for backend, module in backends:
+            serializer.orjson = module
+            # Pretty always encodes with the stdlib (byte-identical to the legacy files)
+            for json_format in (FORMAT_PRETTY, FORMAT_COMPACT) if module is None else (FORMAT_COMPACT,):
+                codec = JsonSerializer(json_format)
+                elapsed, size = best_of(args.repeat, encode_all, codec, structure, contents)
+                label = f"{backend} {json_format}"
+                print(f"{label:28} {size / 1e6:8.2f} MB {elapsed * 1000:9.1f} ms")
+    finally:
+        serializer.orjson = installed
+
+
+if __name__ == "__main__":
+    main()
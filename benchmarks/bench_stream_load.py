@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_stream_load.py
+"""Peak RSS loading big content maps, one-shot parse vs streaming"""
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import uuid
+import argparse
+import resource
+import tempfile
+import subprocess
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source")
+BODY_LINE = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod.\n"
+
+
+def build_notebook(folder, content_mb, body_kb, keep):
+    """A notebook whose notes.json is content_mb big; only `keep` of its ids are in structure.json"""
+    body = (BODY_LINE * (body_kb * 1024 // len(BODY_LINE) + 1))[:body_kb * 1024]
+    count = max(1, content_mb * 1024 // body_kb)
+    kept = int(count * keep)
+    root = {"id": str(uuid.uuid4()), "name": "Big", "parent_id": None, "notes": [], "subnotebooks": []}
+    with open(os.path.join(folder, "notes.json"), "w", encoding="utf-8") as f:
+        f.write("{")
+        for i in range(count):
+            note_id = str(uuid.uuid4())
+            if i < kept:
+                root["notes"].append({
+                    "id": note_id, "title": f"Note {i}",
+                    "created": "2024-01-01T00:00:00", "updated": "2024-01-01T00:00:00",
+                })
+            f.write(("," if i else "") + "\n  " + json.dumps(note_id) + ": " + json.dumps(body))
+        f.write("\n}")
+    with open(os.path.join(folder, "structure.json"), "w", encoding="utf-8") as f:
+        json.dump(root, f)
+    with open(os.path.join(folder, "files.json"), "w", encoding="utf-8") as f:
+        f.write("{}")
+    return kept * len(body)
+
+
+def child(mode, folder):
+    """Load folder in this (fresh) process and print baseline and peak RSS in KB"""
+    sys.path.insert(0, SOURCE_DIR)
+    import terminal_notes_core
+    from terminal_notes_core import NoteManager
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_stream_cwd_") as workdir:
+        os.chdir(workdir)  # NoteManager keeps its registry under the cwd
+        manager = NoteManager(verbose=False)
+        terminal_notes_core.STREAM_THRESHOLD = 0 if mode == "stream" else float("inf")
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        notebook = manager.load_notebook_from_path(folder)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        assert notebook.notes and notebook.notes[0].content
+        manager.close()
+        os.chdir(cwd)  # leave workdir so it can be removed
+    print(baseline, peak)
+
+
+def measure(mode, folder):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, folder],
+        capture_output=True, text=True, check=True
+    ).stdout
+    baseline, peak = map(int, output.split())
+    return (peak - baseline) / 1024  # ru_maxrss is in KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000", help="notes.json sizes in MB")
+    parser.add_argument("--body-kb", type=int, default=64, help="size of each note body")
+    parser.add_argument("--keep", type=float, default=1.0,
+                        help="fraction of ids the structure knows (the rest are skipped)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FOLDER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'notes.json':>10} {'retained':>10} {'one-shot':>12} {'streaming':>12}  (peak RSS growth)")
+    for size in (int(value) for value in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory(prefix="bench_stream_") as folder:
+            retained = build_notebook(folder, size, args.body_kb, args.keep)
+            one_shot = measure("json", folder)
+            streaming = measure("stream", folder)
+        print(f"{size:>7} MB {retained / 2**20:>7.0f} MB {one_shot:>9.0f} MB {streaming:>9.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
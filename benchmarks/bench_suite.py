@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# bench_suite.py
+"""Hot paths on a synthetic corpus: load, save, search, timeline, resurrection"""
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source"))
+import serializer  # noqa: E402
+from terminal_notes_core import Note, Notebook, NoteManager  # noqa: E402
+from comprehensive_search import ComprehensiveSearch  # noqa: E402
+from git_resurrection import GitHistoryMiner  # noqa: E402
+from timeline_engine import TimelineEngine  # noqa: E402
+
+EXTENSIONS = ["py", "md", "txt", "json", "sh", None, None, None]
+WORDS = ["alpha", "beta", "gamma", "delta", "kappa", "sigma", "omega", "lorem", "ipsum", "dolor"]
+MARKER = "needle"  # one note in MARKER_EVERY contains it; searches look for it
+MARKER_EVERY = 50
+# Baseline comparisons: fewer runs than this and the best time is mostly scheduler noise
+MIN_COMPARE_REPEAT = 5
+
+
+class Corpus:
+    """A notebook collection in a scratch directory, built through NoteManager
+    so folders, registry and git history look exactly like real ones"""
+
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random(config["seed"])
+        self.workdir = tempfile.mkdtemp(prefix="bench_suite_")
+        self.edited = []  # (note id, root id) most edited first
+        self.deleted_titles = []
+
+    def body(self, index):
+        size = self.body_size()
+        words = []
+        length = 0
+        while length < size:
+            word = self.rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        if index % MARKER_EVERY == 0:
+            words.insert(len(words) // 2, MARKER)
+        return " ".join(words)[:max(size, len(MARKER) + 2)]
+
+    def body_size(self):
+        mean = self.config["content_size"]
+        distribution = self.config["content_dist"]
+        if distribution == "fixed":
+            return mean
+        if distribution == "uniform":
+            return self.rng.randint(1, 2 * mean)
+        # lognormal: many small notes, a long tail of big ones, same mean
+        sigma = 1.0
+        return max(1, int(self.rng.lognormvariate(0, sigma) * mean / 1.6487))  # e^(sigma^2/2)
+
+    def build(self):
+        os.chdir(self.workdir)  # NoteManager keeps notebooks_root under the cwd
+        manager = NoteManager(verbose=False)
+        counter = 0
+        for n in range(self.config["notebooks"]):
+            root = manager.create_notebook(f"Bench {n}")
+            with manager.transaction(root, "synthetic corpus"):
+                stack = [(root, 0)]
+                while stack:
+                    notebook, depth = stack.pop()
+                    for _ in range(self.config["notes"]):
+                        note = Note(f"Note {counter}", self.body(counter), created_with="internal")
+                        note.file_extension = EXTENSIONS[counter % len(EXTENSIONS)]
+                        manager.add_note(notebook, note)
+                        counter += 1
+                    if depth < self.config["depth"]:
+                        for f in range(self.config["fanout"]):
+                            child = Notebook(f"{notebook.name}.{f}", parent_id=notebook.id)
+                            manager.add_subnotebook(notebook, child)
+                            stack.append((child, depth + 1))
+        self.note_count = counter
+        self.add_history(manager)
+        manager.close()
+
+    def add_history(self, manager):
+        """config["commits"] single-change commits per root: mostly edits, some deletes"""
+        for root in manager.notebooks:
+            git_manager = manager.get_git_manager(root)
+            notes = [(note, parent) for note, parent in self.walk(root)]
+            hot = notes[:max(1, len(notes) // 20)]  # a few notes collect most edits
+            for i in range(self.config["commits"]):
+                if i % 5 == 4 and len(notes) > len(hot) + 1:
+                    note, parent = notes.pop()
+                    manager.remove_note(parent, note)
+                    manager.save_notebook(root)
+                    git_manager.commit_note_deletion(note.id, note.title, root.name, note.is_file_note)
+                    self.deleted_titles.append(note.title)
+                    continue
+                note, _ = hot[i % len(hot)] if i % 2 == 0 else self.rng.choice(notes)
+                old = note.content
+                manager.update_note_content(note, old + f"\nedit {i} {self.rng.choice(WORDS)}")
+                manager.save_notebook(root)
+                git_manager.commit_note_edit(note.id, note.title, root.name, old, note.content)
+            self.edited.append((hot[0][0].id, root.id))
+
+    def walk(self, notebook):
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            for note in current.notes:
+                yield note, current
+            stack.extend(current.subnotebooks)
+
+    def remove(self):
+        os.chdir(tempfile.gettempdir())
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def timed(repeat, func, setup=None):
+    """Seconds per run; setup() runs untimed before each run and feeds func"""
+    runs = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        runs.append(time.perf_counter() - start)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": len(runs)}
+
+
+def run_benchmarks(corpus, repeat):
+    results = {}
+
+    def cold_manager():
+        manager = NoteManager(verbose=False, autoload=False)
+        if os.path.exists(manager.snapshot.path):
+            os.remove(manager.snapshot.path)  # every notebook is parsed from JSON
+        return manager
+
+    results["load_all_notebooks (json)"] = timed(repeat, lambda m: m.load_all_notebooks(), cold_manager)
+
+    warm = NoteManager(verbose=False)
+    warm.close()  # leaves a snapshot behind
+    results["load_all_notebooks (snapshot)"] = timed(
+        repeat, lambda m: m.load_all_notebooks(), lambda: NoteManager(verbose=False, autoload=False)
+    )
+
+    manager = NoteManager(verbose=False)
+    root = max(manager.notebooks, key=lambda nb: nb.get_total_note_count())
+
+    def dirty_everything():
+        manager.mark_dirty(root, "structure", "notes", "files")
+        return root
+
+    def edit_one():
+        note = root.notes[0]
+        manager.update_note_content(note, note.content + ".")
+        return root
+
+    results["save_notebook (full)"] = timed(repeat, manager.save_notebook, dirty_everything)
+    results["save_notebook (one edit)"] = timed(repeat, manager.save_notebook, edit_one)
+
+    search = ComprehensiveSearch(manager, None)
+    results["ComprehensiveSearch.search"] = timed(repeat, lambda _: search.search(MARKER))
+    search.history_miner.cleanup_temp_files()
+
+    timeline = TimelineEngine(manager)
+    note_id, root_id = corpus.edited[0]
+
+    def item_timeline(_):
+        timeline.get_item_timeline(note_id, root_id)
+        timeline.cleanup()
+
+    results["TimelineEngine.get_item_timeline"] = timed(repeat, item_timeline)
+
+    miner = GitHistoryMiner(manager)
+    query = corpus.deleted_titles[0] if corpus.deleted_titles else MARKER
+
+    def deleted_items(_):
+        miner.find_deleted_items(query)
+        miner.cleanup_temp_files()
+
+    results["GitHistoryMiner.find_deleted_items"] = timed(repeat, deleted_items)
+    manager.close()
+    return results
+
+
+def compare(config, results, baseline, threshold, min_delta):
+    """Print best time vs baseline per benchmark; return the names that regressed.
+
+    Best-of-N is the least noisy statistic for a deterministic workload, and a
+    regression must also be min_delta seconds slower, so a 1ms step that
+    jitters by 0.4ms cannot fail the run on its own.
+    """
+    regressions = []
+    print(f"\n{'benchmark':38} {'baseline':>10} {'now':>10} {'change':>8}  (best of each run)")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:38} {'-':>10} {result['best'] * 1000:8.1f}ms {'new':>8}")
+            continue
+        change = result["best"] / before["best"] - 1 if before["best"] else 0.0
+        flag = ""
+        if change > threshold and result["best"] - before["best"] > min_delta:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:38} {before['best'] * 1000:8.1f}ms {result['best'] * 1000:8.1f}ms "
+              f"{change:+7.0%}{flag}")
+    if baseline.get("config") != config:
+        print("\nwarning: baseline was recorded with a different corpus configuration")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notebooks", type=int, default=3, help="root notebooks")
+    parser.add_argument("--depth", type=int, default=2, help="subnotebook levels under each root")
+    parser.add_argument("--fanout", type=int, default=3, help="subnotebooks per notebook")
+    parser.add_argument("--notes", type=int, default=20, help="notes per notebook (every level)")
+    parser.add_argument("--content-size", type=int, default=2048, help="mean note body size in bytes")
+    parser.add_argument("--content-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--commits", type=int, default=100, help="history commits per root notebook")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of the best time before it counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=5.0,
+                        help="a regression must also be this many ms slower (noise floor)")
+    args = parser.parse_args()
+    if args.baseline and args.repeat < MIN_COMPARE_REPEAT:
+        print(f"--baseline: raising --repeat {args.repeat} to {MIN_COMPARE_REPEAT}", file=sys.stderr)
+        args.repeat = MIN_COMPARE_REPEAT
+
+    config = {
+        "notebooks": args.notebooks, "depth": args.depth, "fanout": args.fanout,
+        "notes": args.notes, "content_size": args.content_size, "content_dist": args.content_dist,
+        "commits": args.commits, "seed": args.seed,
+    }
+
+    # Synthetic history needs an author even where git has no identity configured
+    for variable, value in (("GIT_AUTHOR_NAME", "bench"), ("GIT_AUTHOR_EMAIL", "bench@localhost"),
+                            ("GIT_COMMITTER_NAME", "bench"), ("GIT_COMMITTER_EMAIL", "bench@localhost")):
+        os.environ.setdefault(variable, value)
+
+    cwd = os.getcwd()
+    corpus = Corpus(config)
+    try:
+        start = time.perf_counter()
+        corpus.build()
+        build_time = time.perf_counter() - start
+        results = run_benchmarks(corpus, args.repeat)
+    finally:
+        corpus.remove()
+        os.chdir(cwd)
+
+    report = {
+        "config": config,
+        "corpus": {"notes": corpus.note_count, "deleted": len(corpus.deleted_titles),
+                   "build_seconds": round(build_time, 2)},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "orjson": serializer.orjson is not None},
+        "results": results,
+    }
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(config, results, baseline, args.threshold, args.min_delta / 1000)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} and {args.min_delta:g}ms: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# blob_store.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import hashlib
+import argparse
+
+# Storage layouts a root notebook can use (recorded as "storage" in structure.json)
+LAYOUT_JSON = "json"  # notes.json / files.json hold every body
+LAYOUT_BLOBS = "blobs"  # one file per body under blobs/, named by its SHA-256
+
+BLOBS_DIR = "blobs"
+
+
+def blob_relpath(digest):
+    """blobs/ab/cdef... - the path git and the working tree both use"""
+    return f"{BLOBS_DIR}/{digest[:2]}/{digest[2:]}"
+
+
+class BlobStore:
+    """Content-addressed note bodies for one notebook folder.
+
+    Identical bodies share one file, across notes and across commits, so an
+    edit only adds the blob for the note that changed.
+    """
+
+    def __init__(self, folder_path, writer):
+        self.folder_path = folder_path
+        self.writer = writer
+
+    def path_for(self, digest):
+        return os.path.join(self.folder_path, *blob_relpath(digest).split("/"))
+
+    def put(self, text):
+        """Store text (if new) and return its digest"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.writer.write(path, data)
+        return digest
+
+    def get(self, digest):
+        with open(self.path_for(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def collect_garbage(self, live_digests):
+        """Delete blobs no note references any more (git history keeps them)"""
+        blobs_root = os.path.join(self.folder_path, BLOBS_DIR)
+        removed = 0
+        if not os.path.isdir(blobs_root):
+            return removed
+        for prefix in os.listdir(blobs_root):
+            prefix_dir = os.path.join(blobs_root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith(".tmp") or prefix + name in live_digests:
+                    continue
+                os.remove(os.path.join(prefix_dir, name))
+                removed += 1
+            if not os.listdir(prefix_dir):
+                os.rmdir(prefix_dir)
+        if not os.listdir(blobs_root):
+            os.rmdir(blobs_root)  # nothing left (migrated back to JSON)
+        return removed
+
+
+class BlobContent:
+    """Lazy reference to a blob, read the first time Note.content is used"""
+
+    __slots__ = ("store", "digest", "cache")
+
+    def __init__(self, store, digest, cache):
+        self.store = store
+        self.digest = digest
+        self.cache = cache
+
+    def read(self):
+        text = self.cache.get(self)
+        if text is None:
+            text = self.store.get(self.digest)
+            self.cache.put(self, text)
+        return text
+
+    def read_raw(self):
+        return json.dumps(self.read()).encode("utf-8")
+
+    def size(self):
+        return os.path.getsize(self.store.path_for(self.digest))
+
+
+def content_map_from_blobs(structure_data, filename, read_blob):
+    """Rebuild what notes.json / files.json would hold for a blob layout structure.
+
+    read_blob(relpath) returns the text of one blob (e.g. via git show) or None.
+    Returns None when the structure does not use the blob layout.
+    """
+    if not structure_data or structure_data.get("storage") != LAYOUT_BLOBS:
+        return None
+
+    want_file_notes = filename == "files.json"
+    content_map = {}
+    stack = [structure_data]
+    while stack:
+        notebook_data = stack.pop()
+        for note_data in notebook_data.get("notes", []):
+            digest = note_data.get("blob")
+            if not digest:
+                continue
+            if (note_data.get("file_extension") is not None) != want_file_notes:
+                continue
+            text = read_blob(blob_relpath(digest))
+            if text is not None:
+                content_map[note_data["id"]] = text
+        stack.extend(notebook_data.get("subnotebooks", []))
+    return content_map
+
+
+def main(argv=None):
+    """python blob_store.py migrate "<notebook name>" [--to blobs|json]"""
+    from terminal_notes_core import NoteManager
+
+    parser = argparse.ArgumentParser(description="Terminal Notes storage layout tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="Switch a notebook's storage layout")
+    migrate.add_argument("notebook", help="Root notebook name")
+    migrate.add_argument("--to", choices=[LAYOUT_BLOBS, LAYOUT_JSON], default=LAYOUT_BLOBS)
+    args = parser.parse_args(argv)
+
+    manager = NoteManager()
+    notebook = next((nb for nb in manager.notebooks if nb.name == args.notebook), None)
+    if notebook is None:
+        print(f"Error: No notebook named '{args.notebook}'")
+        return 1
+
+    previous = notebook.storage
+    if not manager.migrate_notebook_storage(notebook, args.to):
+        print(f"'{notebook.name}' already uses the {args.to} layout")
+        return 0
+
+    git_manager = manager.get_git_manager(notebook)
+    git_manager.commit_storage_migration(notebook.id, notebook.name, previous, args.to)
+    manager.close()
+    print(f"Migrated '{notebook.name}': {previous} -> {args.to}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
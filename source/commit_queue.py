@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# commit_queue.py
+import sys
+
+sys.dont_write_bytecode = True
+import time
+import atexit
+import threading
+from collections import deque
+
+COMMIT_RETRIES = 6  # attempts per commit before it is dropped
+RETRY_DELAY = 0.05  # seconds before the first retry, doubled after each
+DRAIN_TIMEOUT = 30.0  # seconds close() waits for the queue to empty
+
+
+class CommitQueue:
+    """Commits of one notebook repo, applied in order by a background thread.
+
+    commit_silently() stores the changed files as git blobs and puts
+    (message, snapshot of blob ids) here instead of committing, so a save
+    returns once one hash-object has run. The worker commits the snapshots
+    one by one, in order (see GitManager.commit_snapshot for the locking).
+    A failed commit (a hook, the folder lock busy for LOCK_TIMEOUT...) is
+    retried with backoff; after COMMIT_RETRIES attempts it is dropped,
+    reported on stderr and counted in failed(). Its changes still reach git
+    with the next commit, since every snapshot names the whole files.
+    close() drains the queue.
+    """
+
+    def __init__(self, git_manager):
+        self.git_manager = git_manager
+        self._items = deque()
+        self._pending = 0  # queued + the one being committed
+        self._failed = 0  # dropped after COMMIT_RETRIES attempts
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+        _queues.add(self)
+
+    def put(self, message, snapshot):
+        with self._condition:
+            self._items.append((message, snapshot))
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="commit-queue", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def pending(self):
+        return self._pending
+
+    def failed(self):
+        return self._failed
+
+    def drain(self, timeout=DRAIN_TIMEOUT):
+        """Wait until every queued commit is applied; False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self):
+        """Drain, then stop the worker"""
+        self.drain()
+        with self._condition:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout=DRAIN_TIMEOUT)
+        _queues.discard(self)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._items and not self._closed:
+                    self._condition.wait()
+                if not self._items:
+                    return
+                message, snapshot = self._items.popleft()
+            try:
+                self._apply(message, snapshot)
+            finally:
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify_all()
+
+    def _apply(self, message, snapshot):
+        delay = RETRY_DELAY
+        error = "git failed"
+        for attempt in range(COMMIT_RETRIES):
+            try:
+                if self.git_manager.commit_snapshot(message, snapshot) is not None:
+                    return  # committed, or nothing to commit
+            except Exception as e:
+                error = e  # LockTimeout, a vanished folder... same as a failed commit
+            if attempt + 1 < COMMIT_RETRIES:
+                time.sleep(delay)
+                delay *= 2
+        with self._condition:
+            self._failed += 1
+        subject = message.split("\n", 1)[0]
+        print(
+            f"Warning: git commit dropped after {COMMIT_RETRIES} attempts "
+            f"({self.git_manager.notebook_path.name}: {subject}): {error}",
+            file=sys.stderr,
+        )
+
+
+_queues = set()
+
+
+def drain_commit_queues():
+    for commit_queue in list(_queues):
+        commit_queue.drain()
+
+
+atexit.register(drain_commit_queues)
@@ -10,6 +10,7 @@ import re
 from search_system import SimpleSearch
 from git_resurrection import GitHistoryMiner
 from timeline_engine import TimelineEngine
+from instrumentation import timed
 
 class ComprehensiveSearch:
     def __init__(self, note_manager, ui_methods):
@@ -23,6 +24,7 @@ class ComprehensiveSearch:
         self.current_page = 0
         self.search_nav_stack = []
 
+    @timed("search.comprehensive")
     def search(self, query):
         self.query = query
         self.results = []
@@ -596,13 +598,13 @@ class ComprehensiveSearch:
                     note = notebook.notes[idx]
                     confirm = self.ui.get_input(f"Delete note '{note.title}'? [y/N]: ")
                     if confirm.lower() == "y":
-                        notebook.notes.remove(note)
+                        self.manager.remove_note(notebook, note)
                         self.manager.save_data()
                     
                         # Git commit for deletion
                         try:
                             root_notebook = self.manager._find_root_notebook(notebook)
-                            git_manager = self.manager.get_git_manager(root_notebook.name)
+                            git_manager = self.manager.get_git_manager(root_notebook)
                             git_manager.commit_note_deletion(note.id, note.title, root_notebook.name, note.is_file_note)
                         except Exception:
                             pass
@@ -722,14 +724,13 @@ class ComprehensiveSearch:
                     new_content = self.ui.external_editor(note.content)
                 
                 if new_content is not None and new_content != original_content:
-                    note.content = new_content
-                    note.updated = datetime.now()
+                    self.manager.update_note_content(note, new_content)
                     self.manager.save_data()
                     
                     # Git commit for edit
                     try:
                         root_notebook = self.manager._find_root_notebook(notebook)
-                        git_manager = self.manager.get_git_manager(root_notebook.name)
+                        git_manager = self.manager.get_git_manager(root_notebook)
                         git_manager.commit_note_edit(note.id, note.title, root_notebook.name, original_content, new_content)
                     except Exception:
                         pass
@@ -1097,7 +1098,7 @@ class ComprehensiveSearch:
         
                     # Search for the notebook in manager
                     for nb in self.manager.notebooks:
-                        nb_path = self.manager.get_notebook_folder_path(nb.name)
+                        nb_path = self.manager.get_notebook_folder_path(nb)
                         if nb_path == notebook_path or nb.name == notebook_name:
                             notebook = nb
                             break
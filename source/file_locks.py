@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# file_locks.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, locks only guard threads of this process
+    fcntl = None
+
+LOCK_TIMEOUT = 10.0  # seconds to wait for another instance before giving up
+LOCK_POLL = 0.05
+
+FOLDER_LOCK_FILE = ".notebook.lock"
+
+
+class LockTimeout(TimeoutError):
+    """Another Terminal Notes instance held a lock for longer than LOCK_TIMEOUT"""
+
+
+class LockUpgradeError(RuntimeError):
+    """exclusive() was requested while this thread holds the lock shared"""
+
+
+class FileLock:
+    """Advisory flock() on one lock file, shared between Terminal Notes processes.
+
+    Shared holders may read together; an exclusive holder is alone. Inside one
+    process the lock is re-entrant and owned by one thread at a time, so nested
+    save -> compact -> commit calls never wait on themselves. Asking for shared
+    inside exclusive is fine. Asking for exclusive inside shared raises
+    LockUpgradeError: flock() converts by dropping the old lock first, so a
+    failed upgrade would leave the caller unprotected. Take exclusive up front.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        with self._held(exclusive=False):
+            yield self
+
+    @contextmanager
+    def exclusive(self):
+        with self._held(exclusive=True):
+            yield self
+
+    @contextmanager
+    def _held(self, exclusive):
+        deadline = time.monotonic() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise LockTimeout(f"Timed out waiting for {self.path} (busy in this process)")
+        try:
+            if self._depth and exclusive and not self._exclusive:
+                raise LockUpgradeError(f"{self.path} is held shared; take it exclusive from the start")
+            if self._depth == 0:
+                try:
+                    self._flock(exclusive, deadline)
+                except LockTimeout:
+                    self._unlock()
+                    raise
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._unlock()
+        finally:
+            self._thread_lock.release()
+
+    def _flock(self, exclusive, deadline):
+        if fcntl is not None:
+            if self._fd is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            operation = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB
+            while True:
+                try:
+                    fcntl.flock(self._fd, operation)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise LockTimeout(
+                            f"{os.path.dirname(os.path.abspath(self.path))} is locked by another "
+                            f"Terminal Notes instance (waited {self.timeout:g}s)"
+                        ) from None
+                    time.sleep(LOCK_POLL)
+        self._exclusive = exclusive
+
+    def _unlock(self):
+        if self._fd is not None:  # closing the descriptor drops the flock
+            os.close(self._fd)
+            self._fd = None
+        self._exclusive = False
+
+
+def folder_lock(folder_path, timeout=LOCK_TIMEOUT):
+    """The lock guarding one notebook folder's files and git repository"""
+    return FileLock(os.path.join(folder_path, FOLDER_LOCK_FILE), timeout)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# git_fast_import.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import time
+import shutil
+import hashlib
+import subprocess
+
+STREAM_STOP_TIMEOUT = 5.0
+COPY_CHUNK = 1024 * 1024  # files are hashed and streamed in pieces this big
+
+
+def git_blob_id(data):
+    """The id git gives a blob holding data (what `git hash-object` prints)"""
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def git_file_blob_id(path):
+    """git_blob_id of a file's contents, read a chunk at a time"""
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(b"blob %d\0" % os.fstat(f.fileno()).st_size)
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git_timestamp():
+    """"<epoch> <+hhmm>" in local time, the raw date format fast-import reads"""
+    now = time.time()
+    offset = time.localtime(now).tm_gmtoff // 60
+    sign = "+" if offset >= 0 else "-"
+    return f"{int(now)} {sign}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+
+
+class FastImportStream:
+    """A long-lived `git fast-import` that turns file snapshots into commits.
+
+    Each commit is written to the stream, followed by `checkpoint` (refs are
+    updated, small packs are unpacked to loose objects as usual) and
+    `get-mark`, whose answer is the new commit id. That answer is the only
+    round trip. No hooks run and the index is not touched.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._process = None
+        self._mark = 0
+
+    def ls(self, commit, paths):
+        """path -> blob (or tree) id in commit's tree (None when missing)"""
+        process = self._ensure()
+        for path in paths:
+            process.stdin.write(f"ls {commit} {path}\n".encode("utf-8"))
+        process.stdin.flush()
+        found = {}
+        for path in paths:
+            line = self._readline().decode("utf-8")
+            fields = line.split("\t", 1)[0].split()
+            found[path] = fields[2] if len(fields) == 3 and fields[1] in ("blob", "tree") else None
+        return found
+
+    def commit(self, ref, parent, author, committer, message, files):
+        """Commit files on top of parent; returns the commit id.
+
+        files maps repo path -> bytes, -> a file on disk that is copied
+        into the stream in chunks (changed files only), -> the id (str) of a
+        blob already in the repository, or -> None to delete it.
+        """
+        process = self._ensure()
+        self._mark += 1
+        stamp = git_timestamp()
+        message = message.encode("utf-8")
+        stdin = process.stdin
+        stdin.write(
+            f"commit {ref}\nmark :{self._mark}\n"
+            f"author {author} {stamp}\ncommitter {committer} {stamp}\n".encode("utf-8")
+            + b"data %d\n" % len(message) + message + b"\n"
+            + f"from {parent}\n".encode("ascii")
+        )
+        for path, data in files.items():
+            if data is None:
+                stdin.write(f"D {path}\n".encode("utf-8"))
+                continue
+            if isinstance(data, str):
+                stdin.write(f"M 100644 {data} {path}\n".encode("utf-8"))
+                continue
+            stdin.write(f"M 100644 inline {path}\n".encode("utf-8"))
+            if isinstance(data, bytes):
+                stdin.write(b"data %d\n" % len(data))
+                stdin.write(data)  # no join: a big file is never copied
+            else:
+                with open(data, "rb") as f:
+                    stdin.write(b"data %d\n" % os.fstat(f.fileno()).st_size)
+                    shutil.copyfileobj(f, stdin, COPY_CHUNK)
+            stdin.write(b"\n")
+        stdin.write(f"\ncheckpoint\n\nget-mark :{self._mark}\n".encode("ascii"))
+        stdin.flush()
+        return self._readline().decode("ascii").strip()
+
+    def _ensure(self):
+        if self._process is None or self._process.poll() is not None:
+            self.close()
+            self._process = subprocess.Popen(
+                ["git", "fast-import", "--quiet"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._mark = 0
+        return self._process
+
+    def _readline(self):
+        line = self._process.stdout.readline()
+        if not line:
+            raise OSError("git fast-import exited")
+        return line
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=STREAM_STOP_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            process.stdout.close()
@@ -5,6 +5,22 @@ import uuid
 import re
 from datetime import datetime
 from pathlib import Path
+from instrumentation import command_span, span
+from git_fast_import import FastImportStream, git_blob_id, git_file_blob_id
+from file_locks import FOLDER_LOCK_FILE
+from blob_store import BLOBS_DIR, LAYOUT_BLOBS
+from serializer import load_file
+
+# TERMINAL_NOTES_FAST_COMMIT=0 goes back to `git add` + `git commit` for every change
+FAST_COMMITS = os.environ.get("TERMINAL_NOTES_FAST_COMMIT", "1") != "0"
+# journal.jsonl: a journal tail not compacted yet is part of the notebook (gone once compacted)
+COMMIT_FILES = ("structure.json", "notes.json", "files.json", ".gitignore", "journal.jsonl")
+# Derived files that live next to the JSON but never belong in history
+GITIGNORE_PATTERNS = ("*.index.json", FOLDER_LOCK_FILE, ".ingest-*.spool")
+
+# In .git while a fast-import stream may leave the index behind HEAD; a crash
+# leaves it there and the next init_repo() resyncs the index
+STALE_INDEX_MARKER = "terminal-notes-stale-index"
 
 
 class GitManager:
@@ -12,6 +28,15 @@ class GitManager:
         self.notebook_path = Path(notebook_path)
         self.repo_initialized = False
         self.current_branch = "master"
+        self.lock = None  # Optional FileLock held (exclusive) from staging to commit
+        self._deferred = None  # Commit messages held back while a transaction is open
+        self._fast_import = None  # FastImportStream, started by the first fast commit
+        self._idents = None  # (author, committer) "Name <email>", False if git has none
+        self._blob_ids = {}  # file -> ((mtime_ns, size, inode), blob id)
+        self._tree = (None, {})  # (commit id, file -> blob id) of our last commit
+        self._index_stale = False  # a fast commit could not update the index; close() resyncs it
+        self.queue = None  # Optional CommitQueue: commits are snapshotted and applied in the background
+        self.blob_layout = None  # NoteManager sets it from the root's "storage"; None: read structure.json
         self._check_git_installation()
 
     def _check_git_installation(self):
@@ -27,16 +52,18 @@ class GitManager:
             # Fail silently - Git is optional
             pass
 
-    def _run_git_command(self, command, capture_output=True):
+    def _run_git_command(self, command, capture_output=True, input=None, text=True):
         """Run Git command silently"""
         try:
-            result = subprocess.run(
-                command,
-                cwd=self.notebook_path,
-                capture_output=capture_output,
-                text=True,
-                check=True,
-            )
+            with command_span(command):
+                result = subprocess.run(
+                    command,
+                    cwd=self.notebook_path,
+                    capture_output=capture_output,
+                    text=text,
+                    check=True,
+                    input=input,
+                )
             return result
         except subprocess.CalledProcessError:
             return None
@@ -44,9 +71,10 @@ class GitManager:
     def init_repo(self, notebook_name=None, custom_path=None):
         """Initialize Git repository with smart initial commit"""
         git_dir = self.notebook_path / ".git"
+        self._ensure_gitignore()
         if not git_dir.exists():
             self._run_git_command(["git", "init"])
-            self._run_git_command(["git", "add", "structure.json", "notes.json", "files.json"])
+            self._run_git_command(["git", "add", "structure.json", "notes.json", "files.json", ".gitignore"])
         
             # 🆕 SMART INITIAL COMMIT
             if notebook_name:
@@ -63,21 +91,396 @@ class GitManager:
             
             self._run_git_command(["git", "commit", "-m", message])
             self.repo_initialized = True
+        elif (git_dir / STALE_INDEX_MARKER).exists():  # an earlier session died mid-stream
+            self._resync_index()
         self.repo_initialized = True
 
+    def _ensure_gitignore(self):
+        """Add any missing GITIGNORE_PATTERNS, keeping lines the user wrote"""
+        path = self.notebook_path / ".gitignore"
+        try:
+            existing = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            existing = ""
+        except OSError:
+            return
+        lines = existing.splitlines()
+        missing = [pattern for pattern in GITIGNORE_PATTERNS if pattern not in lines]
+        if not missing:
+            return
+        if existing and not existing.endswith("\n"):
+            existing += "\n"
+        try:
+            path.write_text(existing + "\n".join(missing) + "\n", encoding="utf-8")
+        except OSError:
+            pass  # Git is optional; an unwritable folder just keeps its untracked files
+
     def commit_silently(self, message, files=None):
-        """Commit ALL three files always - safe approach"""
+        """Commit ALL three files always - safe approach.
+        True if committed (or queued), False if nothing changed, None if git failed"""
+        # TRANSACTION: remember the message, commit_batch() records it later
+        if self._deferred is not None:
+            self._deferred.append(message)
+            return True
+
+        # BACKGROUND: snapshot the files now, the queue's thread commits them
+        if self.queue is not None:
+            if self.lock is not None:
+                with self.lock.exclusive():
+                    return self._enqueue(message)
+            return self._enqueue(message)
+
+        # Other instances sharing this folder wait instead of failing on index.lock
+        if self.lock is not None:
+            with self.lock.exclusive():
+                return self._commit_files(message)
+        return self._commit_files(message)
+
+    def _enqueue(self, message):
         if not self.repo_initialized:
             self.init_repo()
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return None
+        self.queue.put(message, snapshot)
+        return True
+
+    def commit_snapshot(self, message, snapshot):
+        """Commit a queued snapshot: True if committed, False if nothing
+        changed, None if git failed (the queue retries it).
+
+        The snapshot's blobs are already in git, so a fast-import commit needs
+        no folder lock: it never touches the index and notices a ref another
+        instance moved. Otherwise (blob layout, fast commits off, detached
+        HEAD, a moved ref) the snapshot is staged and committed with git
+        commit under the folder lock, as every other writer of the index does;
+        a LockTimeout is retried by the queue. The working tree is never
+        committed in its place: it may already hold newer saves that are
+        still queued behind this one.
+        """
+        if not self.repo_initialized:
+            if self.lock is not None:
+                with self.lock.exclusive():
+                    self.init_repo()
+            else:
+                self.init_repo()
+        if self._fast_path():
+            committed = self._fast_commit(message, snapshot)
+            if committed is not None:
+                return committed
+        if self.lock is not None:
+            with self.lock.exclusive():
+                return self._staged_commit(message, snapshot)
+        return self._staged_commit(message, snapshot)
+
+    def _staged_commit(self, message, snapshot):
+        """Commit a snapshot through the index: update-index for the JSON
+        files, git add for blobs/ (named by their digest, so the copy on disk
+        is the snapshot's), then git commit"""
+        if self._index_stale:  # a fast commit moved HEAD past the index
+            self._resync_index()
+            if self._index_stale:
+                return None
+        cacheinfo = []
+        for name, (key, blob_id) in snapshot.items():
+            cacheinfo += ["--cacheinfo", f"100644,{blob_id},{name}"]
+        removed = [name for name in COMMIT_FILES if name not in snapshot]  # e.g. a compacted journal
+        if self._run_git_command(["git", "update-index", "--add", *cacheinfo, "--force-remove", *removed]) is None:
+            return None
+        if not self._stage_blobs():
+            return None
+        return self._git_commit(message)
+
+    def pending_commits(self):
+        return self.queue.pending() if self.queue is not None else 0
+
+    def failed_commits(self):
+        return self.queue.failed() if self.queue is not None else 0
+
+    def _commit_files(self, message):
+        if not self.repo_initialized:
+            self.init_repo()
+
+        snapshot = self._snapshot(capture=False) if self._fast_path() else {}
+
+        # FAST PATH: one fast-import round trip (blob layout keeps the slow path)
+        if snapshot:
+            committed = self._fast_commit(message, snapshot)
+            if committed is not None:
+                return committed
 
         # 🆕 FIX: ALWAYS commit all three files to be safe
         files = ["structure.json", "notes.json", "files.json"]
+        if (self.notebook_path / ".gitignore").exists():
+            files.append(".gitignore")
+        if (self.notebook_path / "journal.jsonl").exists():
+            files.append("journal.jsonl")
+        else:
+            self._run_git_command(["git", "update-index", "--force-remove", "journal.jsonl"])  # compacted
     
         for file in files:
             self._run_git_command(["git", "add", file])
+        self._stage_blobs()
     
-        result = self._run_git_command(["git", "commit", "-m", message])
-        return result is not None
+        # Message on stdin: a big batch lists more UUIDs than one argv entry may hold
+        return self._git_commit(message)
+
+    def _git_commit(self, message):
+        """git commit what is staged: True, False if nothing is staged, None if git failed"""
+        if self._run_git_command(["git", "commit", "-F", "-"], input=message) is not None:
+            return True
+        if self._run_git_command(["git", "diff", "--cached", "--quiet"]) is not None:
+            return False
+        return None
+
+    def _fast_path(self):
+        return FAST_COMMITS and not self._blob_layout()
+
+    def _blob_layout(self):
+        """Whether the notebook uses the blob layout, as structure.json records it"""
+        if self.blob_layout is None:
+            try:
+                self.blob_layout = load_file(self.notebook_path / "structure.json").get("storage") == LAYOUT_BLOBS
+            except (OSError, ValueError):
+                return False  # not written yet: ask again next time
+        return self.blob_layout
+
+    def _stage_blobs(self):
+        """Stage blobs/ as it is on disk (also its removed blobs). In the JSON
+        layout it leaves the index, so a migration back drops it from history."""
+        if self._blob_layout() and (self.notebook_path / BLOBS_DIR).is_dir():
+            return self._run_git_command(["git", "add", BLOBS_DIR]) is not None
+        command = ["git", "rm", "-r", "-q", "--cached", "--ignore-unmatch", BLOBS_DIR]
+        return self._run_git_command(command) is not None
+
+    def _snapshot(self, capture=True):
+        """file -> (stat key, data). Committed now (capture=False), data is the
+        path, or None if the file is unchanged since it was last hashed.
+
+        For the queue (capture=True), data is always a blob id: changed files
+        are written into git with one hash-object, so a queued commit holds a
+        few ids however big files.json is, and later saves cannot change it.
+        None if git failed.
+        """
+        snapshot = {}
+        changed = []
+        for name in COMMIT_FILES:
+            path = self.notebook_path / name
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            cached = self._blob_ids.get(name)
+            if cached is not None and cached[0] == key:
+                snapshot[name] = (key, cached[1] if capture else None)
+            elif capture:
+                changed.append((name, key))
+            else:
+                snapshot[name] = (key, path)
+        if changed:
+            result = self._run_git_command(["git", "hash-object", "-w", "--", *(name for name, _ in changed)])
+            blob_ids = result.stdout.split() if result is not None else []
+            if len(blob_ids) != len(changed):
+                return None
+            for (name, key), blob_id in zip(changed, blob_ids):
+                self._blob_ids[name] = (key, blob_id)  # stored: safe to reuse from now on
+                snapshot[name] = (key, blob_id)
+        return snapshot
+
+    def _fast_commit(self, message, snapshot):
+        """Commit a snapshot of the three files through fast-import: no hooks,
+        no index, no git add. True if committed, False if nothing changed,
+        None to fall back to git commit."""
+        head = self._read_head()
+        idents = self._commit_idents()
+        if head is None or head[1] is None or idents is None:
+            return None  # detached/unborn HEAD or no identity: let git commit handle it
+        ref, parent = head
+
+        # blobs/: the fast path only runs in the JSON layout, where it has no place
+        removed = [name for name in COMMIT_FILES if name not in snapshot] + [BLOBS_DIR]
+        current = {}
+        hashed = {}  # only cached once the blobs are in git (_staged_commit relies on it)
+        for name, (key, data) in snapshot.items():
+            if isinstance(data, str):  # queued: already a blob in the repository
+                current[name] = (data, lambda data=data: data)
+                continue
+            cached = self._blob_ids.get(name)
+            if data is None and cached is not None and cached[0] == key:
+                current[name] = (cached[1], self._unchanged_reader(name, cached[1]))
+                continue
+            if data is None:
+                data = (self.notebook_path / name).read_bytes()
+            blob_id = git_blob_id(data) if isinstance(data, bytes) else git_file_blob_id(data)
+            hashed[name] = (key, blob_id)
+            current[name] = (blob_id, lambda data=data: data)
+
+        try:
+            if self._fast_import is None:
+                (self.notebook_path / ".git" / STALE_INDEX_MARKER).touch()
+                self._fast_import = FastImportStream(self.notebook_path)
+            tree_commit, tree = self._tree
+            if tree_commit != parent:  # someone else committed (or first use): ask git
+                tree = self._fast_import.ls(parent, list(current) + removed)
+            changed = {name: blob for name, blob in current.items() if tree.get(name) != blob[0]}
+            changed.update((name, (None, lambda: None)) for name in removed if tree.get(name))
+            if not changed:
+                self._tree = (parent, tree)
+                self._blob_ids.update(hashed)
+                return False
+            with span("git fast-import", ["git", "fast-import", f"commit {ref}"]):
+                commit = self._fast_import.commit(
+                    ref, parent, idents[0], idents[1], message,
+                    {name: blob[1]() for name, blob in changed.items()},
+                )
+        except OSError:
+            self._close_fast_import()
+            return None
+        if self._read_head() != (ref, commit):  # ref update refused (another writer moved it)
+            self._close_fast_import()
+            return None
+
+        tree = dict(tree)
+        tree.update((name, blob[0]) for name, blob in changed.items())
+        self._tree = (commit, tree)
+        self._blob_ids.update(hashed)
+        self._update_index(changed)
+        return True
+
+    def _update_index(self, changed):
+        """Point the index at the paths a fast commit changed, so git status
+        agrees with HEAD; falls back to read-tree (blobs/, or already stale)"""
+        if self._index_stale or BLOBS_DIR in changed:
+            self._resync_index()
+            return
+        command = ["git", "update-index", "--add"]
+        for name, (blob_id, _) in changed.items():
+            if blob_id is None:
+                command += ["--force-remove", name]
+            else:
+                command += ["--cacheinfo", f"100644,{blob_id},{name}"]
+        # Another git holding index.lock: stay stale, the next commit or close() tries again
+        self._index_stale = self._run_git_command(command) is None
+
+    def _resync_index(self):
+        """git read-tree HEAD; drops the stale marker once the stream is closed"""
+        self._index_stale = self._run_git_command(["git", "read-tree", "HEAD"]) is None
+        if not self._index_stale and self._fast_import is None:
+            self._drop_stale_marker()
+
+    def _drop_stale_marker(self):
+        try:
+            (self.notebook_path / ".git" / STALE_INDEX_MARKER).unlink()
+        except OSError:
+            pass
+
+    def _unchanged_reader(self, name, blob_id):
+        """Bytes of a file the snapshot skipped; only needed when HEAD disagrees with it"""
+        def read():
+            data = (self.notebook_path / name).read_bytes()
+            if git_blob_id(data) != blob_id:
+                raise OSError(f"{name} changed after it was queued")
+            return data
+        return read
+
+    def _read_head(self):
+        """(ref, commit id or None) straight from .git, or None if HEAD is detached"""
+        git_dir = self.notebook_path / ".git"
+        try:
+            head = (git_dir / "HEAD").read_text().strip()
+        except OSError:
+            return None  # .git is a file (worktree) or missing
+        if not head.startswith("ref: "):
+            return None
+        ref = head[5:]
+        try:
+            return ref, (git_dir / ref).read_text().strip()
+        except FileNotFoundError:
+            pass
+        try:
+            packed = (git_dir / "packed-refs").read_text()
+        except FileNotFoundError:
+            return ref, None
+        for line in packed.splitlines():
+            fields = line.split()
+            if len(fields) == 2 and fields[1] == ref:
+                return ref, fields[0]
+        return ref, None
+
+    def _commit_idents(self):
+        if self._idents is None:
+            idents = []
+            for variable in ("GIT_AUTHOR_IDENT", "GIT_COMMITTER_IDENT"):
+                result = self._run_git_command(["git", "var", variable])
+                if result is None:
+                    break
+                idents.append(result.stdout.strip().rsplit(" ", 2)[0])  # drop the date
+            self._idents = tuple(idents) if len(idents) == 2 else False
+        return self._idents or None
+
+    def _close_fast_import(self):
+        if self._fast_import is not None:
+            self._fast_import.close()
+            self._fast_import = None
+        self._tree = (None, {})
+
+    def close(self):
+        """Drain queued commits, stop the fast-import stream and point the index back at HEAD"""
+        if self.queue is not None:
+            self.queue.close()
+            self.queue = None
+        self._close_fast_import()
+        if self._index_stale:
+            self._resync_index()
+        else:
+            self._drop_stale_marker()
+
+    def defer_commits(self):
+        """Hold back commit_* calls until commit_batch() (see NoteManager.transaction)"""
+        self._deferred = []
+
+    def take_deferred(self):
+        """Stop deferring and return the messages collected so far"""
+        messages = self._deferred or []
+        self._deferred = None
+        return messages
+
+    def commit_batch(self, notebook_uuid, notebook_name, messages, item_uuids=(), description=""):
+        """Commit: BATCH - many changes, one commit.
+
+        Every deferred subject line goes into the body so DELETED/CREATED greps
+        still match, and every affected UUID goes into the metadata so
+        `git log --grep <uuid>` still finds the item's history.
+        """
+        return self.commit_silently(
+            self.batch_message(notebook_uuid, notebook_name, messages, item_uuids, description)
+        )
+
+    def batch_message(self, notebook_uuid, notebook_name, messages, item_uuids=(), description=""):
+        uuids = {}
+        for message in messages:
+            for item_uuid in re.findall(r"uuid:(\S+)", message):
+                uuids[item_uuid] = None
+        for item_uuid in item_uuids:
+            uuids[item_uuid] = None
+        uuids.pop(notebook_uuid, None)  # generate_commit_message appends it last
+
+        change_count = len(messages) or len(uuids)
+        lines = [message.splitlines()[0] for message in messages]
+        if description:
+            lines.insert(0, description)
+
+        message = self.generate_commit_message(
+            action="BATCH",
+            content_type="NOTEBOOK",
+            title=notebook_name,
+            context=f"{change_count} changes",
+            description="\n".join(lines),
+            tags=" ".join([f"batch {notebook_name.lower()}"] + [f"uuid:{item_uuid}" for item_uuid in uuids]),
+            item_uuid=notebook_uuid
+        )
+        return message
     # 🆕 SMART COMMIT SYSTEM - 8 OPERATIONS
 
     def generate_commit_message(self, action, content_type, title, context="", description="", tags="", item_uuid=""):
@@ -161,6 +564,30 @@ class GitManager:
         )
         return self.commit_silently(message, ["structure.json", "notes.json", "files.json"])
 
+    def commit_storage_migration(self, notebook_uuid, notebook_name, old_layout, new_layout):
+        """Commit: MIGRATE_STORAGE (json <-> blobs)"""
+        message = self.generate_commit_message(
+            action="MIGRATED",
+            content_type="NOTEBOOK",
+            title=notebook_name,
+            context=f"{old_layout} -> {new_layout} storage",
+            tags=f"storage migrated {new_layout} {notebook_name.lower()}",
+            item_uuid=notebook_uuid
+        )
+        return self.commit_silently(message)
+
+    def commit_journal_compaction(self, notebook_uuid, notebook_name):
+        """Commit: COMPACTED - journal folded into the JSON files, no content change"""
+        message = self.generate_commit_message(
+            action="COMPACTED",
+            content_type="NOTEBOOK",
+            title=notebook_name,
+            context="journal folded into JSON",
+            tags=f"journal compacted {notebook_name.lower()}",
+            item_uuid=notebook_uuid
+        )
+        return self.commit_silently(message)
+
     def commit_subnotebook_creation(self, subnotebook_uuid, subnotebook_name, parent_notebook, note_count=0):
         """Commit: CREATE_SUBNOTEBOOK"""
         message = self.generate_commit_message(
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# git_object_reader.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import atexit
+import threading
+import subprocess
+from instrumentation import span
+
+READER_STOP_TIMEOUT = 2.0  # seconds a reader gets to exit before it is killed
+
+
+class GitObjectReader:
+    """One long-lived `git cat-file --batch` for a repository.
+
+    History code asks for thousands of `<commit>:<file>` objects; each used to
+    be its own `git show` process. The reader keeps a single process, feeds it
+    one object name per line and reads back "<oid> <type> <size>" plus the
+    bytes. If git dies or the pipe breaks, the request is retried once on a
+    fresh process.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._process = None
+        self._lock = threading.Lock()
+
+    def read(self, name):
+        """(oid, type, bytes) for any object name git understands, or None if missing"""
+        if "\n" in name:
+            return None
+        with self._lock, span("git cat-file --batch"):
+            for attempt in range(2):
+                try:
+                    return self._request(name)
+                except (OSError, ValueError):
+                    self._stop()
+                    if attempt:
+                        return None
+        return None
+
+    def read_text(self, commit_hash, relpath):
+        """Text of relpath at commit_hash, or None (like `git show commit:relpath`)"""
+        found = self.read(f"{commit_hash}:{relpath}")
+        if found is None or found[1] != "blob":
+            return None
+        return found[2].decode("utf-8")
+
+    def read_bytes(self, commit_hash, relpath):
+        found = self.read(f"{commit_hash}:{relpath}")
+        if found is None or found[1] != "blob":
+            return None
+        return found[2]
+
+    def resolve(self, name):
+        """Full hash of a revision expression such as `<commit>^`, or None"""
+        found = self.read(name)
+        return found[0] if found is not None else None
+
+    def _request(self, name):
+        process = self._process
+        if process is None or process.poll() is not None:
+            process = self._start()
+        process.stdin.write(name.encode("utf-8") + b"\n")
+        process.stdin.flush()
+
+        header = process.stdout.readline()
+        if not header:
+            raise OSError("git cat-file exited")
+        fields = header.split()
+        if len(fields) != 3 or not fields[2].isdigit():
+            return None  # "<name> missing" / "<name> ambiguous"
+        oid, kind, size = fields
+        size = int(size)
+        data = process.stdout.read(size)
+        if len(data) != size or process.stdout.read(1) != b"\n":
+            raise OSError("git cat-file output cut short")
+        return oid.decode("ascii"), kind.decode("ascii"), data
+
+    def _start(self):
+        self._stop()
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return self._process
+
+    def _stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()  # EOF: cat-file exits on its own
+            process.wait(timeout=READER_STOP_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            process.stdout.close()
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def object_reader(repo_path):
+    """The shared reader for one notebook repository"""
+    key = os.path.normcase(os.path.abspath(repo_path))
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = _readers[key] = GitObjectReader(key)
+        return reader
+
+
+def close_object_reader(repo_path):
+    """Stop the reader of one repository (before its folder is deleted)"""
+    key = os.path.normcase(os.path.abspath(repo_path))
+    with _readers_lock:
+        reader = _readers.pop(key, None)
+    if reader is not None:
+        reader.close()
+
+
+def close_object_readers():
+    with _readers_lock:
+        readers = list(_readers.values())
+        _readers.clear()
+    for reader in readers:
+        reader.close()
+
+
+atexit.register(close_object_readers)
@@ -8,33 +8,39 @@ import re
 import tempfile
 import os
 from datetime import datetime
+from notebook_history import historical_json
+from git_object_reader import object_reader
+from instrumentation import timed
 
 class GitHistoryMiner:
     def __init__(self, note_manager):
         self.manager = note_manager
         self.temp_files = []
         
+    @timed("resurrection.find_deleted_items")
     def find_deleted_items(self, query):
         deleted_items = []
         seen_ids = set()
+        self.manager.wait_for_commits()  # a deletion may still be queued
 
         for notebook in self.manager.notebooks:
-            notebook_path = self.manager.get_notebook_folder_path(notebook.name)
+            notebook_path = self.manager.get_notebook_folder_path(notebook)
         
             # 🆕 FIX: Only search for DELETED items specifically
             cmd = [
-                "git", "log", "--oneline", "-i", "--grep", f"DELETED.*{query}",
-                "--all", "--pretty=format:%H %s"
+                "git", "log", "-i", "--grep", f"DELETED.*{query}",
+                "--all", "--pretty=format:%H%x1f%B%x1e"
             ]
         
             try:
                 result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
             
                 if result.returncode == 0 and result.stdout.strip():
-                    for line in result.stdout.splitlines():
-                        if line.strip():
-                            commit_hash, message = line.split(' ', 1)
-                        
+                    for record in result.stdout.split('\x1e'):
+                        if not record.strip():
+                            continue
+                        commit_hash, body = record.strip().split('\x1f', 1)
+                        for message in self._deletion_lines(body, query):
                             item_id, target_commit = self._extract_item_id_and_commit(notebook_path, commit_hash, message)
                         
                             if item_id and target_commit and item_id not in seen_ids:
@@ -50,15 +56,31 @@ class GitHistoryMiner:
             
         return deleted_items
 
+    @staticmethod
+    def _deletion_lines(body, query):
+        """Lines of a matched commit message that name the deleted items.
+
+        Single commits have the match in the subject. A BATCH commit lists one
+        subject line per change in its body: keep the DELETED ones matching
+        query, as a Python regex when it compiles the same, else as text.
+        """
+        lines = body.splitlines()
+        if not lines or not lines[0].startswith("BATCH "):
+            return lines[:1]
+        deletions = [line for line in lines[1:] if line.upper().startswith("DELETED ")]
+        try:
+            pattern = re.compile(f"DELETED.*{query}", re.IGNORECASE)
+            matched = [line for line in deletions if pattern.search(line)]
+        except re.error:
+            matched = []
+        # git's basic regex reads ( ) + ? { } | literally, Python does not
+        return matched or [line for line in deletions if query.lower() in line.lower()]
+
     def _find_id_by_name_in_commit(self, notebook_path, commit_hash, item_name):
         try:
-            cmd = ["git", "show", f"{commit_hash}:structure.json"]
-            result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
-        
-            if result.returncode != 0:
+            structure_data = historical_json(notebook_path, commit_hash, "structure.json")
+            if structure_data is None:
                 return None
-            
-            structure_data = json.loads(result.stdout)
         
             def search_recursive(data, target_name):
                 if isinstance(data, dict):
@@ -129,12 +151,11 @@ class GitHistoryMiner:
 
     def _get_commit_before(self, notebook_path, commit_hash):
         try:
-            cmd = ["git", "log", "-1", "--pretty=format:%H", f"{commit_hash}^"]
-            result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-            
+            parent = object_reader(notebook_path).resolve(f"{commit_hash}^")
+            if parent:
+                return parent
+
+            # Root commit: no parent, fall back to the commit dated before it
             cmd = ["git", "log", "-1", "--before", commit_hash, "--pretty=format:%H", "--all"]
             result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
             
@@ -148,13 +169,9 @@ class GitHistoryMiner:
 
     def _find_id_by_name_in_commit(self, notebook_path, commit_hash, item_name):
         try:
-            cmd = ["git", "show", f"{commit_hash}:structure.json"]
-            result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
-        
-            if result.returncode != 0:
+            structure_data = historical_json(notebook_path, commit_hash, "structure.json")
+            if structure_data is None:
                 return None
-            
-            structure_data = json.loads(result.stdout)
         
             def search_recursive(data, target_name):
                 if isinstance(data, dict):
@@ -212,8 +229,8 @@ class GitHistoryMiner:
             temp_structure = self._create_minimal_structure(structure_data, item_id, item_info)
             # Save structure
             structure_path = os.path.join(temp_dir, "structure.json")
-            with open(structure_path, "w") as f:
-                json.dump(temp_structure, f, indent=2)
+            with open(structure_path, "wb") as f:
+                f.write(self.manager.serializer.dumps(temp_structure))
 
             
             
@@ -232,14 +249,14 @@ class GitHistoryMiner:
     
                 # Write notes.json
                 notes_path = os.path.join(temp_dir, "notes.json")
-                with open(notes_path, "w") as f:
-                    json.dump(notebook_notes, f, indent=2)
+                with open(notes_path, "wb") as f:
+                    f.write(self.manager.serializer.dumps(notebook_notes))
                 
     
                 # Write files.json  
                 files_path = os.path.join(temp_dir, "files.json")
-                with open(files_path, "w") as f:
-                    json.dump(notebook_files, f, indent=2)
+                with open(files_path, "wb") as f:
+                    f.write(self.manager.serializer.dumps(notebook_files))
                 
                 
             else:
@@ -250,19 +267,19 @@ class GitHistoryMiner:
             
                 temp_content = {item_id: content}
                 content_filename = "files.json" if is_file_note else "notes.json"
-                with open(os.path.join(temp_dir, content_filename), "w") as f:
-                    json.dump(temp_content, f, indent=2)
+                with open(os.path.join(temp_dir, content_filename), "wb") as f:
+                    f.write(self.manager.serializer.dumps(temp_content))
             
                 # 🆕 FIX: Only create counterpart file if it doesn't exist or is needed
                 counterpart_filename = "notes.json" if is_file_note else "files.json"
                 counterpart_path = os.path.join(temp_dir, counterpart_filename)
                 if not os.path.exists(counterpart_path):
-                    with open(counterpart_path, "w") as f:
-                        json.dump({}, f, indent=2)
+                    with open(counterpart_path, "wb") as f:
+                        f.write(self.manager.serializer.dumps({}))
     
             # Save structure
-            with open(os.path.join(temp_dir, "structure.json"), "w") as f:
-                json.dump(temp_structure, f, indent=2)
+            with open(os.path.join(temp_dir, "structure.json"), "wb") as f:
+                f.write(self.manager.serializer.dumps(temp_structure))
                 
     
             return {
@@ -387,15 +404,7 @@ class GitHistoryMiner:
                 }
                 
     def _get_historical_json(self, notebook_path, commit_hash, filename):
-        try:
-            cmd = ["git", "show", f"{commit_hash}:{filename}"]
-            result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-        except Exception:
-            pass
-        return None
+        return historical_json(notebook_path, commit_hash, filename)
 
     def _find_item_in_structure(self, structure_data, target_uuid):
         def search_recursive(data):
@@ -441,7 +450,7 @@ class GitHistoryMiner:
         if not notebook:
             return timeline_items
         
-        notebook_path = self.manager.get_notebook_folder_path(notebook.name)
+        notebook_path = self.manager.get_notebook_folder_path(notebook)
     
         # 🆕 CHANGE: Use FULL commit messages with %B
         cmd = [
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# instrumentation.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import math
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+# TERMINAL_NOTES_STATS=1 records timings (shown by the `stats` command);
+# TERMINAL_NOTES_STATS=<file> also dumps them there as JSON on exit.
+# Unset, span() hands out one shared no-op and @timed returns the function untouched.
+STATS_SETTING = os.environ.get("TERMINAL_NOTES_STATS", "")
+ENABLED = STATS_SETTING not in ("", "0")
+DUMP_PATH = STATS_SETTING if ENABLED and STATS_SETTING != "1" else None
+
+BUCKETS_PER_DOUBLING = 8  # percentiles come out within ~9% of the true value
+RECENT_COMMANDS = 200  # git argv + duration kept for the stats screen / dump
+
+
+class LatencyHistogram:
+    """Count, total, max and log-spaced buckets of one operation's durations"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}  # bucket index -> count
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        microseconds = max(seconds * 1e6, 1.0)
+        index = int(math.log2(microseconds) * BUCKETS_PER_DOUBLING)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the fraction-th sample, in seconds"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / BUCKETS_PER_DOUBLING) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class Stats:
+    """Every histogram of this process, keyed by operation name"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.commands = deque(maxlen=RECENT_COMMANDS)
+        self.started = time.time()
+
+    def record(self, name, seconds, argv=None):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+            if argv is not None:
+                self.commands.append((list(argv), seconds))
+
+    def summary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def report_lines(self):
+        """The stats screen: one line per operation, slowest total first"""
+        rows = sorted(self.summary().items(), key=lambda item: item[1]["total"], reverse=True)
+        lines = [f"{'operation':34} {'count':>7} {'p50':>9} {'p95':>9} {'max':>9} {'total':>9}"]
+        for name, row in rows:
+            lines.append(
+                f"{name[:34]:34} {row['count']:>7} {format_seconds(row['p50']):>9} "
+                f"{format_seconds(row['p95']):>9} {format_seconds(row['max']):>9} "
+                f"{format_seconds(row['total']):>9}"
+            )
+        return lines
+
+    def slowest_commands(self, limit=10):
+        with self.lock:
+            commands = list(self.commands)
+        return sorted(commands, key=lambda command: command[1], reverse=True)[:limit]
+
+    def dump(self, path):
+        data = {
+            "started": self.started,
+            "ended": time.time(),
+            "operations": self.summary(),
+            "recent_commands": [{"argv": argv, "seconds": seconds} for argv, seconds in self.commands],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.commands.clear()
+
+
+STATS = Stats()
+_OFF = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "argv", "start")
+
+    def __init__(self, name, argv):
+        self.name = name
+        self.argv = argv
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STATS.record(self.name, time.perf_counter() - self.start, self.argv)
+        return False
+
+
+def span(name, argv=None):
+    """with span("save_notebook"): ... - times the block (argv: also log the command)"""
+    if not ENABLED:
+        return _OFF
+    return _Span(name, argv)
+
+
+def command_span(argv):
+    """span() named after the command ("git commit"); the name is only built with stats on"""
+    if not ENABLED:
+        return _OFF
+    return _Span(f"{argv[0]} {argv[1]}", argv)
+
+
+def timed(name):
+    """Decorator form of span(); with stats off the function is returned as is"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STATS.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds * 1e6:.0f}us"
+
+
+if DUMP_PATH:
+    atexit.register(lambda: STATS.dump(DUMP_PATH))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# notebook_history.py
+import sys
+
+sys.dont_write_bytecode = True
+from blob_store import content_map_from_blobs
+from git_object_reader import object_reader
+from notebook_journal import NotebookJournal, parse_records
+from serializer import loads
+from storage_engine import decode_content_map
+from terminal_notes_core import NoteManager
+
+NOTEBOOK_FILES = ("structure.json", "notes.json", "files.json")
+
+
+def git_show_text(notebook_path, commit_hash, relpath):
+    """Text of relpath at commit_hash, or None (no process per blob)"""
+    return object_reader(notebook_path).read_text(commit_hash, relpath)
+
+
+def historical_json(notebook_path, commit_hash, filename):
+    """structure.json / notes.json / files.json as of commit_hash, or None.
+
+    Content maps come back as plain {id: text} whatever the layout: blob
+    layout bodies are read from the commit, compressed bodies are decoded.
+    A journal tail committed with the files is replayed onto them.
+    """
+    try:
+        data = _committed_json(notebook_path, commit_hash, filename)
+        if data is None:
+            return None
+        journal = git_show_text(notebook_path, commit_hash, NotebookJournal.FILENAME)
+        records = parse_records(journal.splitlines(keepends=True)) if journal else None
+        if records:
+            folded = NoteManager.fold_journal_data(
+                *[data if part == filename else _committed_json(notebook_path, commit_hash, part) or {}
+                  for part in NOTEBOOK_FILES],
+                records,
+            )
+            data = folded[NOTEBOOK_FILES.index(filename)]
+        return data
+    except Exception:
+        return None
+
+
+def _committed_json(notebook_path, commit_hash, filename):
+    """One of the three files exactly as committed (bodies decoded, journal not applied)"""
+    raw = object_reader(notebook_path).read_bytes(commit_hash, filename)
+    if raw is None:
+        return None
+    data = loads(raw)
+    if filename in ("notes.json", "files.json"):
+        if not data:  # BLOB LAYOUT: content maps are empty, bodies hang off structure.json
+            blob_map = content_map_from_blobs(
+                _committed_json(notebook_path, commit_hash, "structure.json"), filename,
+                lambda relpath: git_show_text(notebook_path, commit_hash, relpath)
+            )
+            if blob_map is not None:
+                data = blob_map
+        else:
+            decode_content_map(data)  # compressed bodies come back as text
+    return data
@@ -4,8 +4,21 @@ sys.dont_write_bytecode = True
 
 import os
 import json
+import tempfile
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+from terminal_notes_core import Note, Notebook
+from blob_store import LAYOUT_BLOBS, BlobContent, BlobStore
+from storage_engine import COMPRESS_THRESHOLD, LazyContent, compress_body
+
+# BULK INGEST
+INGEST_WORKERS = 8
+INGEST_WINDOW = 64  # files read ahead of the notebook - bounds memory, not speed
+INGEST_MAX_BYTES = 8 * 1024 * 1024  # bigger files are skipped, not truncated
+INGEST_SPOOL_PREFIX = ".ingest-"  # encoded bodies wait here for the save (git ignores it)
 
 class NotebookImporter:
     def __init__(self, note_manager, ui_controller):
@@ -215,7 +228,7 @@ class NotebookImporter:
                 return False
             
             self.manager.register_notebook(notebook, folder_path)
-            self.manager.notebooks.append(notebook)
+            self.manager.add_root_notebook(notebook)
             self.manager.save_data()
             
             verified = self.manager.find_notebook_by_id(notebook.id)
@@ -223,4 +236,195 @@ class NotebookImporter:
             
         except Exception as e:
             print(f"Import error: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    # BULK INGEST - a directory tree as file notes, one save and one commit
+    def ingest_directory_flow(self, notebook):
+        """Ask for a directory and ingest it under notebook"""
+        self.ui.clear_screen()
+        self.ui.print_header(f"Ingest Directory into: {notebook.name}")
+
+        print("Every file with an allowed extension becomes a file note;")
+        print("folders become subnotebooks. Hidden files and folders are skipped.")
+        print()
+
+        directory = self.ui.get_input("Directory path [blank to cancel]: ").strip()
+        if not directory:
+            return "cancelled"
+
+        def progress(stats):
+            print(f"\r {stats['files']} files, {stats['bytes'] / 2**20:.1f} MB", end="", flush=True)
+
+        try:
+            stats = self.ingest_directory(notebook, directory, progress=progress)
+        except (OSError, ValueError) as e:
+            print(f"\n Ingest failed: {e}")
+            self.ui.get_input("Press Enter to continue...")
+            return "failed"
+
+        print(f"\n Ingested {stats['files']} files into {stats['notebooks']} new subnotebooks")
+        if stats["existing"] or stats["skipped"]:
+            print(f" Skipped {stats['existing']} already present, {stats['skipped']} unreadable/binary/too large")
+        self.ui.get_input("Press Enter to continue...")
+        return "success"
+
+    def ingest_directory(self, notebook, directory, extensions=None, workers=INGEST_WORKERS,
+                         max_bytes=INGEST_MAX_BYTES, progress=None):
+        """Add every file under directory to notebook as a file note, mirroring
+        folders as subnotebooks, in one save and one BATCH commit.
+
+        extensions defaults to the UI's allowed_extensions (None there means any).
+        Files are read and encoded by a worker pool at most INGEST_WINDOW ahead.
+        Each encoded body is appended to a spool file in the notebook folder and
+        dropped; the note points at it like a lazy body, and the save streams
+        the spool into files.json (the blob layout stores blobs instead). So
+        memory holds the window, not the corpus. Files whose title already
+        exists in the target subnotebook are left alone, so ingesting the same
+        tree again only adds what is new. In journal mode the save rewrites the
+        three files rather than journaling the bodies. Returns counts: files, notebooks,
+        bytes, existing, skipped.
+        """
+        directory = self.normalize_path(directory)
+        if not os.path.isdir(directory):
+            raise ValueError(f"Not a directory: {directory}")
+        if extensions is None:
+            extensions = getattr(self.ui, "allowed_extensions", None)
+        if extensions is not None:
+            extensions = {extension.lower().lstrip(".") for extension in extensions}
+
+        manager = self.manager
+        root_notebook = manager._find_root_notebook(notebook)
+        folder_path = manager.get_notebook_folder_path(root_notebook)
+        store = spool = None
+        spooled = []  # notes whose body is still in the spool
+        if root_notebook.storage == LAYOUT_BLOBS:
+            store = BlobStore(folder_path, manager.writer)
+        else:
+            fd, spool_path = tempfile.mkstemp(prefix=INGEST_SPOOL_PREFIX, suffix=".spool", dir=folder_path)
+            spool = os.fdopen(fd, "wb", buffering=0)  # readable at once, should anything open a body
+
+        def read(path):
+            """Runs in the pool: the body as stored, or None to skip the file"""
+            try:
+                with open(path, "rb") as f:
+                    # read(max_bytes + 1) would allocate the whole 8 MB up front, per worker
+                    if os.fstat(f.fileno()).st_size > max_bytes:
+                        return None
+                    data = f.read()
+                if len(data) > max_bytes:  # grew while we read it
+                    return None
+                text = data.decode("utf-8")
+            except (OSError, UnicodeDecodeError):
+                return None
+            if store is not None:
+                return text, len(data)
+            value = text
+            if manager.compression and len(data) >= COMPRESS_THRESHOLD:
+                value = compress_body(text, manager.compression)
+            return manager.serializer.dump_value(value), len(data)
+
+        stats = {"files": 0, "notebooks": 0, "bytes": 0, "existing": 0, "skipped": 0}
+        folders = {"": notebook}
+        titles = {}
+
+        def target_for(rel_dir):
+            target = folders.get(rel_dir)
+            if target is None:
+                parent_dir, name = os.path.split(rel_dir)
+                parent = target_for(parent_dir)
+                target = next((nb for nb in parent.subnotebooks if nb.name == name), None)
+                if target is None:
+                    target = Notebook(name, parent_id=parent.id)
+                    manager.add_subnotebook(parent, target)
+                    stats["notebooks"] += 1
+                folders[rel_dir] = target
+            return target
+
+        def add(entry, future):
+            rel_dir, filename, extension = entry
+            result = future.result()
+            if result is None:
+                stats["skipped"] += 1
+                return
+            target = target_for(rel_dir)
+            existing = titles.get(target.id)
+            if existing is None:
+                existing = titles[target.id] = {note.title for note in target.notes if note.is_file_note}
+            if filename in existing:
+                stats["existing"] += 1
+                return
+            body, size = result
+            note = Note(filename, created_with="ingest")
+            note.file_extension = extension
+            if store is not None:
+                digest = store.put(body)
+                note.attach_content(BlobContent(store, digest, manager.content_cache), digest)
+            else:
+                offset = spool.tell()
+                spool.write(body)
+                note.attach_content(LazyContent(spool_path, offset, len(body), size, manager.content_cache))
+                spooled.append(note)
+            manager.add_note(target, note)
+            existing.add(filename)
+            stats["files"] += 1
+            stats["bytes"] += size
+            if progress and stats["files"] % 500 == 0:
+                progress(stats)
+
+        try:
+            with ExitStack() as stack:
+                if store is not None:
+                    # Blobs land before the save; keep other instances' GC away from them
+                    stack.enter_context(manager.get_git_manager(root_notebook).lock.exclusive())
+                stack.enter_context(manager.transaction(notebook, f"Ingested files from {directory}"))
+                # One full rewrite at the end: journal mode would copy every body into records
+                manager.mark_all_dirty(root_notebook)
+                pool = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+                pending = deque()
+                for rel_dir, filename, extension, path in self._walk_ingest_files(directory, extensions, stats):
+                    pending.append(((rel_dir, filename, extension), pool.submit(read, path)))
+                    if len(pending) >= INGEST_WINDOW:
+                        add(*pending.popleft())
+                while pending:
+                    add(*pending.popleft())
+        finally:
+            if spool is not None:
+                self._release_spool(root_notebook, spool, spool_path, spooled)
+        if progress:
+            progress(stats)
+        return stats
+
+    def _release_spool(self, root_notebook, spool, spool_path, spooled):
+        """Make sure no note still reads from the spool, then delete it"""
+        for note in spooled:
+            ref = note._content_ref
+            if isinstance(ref, LazyContent) and ref.path == spool_path:
+                note.content = note.content  # save failed: keep the body, the next save writes it
+        spool.close()
+        try:
+            os.remove(spool_path)
+        except OSError:
+            pass
+
+    def _walk_ingest_files(self, directory, extensions, stats):
+        """(relative folder, file name, extension, path) depth first, names sorted"""
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(os.path.join(directory, rel_dir)) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError:
+                stats["skipped"] += 1
+                continue
+            subdirs = []
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(os.path.join(rel_dir, entry.name))
+                elif entry.is_file() and "." in entry.name:
+                    extension = entry.name.rsplit(".", 1)[1].lower()
+                    if extensions is None or extension in extensions:
+                        yield rel_dir, entry.name, extension, entry.path
+            stack.extend(reversed(subdirs))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# notebook_journal.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import time
+import threading
+
+
+def parse_records(lines):
+    """Complete records of a journal's lines (a torn last line from a crash is ignored)"""
+    records = []
+    for line in lines:
+        if not line.endswith("\n"):
+            break  # Partial write - everything before it is intact
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    return records
+
+
+class NotebookJournal:
+    """Append-only operation log that sits next to the three JSON files.
+
+    Every mutation is one compact JSON line. The journal is folded back into
+    structure.json / notes.json / files.json by NoteManager once it grows past
+    max_bytes or its oldest record is older than max_age seconds.
+    """
+
+    FILENAME = "journal.jsonl"
+
+    def __init__(self, folder_path, max_bytes=1024 * 1024, max_age=600):
+        self.folder_path = folder_path
+        self.path = os.path.join(folder_path, self.FILENAME)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._first_record_time = None
+        self._lock = threading.Lock()
+
+    def append(self, records):
+        """Append records and fsync so a crash never loses an acknowledged edit"""
+        if not records:
+            return
+        now = time.time()
+        lines = []
+        for record in records:
+            record = dict(record)
+            record.setdefault("ts", now)
+            lines.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+
+        with self._lock:
+            self._drop_torn_tail()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if self._first_record_time is None:
+                self._first_record_time = now
+
+    def _drop_torn_tail(self):
+        """Cut a partial last line (crash mid-append) so new records start on a line of their own"""
+        try:
+            with open(self.path, "rb+") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def read(self):
+        """Return all complete records (a torn last line from a crash is ignored)"""
+        if not os.path.exists(self.path):
+            return []
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            records = parse_records(f)
+
+        if records and self._first_record_time is None:
+            self._first_record_time = records[0].get("ts", time.time())
+        return records
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def has_records(self):
+        return self.size() > 0
+
+    def needs_compaction(self):
+        if self.size() >= self.max_bytes:
+            return True
+        if self._first_record_time is None:
+            return False
+        return time.time() - self._first_record_time >= self.max_age
+
+    def clear(self):
+        """Drop all records - only call once they are folded into the JSON files"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._first_record_time = None
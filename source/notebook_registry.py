@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# notebook_registry.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import threading
+from file_locks import FileLock
+
+
+def normalize_path_for_comparison(path):
+    """Normalize path for cross-platform comparison"""
+    expanded = os.path.expanduser(path)
+    absolute = os.path.abspath(expanded)
+    return os.path.normcase(absolute)
+
+
+class NotebookRegistry:
+    """notebooks_registry.json kept in memory, indexed by id, name and path.
+
+    Every access costs one stat(): the file is only re-parsed when its
+    (mtime, size, inode) differs from what we last read or wrote, i.e. when
+    something outside this process changed it. Reads take a shared lock on
+    notebooks_registry.lock and changes an exclusive one across re-read,
+    edit and write, so two instances registering at once both keep their entry.
+    """
+
+    def __init__(self, path, writer):
+        self.path = path
+        self.writer = writer
+        self._lock = threading.RLock()
+        self._data = None
+        self._stamp = None
+        self._names = {}  # name -> number of entries with that name
+        self._paths = {}  # normalized path -> notebook id
+        self.file_lock = FileLock(os.path.splitext(path)[0] + ".lock")
+
+    def _current_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _remember_stamp(self):
+        self._stamp = self._current_stamp()
+
+    def _reindex(self):
+        self._names = {}
+        self._paths = {}
+        for notebook_id, info in self._data["notebooks"].items():
+            self._names[info["name"]] = self._names.get(info["name"], 0) + 1
+            self._paths[normalize_path_for_comparison(info["path"])] = notebook_id
+
+    def _refresh(self):
+        stamp = self._current_stamp()
+        if self._data is not None and stamp == self._stamp:
+            return
+        with self.file_lock.shared():
+            if self._reload(self._current_stamp()):
+                return
+        # Missing or corrupted: writing a fresh one needs the lock exclusive from the start
+        with self.file_lock.exclusive():
+            if not self._reload(self._current_stamp()):
+                # 🆕 CREATE REGISTRY FILE IF IT DOESN'T EXIST (or replace a corrupted one)
+                self._data = {"notebooks": {}}
+                self.save()
+                self._reindex()
+
+    def _reload(self, stamp):
+        """Re-read the file; False if it is missing or corrupted"""
+        if stamp is None:
+            return False
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if not isinstance(data.get("notebooks"), dict):
+                raise ValueError("registry has no notebooks map")
+        except Exception:
+            return False
+        self._data = data
+        self._stamp = stamp
+        self._reindex()
+        return True
+
+    @property
+    def data(self):
+        """The resident registry dict ({"notebooks": {id: info}})"""
+        with self._lock:
+            self._refresh()
+            return self._data
+
+    def get(self, notebook_id):
+        return self.data["notebooks"].get(notebook_id)
+
+    def has_name(self, name):
+        with self._lock:
+            self._refresh()
+            return self._names.get(name, 0) > 0
+
+    def id_for_path(self, folder_path):
+        with self._lock:
+            self._refresh()
+            return self._paths.get(normalize_path_for_comparison(folder_path))
+
+    def add(self, notebook_id, info):
+        with self._lock, self.file_lock.exclusive():
+            self._refresh()
+            self._data["notebooks"][notebook_id] = info
+            self._reindex()
+            self.save()
+
+    def remove(self, *notebook_ids):
+        with self._lock, self.file_lock.exclusive():
+            self._refresh()
+            notebooks = self._data["notebooks"]
+            removed = [notebook_id for notebook_id in notebook_ids if notebook_id in notebooks]
+            if not removed:
+                return  # Unchanged - nothing to write
+            for notebook_id in removed:
+                del notebooks[notebook_id]
+            self._reindex()
+            self.save()
+
+    def replace(self, registry_data):
+        """Adopt a whole registry dict (e.g. one a caller edited) and write it"""
+        with self._lock, self.file_lock.exclusive():
+            self._data = registry_data
+            self._reindex()
+            self.save()
+
+    def save(self):
+        """Atomic write-back; the new stamp is recorded once it is on disk"""
+        with self._lock, self.file_lock.exclusive():
+            try:
+                self.writer.write(self.path, json.dumps(self._data, indent=2), after=self._remember_stamp)
+            except Exception as e:
+                print(f"Warning: Could not save registry: {e}")
@@ -5,6 +5,8 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 from terminal_notes_core import Note  # 🆕 ADD THIS IMPORT
+from serializer import load_file
+from instrumentation import timed
 
 class RecoverySystem:
     def __init__(self, manager):
@@ -47,18 +49,15 @@ class RecoverySystem:
         }
     
         try:
-            # Atomic write - write to temp then rename
-            temp_path = recovery_path.with_suffix('.tmp')
-            log(f"SAVE_RECOVERY: Writing to temp file {temp_path}")
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(recovery_data, f, indent=2)
-            temp_path.rename(recovery_path)
+            # Atomic write - temp file, fsync, rename (temp names end in .tmp)
+            self.manager.writer.write(recovery_path, self.manager.serializer.dumps(recovery_data))
             log(f"SAVE_RECOVERY: Successfully saved {recovery_path}")
             return True
         except Exception as e:
             log(f"SAVE_RECOVERY ERROR: {e}")
             return False
     
+    @timed("recovery.scan")
     def get_recovery_files_for_notebook(self, notebook_uuid):
         """Get all recovery files for a specific notebook"""
         notebook_recoveries = []
@@ -66,8 +65,7 @@ class RecoverySystem:
         for recovery_file in self.recovery_dir.glob('*'):
             if recovery_file.is_file() and not recovery_file.name.endswith('.tmp'):
                 try:
-                    with open(recovery_file, 'r', encoding='utf-8') as f:
-                        recovery_data = json.load(f)
+                    recovery_data = load_file(recovery_file)
                     
                     if recovery_data.get('parent_notebook_uuid') == str(notebook_uuid):
                         notebook_recoveries.append((recovery_file, recovery_data))
@@ -76,6 +74,7 @@ class RecoverySystem:
         
         return notebook_recoveries
     
+    @timed("recovery.recover")
     def recover_notebook_content(self, notebook):
         recovered_count = 0
         recovery_files = self.get_recovery_files_for_notebook(notebook.id)
@@ -96,8 +95,7 @@ class RecoverySystem:
                     recovery_time = datetime.fromisoformat(recovery_data['last_updated'])
                     if recovery_time > existing_note.updated:
                         old_content = existing_note.content
-                        existing_note.content = content
-                        existing_note.updated = datetime.now()
+                        self.manager.update_note_content(existing_note, content)
                     
                         # 🆕 SAVE SILENTLY - don't trigger navigation
                         self._save_notebook_silently(existing_notebook)
@@ -105,7 +103,7 @@ class RecoverySystem:
                         # Commit the recovery
                         try:
                             root_notebook = self.manager._find_root_notebook(existing_notebook)
-                            git_manager = self.manager.get_git_manager(root_notebook.name)
+                            git_manager = self.manager.get_git_manager(root_notebook)
                             git_manager.commit_note_edit(
                                 note_uuid, note_title, root_notebook.name, 
                                 old_content, content
@@ -126,7 +124,7 @@ class RecoverySystem:
                         if is_file_note:
                             new_note.file_extension = file_extension
                     
-                        notebook.notes.append(new_note)
+                        self.manager.add_note(notebook, new_note)
                     
                         # 🆕 SAVE SILENTLY - don't trigger navigation
                         self._save_notebook_silently(notebook)
@@ -134,7 +132,7 @@ class RecoverySystem:
                         # Commit the creation
                         try:
                             root_notebook = self.manager._find_root_notebook(notebook)
-                            git_manager = self.manager.get_git_manager(root_notebook.name)
+                            git_manager = self.manager.get_git_manager(root_notebook)
                             if is_file_note:
                                 git_manager.commit_file_creation(
                                     note_uuid, note_title, root_notebook.name, 
@@ -161,26 +159,11 @@ class RecoverySystem:
     
     def _save_notebook_silently(self, notebook):
         """Save notebook without triggering navigation events"""
-        # 🆕 DIRECT SAVE without going through the full manager.save_data()
-        folder_path = self.manager.get_notebook_folder_path(notebook.name)
-        structure_file, notes_file, files_file = self.manager.get_notebook_file_paths(notebook.name)
-
-        # Save structure (metadata only)
-        structure_data = notebook.to_dict()
-        with open(structure_file, "w") as f:
-            json.dump(structure_data, f, indent=2)
-
-        # Save content files directly
-        notes_map = {}
-        files_map = {}
-        self.manager._extract_file_content_from_notebook(notebook, notes_map, files_map)
-
-        with open(notes_file, "w") as f:
-            json.dump(notes_map, f, indent=2)
-
-        with open(files_file, "w") as f:
-            json.dump(files_map, f, indent=2)
+        # Goes through the manager so only the files touched by the
+        # recovery are rewritten (and subnotebooks land in their root folder)
+        self.manager.save_notebook(notebook)
     
+    @timed("recovery.cleanup")
     def cleanup_stale_recovery_files(self, older_than_hours=24):
         """Clean up old recovery files"""
         cutoff_time = datetime.now().timestamp() - (older_than_hours * 3600)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from datetime import datetime
 import shutil
+from instrumentation import timed
 
 
 class SimpleSearch:
@@ -12,6 +13,7 @@ class SimpleSearch:
         self.current_page = 0
         self.search_nav_stack = []  # Format: {'screen': 'results/notebook/note', 'data': {}}
     
+    @timed("search.simple")
     def search(self, query):
         """Simple search through all notebooks"""
         self.query = query
@@ -99,14 +101,13 @@ class SimpleSearch:
     
                 # Only save and commit if content actually changed
                 if new_content is not None and new_content != original_content:
-                    note.content = new_content
-                    note.updated = datetime.now()
+                    self.manager.update_note_content(note, new_content)
                     self.manager.save_data()
 
                     # 🆕 FIX: USE SMART GIT COMMIT FROM SEARCH CONTEXT
                     try:
                         root_notebook = self.manager._find_root_notebook(notebook)
-                        git_manager = self.manager.get_git_manager(root_notebook.name)
+                        git_manager = self.manager.get_git_manager(root_notebook)
                         git_manager.commit_note_edit(note.id, note.title, root_notebook.name, original_content, new_content)
                     except Exception:
                         pass
@@ -291,6 +292,7 @@ class SimpleSearch:
         self.query = ""
         self.current_page = 0
     
+    @timed("search.simple")
     def search(self, query, include_historical=False):
         self.query = query
         self.results = []
@@ -518,7 +520,7 @@ class SimpleSearch:
                     note = paginated_notes[idx]
                     confirm = self.ui.get_input(f"Delete note '{note.title}'? [y/N]: ")
                     if confirm.lower() == "y":
-                        notebook.notes.remove(note)
+                        self.manager.remove_note(notebook, note)
                         self.manager.save_data()
                     
                         # 🆕 CRITICAL: REFRESH SEARCH RESULTS AFTER DELETION
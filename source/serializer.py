@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# serializer.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+
+try:
+    import orjson  # Optional: several times faster than the stdlib encoder
+except ImportError:
+    orjson = None
+
+from storage_engine import ChunkedData, encode_content_map, iter_encoded_content_map
+
+# On-disk formats for the three-file schema
+FORMAT_COMPACT = "compact"  # sorted keys, no indent - small files, small git deltas
+FORMAT_PRETTY = "pretty"  # indent=2, for people who hand-edit their notebooks
+FORMATS = (FORMAT_COMPACT, FORMAT_PRETTY)
+
+# Existing notebooks stay indented; TERMINAL_NOTES_JSON=compact opts in to the
+# smaller format (readers accept both, so folders may be switched either way)
+DEFAULT_FORMAT = os.environ.get("TERMINAL_NOTES_JSON", FORMAT_PRETTY)
+
+
+def loads(data):
+    """Parse JSON from str or bytes (both formats read the same)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+class JsonSerializer:
+    """Encodes everything the app persists as JSON, in one configurable format.
+
+    Compact output is canonical: keys are sorted and nothing is indented, so
+    the same data always produces the same bytes. Pretty output is exactly
+    what json.dump(indent=2) always wrote (non-ASCII escaped), so existing
+    notebooks are not rewritten; orjson only speeds up the compact format.
+    Content maps keep one note per line in both formats, which is what keeps
+    git diffs per note.
+    """
+
+    def __init__(self, json_format=None):
+        json_format = json_format or DEFAULT_FORMAT
+        if json_format not in FORMATS:
+            raise ValueError(f"Unknown JSON format '{json_format}' (use {' or '.join(FORMATS)})")
+        self.format = json_format
+        self.pretty = json_format == FORMAT_PRETTY
+
+    def dumps(self, obj):
+        """obj as UTF-8 JSON bytes"""
+        if self.pretty:
+            return json.dumps(obj, indent=2).encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def dump_value(self, value):
+        """One content map value (a note body), never indented"""
+        if self.pretty:
+            return json.dumps(value).encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    def encode_content_map(self, entries):
+        """notes.json / files.json bytes plus offsets, see storage_engine.encode_content_map"""
+        if not self.pretty:
+            entries = sorted(entries, key=lambda entry: entry[0])
+        return encode_content_map(entries, pretty=self.pretty)
+
+    def stream_content_map(self, entries):
+        """Like encode_content_map, but the bytes are produced as the writer
+        writes them; offsets is complete once the write has committed"""
+        if not self.pretty:
+            entries = sorted(entries, key=lambda entry: entry[0])
+        offsets = {}
+        return ChunkedData(iter_encoded_content_map(entries, offsets, pretty=self.pretty)), offsets
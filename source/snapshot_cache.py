@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# snapshot_cache.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import marshal
+
+# Bump whenever the tuple layout NoteManager stores changes
+SNAPSHOT_VERSION = 3
+
+# Files whose (mtime, size, inode) must be unchanged for a snapshot entry to be used
+STAMPED_FILES = ("structure.json", "notes.json", "files.json", "journal.jsonl")
+
+
+class SnapshotCache:
+    """Binary copy of the parsed notebook trees, read in one go at startup.
+
+    Trees hold where each body lives (content map offsets, blob digests),
+    not the bodies themselves: eager loads still read those from the folder.
+
+    Each entry is keyed by folder path and carries the stamps of the files it
+    was built from; a stamp mismatch means the folder changed and the caller
+    falls back to parsing JSON.
+    """
+
+    FILENAME = ".startup_snapshot"
+
+    def __init__(self, notebooks_root, writer):
+        self.path = os.path.join(notebooks_root, self.FILENAME)
+        self.writer = writer
+
+    def _header(self, lazy):
+        # marshal output is only stable within one Python version
+        return (SNAPSHOT_VERSION, sys.version_info[:2], bool(lazy))
+
+    def stamp(self, folder_path):
+        stamps = []
+        for filename in STAMPED_FILES:
+            try:
+                stat = os.stat(os.path.join(folder_path, filename))
+                stamps.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def load(self, lazy):
+        """folder path -> (stamp, tree) for every entry, {} if unusable"""
+        try:
+            with open(self.path, "rb") as f:
+                header, entries = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if tuple(header) != self._header(lazy):
+            return {}
+        return entries
+
+    def lookup(self, entries, folder_path, stamp):
+        """The cached tree for folder_path if it was built from files stamped so"""
+        entry = entries.get(folder_path)
+        if entry is None or entry[0] != stamp:
+            return None
+        return entry[1]
+
+    def save(self, entries, lazy):
+        """entries: folder path -> (stamp, tree)"""
+        self.writer.write(self.path, marshal.dumps((self._header(lazy), entries)))
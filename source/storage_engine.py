@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# storage_engine.py
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import re
+import bz2
+import lzma
+import zlib
+import json
+import mmap
+import base64
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class ChunkedData:
+    """File contents generated piece by piece as the temp file is written, so a
+    big content map never exists as one bytes object (see stream_content_map)"""
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+
+class AtomicWriter:
+    """Crash-safe file writer shared by everything that persists JSON.
+
+    Each file is written to a temp file in the same folder, fsynced and then
+    renamed over the target, so a crash leaves either the old or the new file,
+    never a truncated one. Inside batch() writes are buffered (the last write
+    to a path wins) and committed together: all temp files are synced, renamed,
+    and each touched folder gets a single fsync barrier at the end. Batches are
+    per thread, so a background compaction never lands in a UI thread's batch.
+    """
+
+    _counter = itertools.count()
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def write(self, path, data, after=None):
+        """Atomically replace path with data (str or bytes)"""
+        self.write_many({path: data}, after)
+
+    def write_many(self, files, after=None):
+        """Atomically replace several files with one barrier per folder.
+
+        after() runs once the files are on disk. Inside a batch only the
+        callback of the last write to the same set of paths survives.
+        """
+        files = {os.fspath(path): self._to_bytes(data) for path, data in files.items()}
+        if getattr(self._local, "depth", 0):
+            self._local.pending.update(files)
+            if after is not None:
+                self._local.after[tuple(files)] = after
+            return
+        self._commit(files)
+        if after is not None:
+            after()
+
+    def on_commit(self, callback):
+        """Run callback once everything written so far is on disk (now, outside a batch)"""
+        if getattr(self._local, "depth", 0):
+            self._local.after[object()] = callback
+        else:
+            callback()
+
+    @contextmanager
+    def batch(self):
+        """Group every write made inside the block into one commit"""
+        if not getattr(self._local, "depth", 0):
+            self._local.depth = 0
+            self._local.pending = {}  # path -> bytes, insertion ordered
+            self._local.after = {}  # paths -> post-commit callback
+        self._local.depth += 1
+        try:
+            yield self
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self.flush()
+
+    def flush(self):
+        """Commit whatever the current thread's batch has buffered so far"""
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            return
+        callbacks = list(self._local.after.values())
+        self._local.pending = {}
+        self._local.after = {}
+        if pending:
+            self._commit(pending)
+        for callback in callbacks:
+            callback()
+
+    def _to_bytes(self, data):
+        if isinstance(data, ChunkedData):
+            return data  # produced while the temp file is written
+        if isinstance(data, str):
+            return data.encode("utf-8")
+        return bytes(data)
+
+    def _temp_path(self, path):
+        return f"{path}.{os.getpid()}.{next(self._counter)}.tmp"
+
+    def _commit(self, files):
+        written = []  # (temp_path, final_path)
+        folders = []
+        try:
+            # 1. Write and sync every temp file
+            for path, data in files.items():
+                temp_path = self._temp_path(path)
+                with open(temp_path, "xb") as f:
+                    written.append((temp_path, path))  # removed below if anything fails
+                    if isinstance(data, ChunkedData):
+                        for chunk in data.chunks:
+                            f.write(chunk)
+                    else:
+                        f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                folder = os.path.dirname(os.path.abspath(path))
+                if folder not in folders:
+                    folders.append(folder)
+
+            # 2. Swap them in
+            for temp_path, path in written:
+                os.replace(temp_path, path)
+            written = []
+        finally:
+            for temp_path, _ in written:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+        # 3. One barrier per folder makes the renames durable
+        for folder in folders:
+            self._fsync_folder(folder)
+
+    def _fsync_folder(self, folder):
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+        except OSError:
+            return  # Not supported on this platform (e.g. Windows)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+# CONTENT MAPS - notes.json / files.json with a byte offset index beside them
+
+# Bump when the offsets layout changes; older indexes are then treated as stale
+CONTENT_INDEX_VERSION = 2
+
+
+def encode_content_map(entries, pretty=True):
+    """Encode (note_id, raw JSON value, body size) one entry per line.
+
+    pretty=True matches json.dumps(indent=2); pretty=False drops the indent
+    and the space after the colon. Returns (data, offsets) where
+    offsets[note_id] = [offset, length, size]: where the encoded value sits
+    inside data, and the UTF-8 size of the body.
+    """
+    offsets = {}
+    return b"".join(iter_encoded_content_map(entries, offsets, pretty)), offsets
+
+
+def iter_encoded_content_map(entries, offsets, pretty=True):
+    """encode_content_map one chunk at a time, filling offsets as it goes.
+
+    raw may also be a callable returning the bytes: it is called when its
+    entry is reached, so only one body is in memory at a time.
+    """
+    if not entries:
+        yield b"{}"
+        return
+    yield b"{"
+    position = 1
+    indent, colon = (b"  ", b": ") if pretty else (b"", b":")
+    separator = b"\n" + indent
+    for note_id, raw, size in entries:
+        if callable(raw):
+            raw = raw()
+        prefix = separator + json.dumps(note_id).encode("utf-8") + colon
+        separator = b",\n" + indent
+        yield prefix
+        position += len(prefix)
+        offsets[note_id] = [position, len(raw), size]
+        yield raw
+        position += len(raw)
+    yield b"\n}"
+
+
+def content_index_path(content_path):
+    """notes.json -> notes.index.json"""
+    root, _ = os.path.splitext(content_path)
+    return root + ".index.json"
+
+
+def write_content_index(writer, content_path, offsets):
+    """Persist offsets for content_path, stamped with the file's current size/mtime"""
+    stat = os.stat(content_path)
+    index = {
+        "version": CONTENT_INDEX_VERSION,
+        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets,
+    }
+    writer.write(content_index_path(content_path), json.dumps(index, separators=(",", ":")))
+
+
+def read_content_index(content_path):
+    """Return the offsets for content_path, or None if the index is missing or stale"""
+    try:
+        stat = os.stat(content_path)
+        with open(content_index_path(content_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != CONTENT_INDEX_VERSION:
+        return None
+    # Anything that rewrote the file behind our back (git checkout, editor) changes these
+    if index.get("size") != stat.st_size or index.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    return index.get("offsets")
+
+
+# COMPRESSED BODIES - {"codec": ..., "data": base64} stands in for the string.
+# Readers that predate this get a dict instead of text and fail loudly.
+COMPRESS_THRESHOLD = 64 * 1024  # characters; smaller bodies never pay off
+CODECS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def compress_body(text, codec):
+    """The content map value for text stored with codec"""
+    compress, _ = CODECS[codec]
+    data = compress(text.encode("utf-8"))
+    return {"codec": codec, "data": base64.b64encode(data).decode("ascii")}
+
+
+def decode_body(value):
+    """Plain text for a content map value, compressed or not"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict) and value.get("codec") in CODECS:
+        _, decompress = CODECS[value["codec"]]
+        return decompress(base64.b64decode(value["data"])).decode("utf-8")
+    raise ValueError(f"Unsupported note body encoding: {str(value)[:60]}")
+
+
+def decode_content_map(content_map):
+    """Decode every compressed value of a content map in place"""
+    for note_id, value in content_map.items():
+        if not isinstance(value, str):
+            content_map[note_id] = decode_body(value)
+    return content_map
+
+
+# Content maps at least this big are streamed instead of parsed in one go
+STREAM_THRESHOLD = 16 * 1024 * 1024
+STREAM_CHUNK = 1024 * 1024  # characters read per refill
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_content_map(path, chunk_size=STREAM_CHUNK):
+    """Yield (note_id, value) from a content map without parsing it whole.
+
+    Only the current entry (plus one read chunk) is held as text, so the
+    caller decides what is retained: keep the values it needs, drop the rest.
+    Raises json.JSONDecodeError on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def refill(minimum):
+            # Drop what was consumed; read at least as much as is still pending,
+            # so an entry spanning many chunks costs O(n), not O(n^2)
+            nonlocal buffer, position, eof
+            text = f.read(max(minimum, len(buffer) - position))
+            eof = not text
+            buffer = buffer[position:] + text
+            position = 0
+
+        def peek():
+            nonlocal position
+            while True:
+                position = _WHITESPACE.match(buffer, position).end()
+                if position < len(buffer) or eof:
+                    return buffer[position:position + 1]
+                refill(chunk_size)
+
+        def decode(scan):
+            # Retry with more text until the value is complete or the file ends
+            nonlocal position
+            while True:
+                try:
+                    value, end = scan()
+                    if end < len(buffer) or eof:
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                refill(chunk_size)
+
+        def expect(char):
+            nonlocal position
+            if peek() != char:
+                raise json.JSONDecodeError(f"Expecting '{char}'", buffer, position)
+            position += 1
+
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            if peek() != '"':
+                raise json.JSONDecodeError("Expecting property name", buffer, position)
+            note_id = decode(lambda: json.decoder.scanstring(buffer, position + 1))
+            expect(":")
+            if peek() == '"':
+                value = decode(lambda: json.decoder.scanstring(buffer, position + 1))
+            else:
+                value = decode(lambda: decoder.raw_decode(buffer, position))
+            yield note_id, value
+            if peek() == "}":
+                return
+            expect(",")
+
+
+# Content maps as bytes: JSON punctuation is ASCII, and UTF-8 never uses an
+# ASCII byte inside a multi-byte character, so these find the same tokens
+_BYTES_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_BYTES_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_BYTES_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]', re.S)
+
+
+def index_content_map(path):
+    """Offsets of an existing content map, as encode_content_map reports them.
+
+    Rebuilds a missing index without rewriting the file or holding it: the
+    file is mapped and scanned as bytes, and each value is decoded on its
+    own, only to measure its body. Raises ValueError on malformed input.
+    """
+    offsets = {}
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Empty content map: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+            def skip(position):
+                return _BYTES_WHITESPACE.match(data, position).end()
+
+            def expect(position, char):
+                if data[position:position + 1] != char:
+                    raise ValueError(f"Expecting {char!r} at byte {position} of {path}")
+                return skip(position + 1)
+
+            position = expect(skip(0), b"{")
+            if data[position:position + 1] == b"}":
+                return offsets
+            while True:
+                match = _BYTES_STRING.match(data, position)
+                if match is None:
+                    raise ValueError(f"Expecting property name at byte {position} of {path}")
+                note_id = json.loads(match.group())
+                start = expect(skip(match.end()), b":")
+                end = _value_end(data, start)
+                body = decode_body(json.loads(data[start:end]))
+                size = len(body) if body.isascii() else len(body.encode("utf-8"))
+                offsets[note_id] = [start, end - start, size]
+                position = skip(end)
+                if data[position:position + 1] == b"}":
+                    return offsets
+                position = expect(position, b",")
+
+
+def _value_end(data, start):
+    """End of the string or {"codec": ...} object starting at start"""
+    if data[start:start + 1] == b'"':
+        match = _BYTES_STRING.match(data, start)
+        if match is not None:
+            return match.end()
+    elif data[start:start + 1] == b"{":
+        depth = 0
+        for match in _BYTES_TOKEN.finditer(data, start):
+            token = match.group()
+            if token == b"{":
+                depth += 1
+            elif token == b"}":
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+    raise ValueError(f"Unsupported content map value at byte {start}")
+
+
+class ContentCache:
+    """Bounded LRU of note bodies that were loaded on demand"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, lock=None):
+        self.max_bytes = max_bytes
+        self.lock = lock or threading.RLock()
+        self._bodies = OrderedDict()  # LazyContent -> text
+        self._size = 0
+
+    def get(self, ref):
+        with self.lock:
+            text = self._bodies.get(ref)
+            if text is not None:
+                self._bodies.move_to_end(ref)
+            return text
+
+    def put(self, ref, text):
+        with self.lock:
+            if ref in self._bodies:
+                return
+            self._bodies[ref] = text
+            self._size += len(text)
+            # Always keep the newest body, even if it alone is over budget
+            while self._size > self.max_bytes and len(self._bodies) > 1:
+                _, evicted = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self._bodies.clear()
+            self._size = 0
+
+
+class LazyContent:
+    """Where a note body lives inside a content map, read on first access"""
+
+    __slots__ = ("path", "offset", "length", "body_size", "cache")
+
+    def __init__(self, path, offset, length, body_size, cache):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.body_size = body_size  # UTF-8 bytes of the decoded body
+        self.cache = cache
+
+    def size(self):
+        return self.body_size
+
+    def read_raw(self):
+        """The JSON-encoded value exactly as stored"""
+        with self.cache.lock:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                raw = f.read(self.length)
+        if len(raw) != self.length:
+            raise IOError(f"Content index out of date for {self.path}")
+        return raw
+
+    def read(self):
+        text = self.cache.get(self)
+        if text is None:
+            text = decode_body(json.loads(self.read_raw()))
+            self.cache.put(self, text)
+        return text
+
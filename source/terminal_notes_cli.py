@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# terminal_notes_cli.py - headless entry point for scripts, cron jobs and pipes
+import sys
+
+sys.dont_write_bytecode = True
+import os
+import json
+import argparse
+from terminal_notes_core import Note, NoteManager
+from search_system import SimpleSearch
+from timeline_engine import TimelineEngine
+from git_resurrection import GitHistoryMiner
+from notebook_importer import INGEST_WORKERS, NotebookImporter
+
+# Every command reads and writes JSON lines, one record per line:
+#   echo '{"title": "Standup", "content": "..."}' | python terminal_notes_cli.py add Work
+#   python terminal_notes_cli.py search invoice | jq -r .id
+# Only the notebooks named on the command line are loaded, and all changes of
+# one run land in a single save and a single git commit.
+
+
+class CliError(Exception):
+    """Bad input or an unknown notebook/note; reported as JSON on stderr"""
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_records(stream):
+    """JSON objects from stdin, one per line (blank lines skipped)"""
+    records = []
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise CliError(f"stdin line {line_number}: {e}")
+        if not isinstance(record, dict):
+            raise CliError(f"stdin line {line_number}: expected a JSON object")
+        records.append(record)
+    return records
+
+
+def split_path(path):
+    return [part for part in path.split("/") if part]
+
+
+class TerminalNotesCli:
+    def __init__(self, manager):
+        self.manager = manager
+
+    # NOTEBOOK / NOTE LOOKUP
+    def open_path(self, path, create=False):
+        """Root/Sub/Sub notebook, loading only its root folder"""
+        parts = split_path(path)
+        if not parts:
+            raise CliError("Empty notebook path")
+        notebook = self.manager.open_notebook(parts[0])
+        if notebook is None:
+            raise CliError(f"Unknown notebook '{parts[0]}'")
+        for name in parts[1:]:
+            child = next((nb for nb in notebook.subnotebooks if nb.name == name), None)
+            if child is None:
+                if not create:
+                    raise CliError(f"No subnotebook '{name}' in '{notebook.name}'")
+                child = self.manager.create_subnotebook(notebook, name)
+            notebook = child
+        return notebook
+
+    def path_of(self, notebook):
+        return "/".join(nb.name for nb in self.manager.get_notebook_hierarchy(notebook.id))
+
+    def find_note(self, notebook, record):
+        """The note a record points at, by "id" or else by "title" """
+        if record.get("id"):
+            note = self.manager._notes_by_id.get(record["id"])
+            if note is None:
+                raise CliError(f"Unknown note id '{record['id']}'")
+            return note
+        title = record.get("title")
+        if title is None:
+            raise CliError("Record needs an 'id' or a 'title'")
+        for note, _ in self.walk_notes(notebook):
+            if note.title == title:
+                return note
+        raise CliError(f"No note titled '{title}' in '{notebook.name}'")
+
+    def walk_notes(self, notebook):
+        """(note, parent) for every note under notebook, depth first"""
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            for note in current.notes:
+                yield note, current
+            stack.extend(reversed(current.subnotebooks))
+
+    def note_record(self, note, parent, content=True):
+        record = {
+            "id": note.id,
+            "title": note.title,
+            "notebook": self.path_of(parent),
+            "type": "file" if note.is_file_note else "note",
+            "extension": note.file_extension,
+            "created": note.created.isoformat(),
+            "updated": note.updated.isoformat(),
+        }
+        if content:
+            record["content"] = note.content
+        return record
+
+    # COMMANDS
+    def cmd_ls(self, args):
+        if not args.notebook:
+            for notebook_id, info in sorted(self.manager.registry.data["notebooks"].items(),
+                                            key=lambda item: item[1]["name"].lower()):
+                emit({"id": notebook_id, "name": info["name"], "path": info["path"],
+                      "created": info.get("created")})
+            return
+        notebook = self.open_path(args.notebook)
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            for subnotebook in current.subnotebooks:
+                emit({"id": subnotebook.id, "title": subnotebook.name, "notebook": self.path_of(current),
+                      "type": "notebook", "notes": subnotebook.get_total_note_count()})
+            for note in current.notes:
+                emit(self.note_record(note, current, content=False))
+            if args.recursive:
+                stack.extend(reversed(current.subnotebooks))
+
+    def cmd_add(self, args):
+        records = read_records(sys.stdin)
+        for record in records:
+            if "title" not in record:
+                raise CliError("Every record needs a 'title'")
+        notebook = self.open_path(args.notebook)
+        root = self.manager._find_root_notebook(notebook)
+        git_manager = self.manager.get_git_manager(root)
+        with self.manager.transaction(root, f"cli add: {len(records)} notes"):
+            for record in records:
+                target = notebook
+                if record.get("path"):
+                    target = self.open_path(f"{args.notebook}/{record['path']}", create=True)
+                content = str(record.get("content", ""))
+                note = Note(str(record["title"]), content, created_with=record.get("editor", "cli"))
+                if record.get("extension"):
+                    note.file_extension = record["extension"].lstrip(".")
+                self.manager.add_note(target, note)
+                if note.is_file_note:
+                    git_manager.commit_file_creation(note.id, note.title, root.name, note.file_extension, content)
+                else:
+                    git_manager.commit_note_creation(note.id, note.title, root.name, note.created_with, content)
+                emit(self.note_record(note, target, content=False))
+
+    def cmd_append(self, args):
+        records = read_records(sys.stdin)
+        notebook = self.open_path(args.notebook)
+        root = self.manager._find_root_notebook(notebook)
+        notes = [self.find_note(notebook, record) for record in records]  # fail before changing anything
+        git_manager = self.manager.get_git_manager(root)
+        with self.manager.transaction(root, f"cli append: {len(records)} notes"):
+            for note, record in zip(notes, records):
+                old_content = note.content
+                addition = str(record.get("content", ""))
+                if old_content and not old_content.endswith("\n") and not args.no_newline:
+                    addition = "\n" + addition
+                self.manager.update_note_content(note, old_content + addition)
+                git_manager.commit_note_edit(note.id, note.title, root.name, old_content, note.content)
+                emit(self.note_record(note, self.manager._note_parents[note.id], content=False))
+
+    def cmd_cat(self, args):
+        notebook = self.open_path(args.notebook)
+        ids = args.ids
+        if not ids and not sys.stdin.isatty():
+            ids = [record.get("id") for record in read_records(sys.stdin)]
+        if not ids:
+            for note, parent in self.walk_notes(notebook):
+                emit(self.note_record(note, parent))
+            return
+        for note_id in ids:
+            note = self.find_note(notebook, {"id": note_id})
+            emit(self.note_record(note, self.manager._note_parents[note.id]))
+
+    def cmd_search(self, args):
+        if args.notebook:
+            self.open_path(args.notebook)
+        else:
+            for notebook_id in list(self.manager.registry.data["notebooks"]):
+                self.manager.open_notebook(notebook_id)
+        for result in SimpleSearch(self.manager, None).search(args.query):
+            if result["type"] == "current_notebook":
+                subnotebook = self.manager.find_notebook_by_id(result["notebook_id"])
+                emit({"id": subnotebook.id, "title": subnotebook.name, "type": "notebook",
+                      "notebook": self.path_of(self.manager.find_notebook_by_id(result["parent_id"]))})
+                continue
+            note, parent = self.manager.find_note_by_id(result["notebook_id"], result["note_id"])
+            if note is not None:
+                emit(self.note_record(note, parent, content=args.content))
+
+    def cmd_history(self, args):
+        notebook = self.open_path(args.notebook)
+        engine = TimelineEngine(self.manager)
+        try:
+            for version in engine.get_item_timeline(args.id, notebook.id):
+                record = {
+                    "commit": version["commit_hash"],
+                    "date": version["date"].isoformat(),
+                    "subject": version["commit_message"].splitlines()[0] if version["commit_message"] else "",
+                    "type": version.get("item_type"),
+                    "title": version.get("title"),
+                }
+                if args.content:
+                    record["content"] = version.get("content")
+                emit(record)
+        finally:
+            engine.cleanup()
+
+    def cmd_resurrect(self, args):
+        notebook = self.open_path(args.notebook)
+        miner = GitHistoryMiner(self.manager)
+        try:
+            found = [item for item in miner.find_deleted_items(args.query)
+                     if item.get("notebook_path") == self.manager.get_notebook_folder_path(notebook)]
+            if not args.restore:
+                for item in found:
+                    emit({"id": item["uuid"], "title": item["title"],
+                          "type": "notebook" if item.get("is_subnotebook") else
+                                  "file" if item.get("is_file_note") else "note",
+                          "commit": item.get("commit_message", "").splitlines()[0]
+                          if item.get("commit_message") else "",
+                          "content": item.get("content")})
+                return
+            self.restore(notebook, found)
+        finally:
+            miner.cleanup_temp_files()
+
+    def restore(self, notebook, found):
+        """Put deleted notes back under notebook with their old ids, so their history continues"""
+        root = self.manager._find_root_notebook(notebook)
+        git_manager = self.manager.get_git_manager(root)
+        with self.manager.transaction(root, "cli resurrect"):
+            for item in found:
+                if item.get("is_subnotebook") or item["uuid"] in self.manager._notes_by_id:
+                    continue
+                note = Note.from_dict(dict(item["item_info"], id=item["uuid"]))
+                note.content = item.get("content") or ""
+                self.manager.add_note(notebook, note)
+                if note.is_file_note:
+                    git_manager.commit_file_creation(note.id, note.title, root.name, note.file_extension, note.content)
+                else:
+                    git_manager.commit_note_creation(note.id, note.title, root.name, "resurrected", note.content)
+                emit(self.note_record(note, notebook, content=False))
+
+    def cmd_ingest(self, args):
+        notebook = self.open_path(args.notebook)
+        extensions = args.ext.split(",") if args.ext else None
+        try:
+            stats = NotebookImporter(self.manager, None).ingest_directory(
+                notebook, args.directory, extensions, workers=args.workers
+            )
+        except ValueError as e:
+            raise CliError(str(e))
+        emit(dict(stats, notebook=self.path_of(notebook)))
+
+    def cmd_export(self, args):
+        notebook = self.open_path(args.notebook)
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            parent = self.manager._notebook_parents.get(current.id)
+            emit({"id": current.id, "title": current.name, "type": "notebook",
+                  "notebook": self.path_of(parent) if parent else None})
+            for note in current.notes:
+                emit(self.note_record(note, current))
+            stack.extend(reversed(current.subnotebooks))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Terminal Notes without the UI (JSON lines in and out)")
+    parser.add_argument("--journal", action="store_true", help="append edits to journal.jsonl")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ls = commands.add_parser("ls", help="registered notebooks, or the items of one notebook")
+    ls.add_argument("notebook", nargs="?", help="Notebook or Notebook/Sub/Sub")
+    ls.add_argument("-r", "--recursive", action="store_true")
+
+    add = commands.add_parser("add", help='new notes from stdin: {"title", "content", "extension", "path"}')
+    add.add_argument("notebook")
+
+    append = commands.add_parser("append", help='append to notes from stdin: {"id" or "title", "content"}')
+    append.add_argument("notebook")
+    append.add_argument("--no-newline", action="store_true", help="do not start the addition on a new line")
+
+    cat = commands.add_parser("cat", help="notes with content (ids from args or stdin, default all)")
+    cat.add_argument("notebook")
+    cat.add_argument("ids", nargs="*")
+
+    search = commands.add_parser("search", help="notes whose title or content contains QUERY")
+    search.add_argument("query")
+    search.add_argument("--notebook", help="only search this notebook")
+    search.add_argument("--content", action="store_true", help="include note content")
+
+    history = commands.add_parser("history", help="commits that touched one note or notebook")
+    history.add_argument("notebook")
+    history.add_argument("id")
+    history.add_argument("--content", action="store_true", help="include the content at each commit")
+
+    resurrect = commands.add_parser("resurrect", help="deleted items matching QUERY")
+    resurrect.add_argument("notebook")
+    resurrect.add_argument("query")
+    resurrect.add_argument("--restore", action="store_true", help="add the deleted notes back")
+
+    ingest = commands.add_parser("ingest", help="a directory tree as file notes (folders -> subnotebooks)")
+    ingest.add_argument("notebook")
+    ingest.add_argument("directory")
+    ingest.add_argument("--ext", help="comma-separated extensions to take (default: any)")
+    ingest.add_argument("--workers", type=int, default=INGEST_WORKERS, help="reader threads")
+
+    export = commands.add_parser("export", help="every notebook and note, with content")
+    export.add_argument("notebook")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    manager = NoteManager(journal=args.journal, lazy=True, verbose=False, autoload=False)
+    cli = TerminalNotesCli(manager)
+    try:
+        getattr(cli, "cmd_" + args.command)(args)
+    except CliError as e:
+        sys.stderr.write(json.dumps({"error": str(e)}, ensure_ascii=False) + "\n")
+        return 1
+    except BrokenPipeError:  # `| head` closed stdout; not an error for a pipeline
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
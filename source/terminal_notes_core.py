@@ -11,9 +11,38 @@ import readline
 import traceback
 import uuid
 import re
-from datetime import datetime
+import threading
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from git_manager import GitManager
+from commit_queue import CommitQueue
+from git_object_reader import close_object_reader
+from file_locks import LockTimeout, folder_lock
+from instrumentation import span, timed
+from notebook_journal import NotebookJournal
+from blob_store import LAYOUT_BLOBS, LAYOUT_JSON, BlobContent, BlobStore
+from snapshot_cache import STAMPED_FILES, SnapshotCache
+from notebook_registry import NotebookRegistry, normalize_path_for_comparison
+from serializer import JsonSerializer, load_file
+from storage_engine import (
+    CODECS,
+    COMPRESS_THRESHOLD,
+    STREAM_THRESHOLD,
+    AtomicWriter,
+    ContentCache,
+    LazyContent,
+    compress_body,
+    decode_body,
+    index_content_map,
+    iter_content_map,
+    read_content_index,
+    write_content_index,
+)
+
+# The three-file schema, keyed by the part each file holds
+NOTEBOOK_PARTS = ("structure", "notes", "files")
 
 
 def ensure_uuid(id_value):
@@ -30,15 +59,65 @@ def ensure_uuid(id_value):
     return str(id_value)
 
 
+def intern_str(value):
+    """Share one copy of strings repeated across thousands of items"""
+    return sys.intern(value) if type(value) is str else value
+
+
+# TIMESTAMPS - naive local datetimes kept as integer microseconds since 1970-01-01
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value):
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value):
+    return _EPOCH + timedelta(microseconds=value)
+
+
 class Note:
+    # No per-instance __dict__: a big notebook holds one of these per note
+    __slots__ = (
+        "id", "title", "_content", "_content_ref", "blob", "_encoded",
+        "_created", "_updated", "created_with", "_file_extension",
+    )
+
     def __init__(self, title, content="", note_id=None, created_with="internal"):
-        self.id = ensure_uuid(note_id or datetime.now().strftime("%Y%m%d%H%M%S"))
+        # New items get a real UUID; second-resolution timestamps collided
+        self.id = ensure_uuid(note_id)
         self.title = title
         self.content = content
-        self.created = datetime.now()
-        self.updated = datetime.now()
-        self.created_with = created_with
-        self.file_extension = None
+        self._created = self._updated = to_epoch_us(datetime.now())
+        self.created_with = intern_str(created_with)
+        self._file_extension = None
+
+    # Datetimes are only built when someone asks for them
+    @property
+    def created(self):
+        return from_epoch_us(self._created)
+
+    @created.setter
+    def created(self, value):
+        self._created = to_epoch_us(value)
+
+    @property
+    def updated(self):
+        return from_epoch_us(self._updated)
+
+    @updated.setter
+    def updated(self, value):
+        self._updated = to_epoch_us(value)
+
+    @property
+    def file_extension(self):
+        return self._file_extension
+
+    @file_extension.setter
+    def file_extension(self, value):
+        self._file_extension = intern_str(value)
+        self._encoded = None  # only file notes are compressed
 
     def to_dict(self):
         data = {
@@ -51,6 +130,8 @@ class Note:
         }
         if self.file_extension:
             data["file_extension"] = self.file_extension
+        if self.blob:
+            data["blob"] = self.blob  # BLOB LAYOUT: body lives in blobs/<digest>
         return data
 
     @classmethod
@@ -62,35 +143,85 @@ class Note:
             data["id"],
             data.get("created_with", "internal"),
         )
-        note.created = datetime.fromisoformat(data["created"])
-        note.updated = datetime.fromisoformat(data["updated"])
+        note._created = to_epoch_us(datetime.fromisoformat(data["created"]))
+        note._updated = to_epoch_us(datetime.fromisoformat(data["updated"]))
         note.file_extension = data.get("file_extension")
+        note.blob = data.get("blob")
         return note
 
+    @property
+    def content(self):
+        # LAZY MODE: the body stays on disk until the first read
+        if self._content_ref is not None:
+            return self._content_ref.read()
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content_ref = None
+        self._content = value
+        self._encoded = None  # compressed copy of the old body
+        self.blob = None  # digest is recomputed on the next blob layout save
+
+    def attach_content(self, ref, blob=None):
+        """Point the body at ref (LazyContent, BlobContent) instead of holding it"""
+        self._content = None
+        self._content_ref = ref
+        self._encoded = None
+        self.blob = blob
+
+    @property
+    def is_content_loaded(self):
+        return self._content_ref is None
+
+    def content_size(self):
+        """UTF-8 size of the body, without reading a lazy one from disk"""
+        if self._content_ref is not None:
+            return self._content_ref.size()
+        content = self._content
+        return len(content) if content.isascii() else len(content.encode("utf-8"))
+
     @property
     def is_file_note(self):
         return self.file_extension is not None
 
 class Notebook:
+    __slots__ = ("id", "name", "parent_id", "notes", "subnotebooks", "custom_path", "storage", "_totals")
+
     def __init__(self, name, parent_id=None, notebook_id=None):
-        self.id = ensure_uuid(notebook_id or datetime.now().strftime("%Y%m%d%H%M%S"))
+        self.id = intern_str(ensure_uuid(notebook_id))
         self.name = name
-        self.parent_id = parent_id
+        self.parent_id = intern_str(parent_id)
         self.notes = []
         self.subnotebooks = []
         self.custom_path = None  # 🆕 Custom location storage
+        self.storage = LAYOUT_JSON  # Root only: json maps or per-note blobs
+        self._totals = None
+
+    # AGGREGATES - [notes, file notes, subnotebooks, content bytes] for the whole subtree.
+    # Counted once on first use; NoteManager's mutation helpers keep them current.
+    def subtree_totals(self):
+        if self._totals is None:
+            totals = [
+                len(self.notes),
+                sum(1 for note in self.notes if note.is_file_note),
+                len(self.subnotebooks),
+                sum(note.content_size() for note in self.notes),
+            ]
+            for sub_nb in self.subnotebooks:
+                for i, value in enumerate(sub_nb.subtree_totals()):
+                    totals[i] += value
+            self._totals = totals
+        return self._totals
 
     def get_total_note_count(self):
-        count = len(self.notes)
-        for sub_nb in self.subnotebooks:
-            count += sub_nb.get_total_note_count()
-        return count
+        return self.subtree_totals()[0]
 
     def get_total_subnotebook_count(self):
-        count = len(self.subnotebooks)
-        for sub_nb in self.subnotebooks:
-            count += sub_nb.get_total_subnotebook_count()
-        return count
+        return self.subtree_totals()[2]
+
+    def get_total_content_bytes(self):
+        return self.subtree_totals()[3]
     
 
     def to_dict(self):
@@ -104,6 +235,8 @@ class Notebook:
         # 🆕 Save custom path if exists - FIXED POSITION
         if hasattr(self, 'custom_path') and self.custom_path:
             data["custom_path"] = self.custom_path
+        if self.storage != LAYOUT_JSON:
+            data["storage"] = self.storage
         return data
 
 
@@ -121,25 +254,68 @@ class Notebook:
         # 🆕 Load custom path if exists - FIXED POSITION  
         if "custom_path" in data:
             notebook.custom_path = data["custom_path"]
+        notebook.storage = data.get("storage", LAYOUT_JSON)
         return notebook
     
     def get_file_note_count(self):
-        count = 0
-        for note in self.notes:
-            if note.is_file_note:
-                count += 1
-        for sub_nb in self.subnotebooks:
-            count += sub_nb.get_file_note_count()
-        return count
+        return self.subtree_totals()[1]
 
 
 class NoteManager:
-    def __init__(self):
+    def __init__(self, journal=False, lazy=False, verbose=True, json_format=None, compression=None,
+                 autoload=True, background_commits=False):
         self.notebooks_root = "notebooks_root"
+        # BACKGROUND COMMITS - git runs on a per-repo worker thread, saves don't wait for it
+        self.background_commits = background_commits
+        # autoload=False (scripts, CLI): nothing is read until open_notebook()
+        self.autoload = autoload
+        self.verbose = verbose  # False silences the per-notebook "Loaded ..." lines
+        # LAZY MODE - note bodies are read through notes/files.index.json on first access
+        self.lazy_content = lazy
+        # JOURNAL MODE - saves append to journal.jsonl, compaction rewrites the JSON files
+        self.journal_enabled = journal
+        self._journals = {}  # folder path -> NotebookJournal
+        self._pending_ops = {}  # root notebook id -> journal records not yet appended
+        self._replayed_roots = set()  # roots whose journal was replayed on load
+        self._compactions = []  # background compaction threads, joined by close()
+        self._storage_lock = threading.RLock()
+        self.writer = AtomicWriter()  # Crash-safe temp+fsync+rename for every JSON file
+        # JSON FORMAT - pretty (default) or compact (opt-in), orjson when installed
+        self.serializer = JsonSerializer(json_format)
+        # COMPRESSION - codec for file-note bodies over COMPRESS_THRESHOLD (None = plain)
+        self.compression = compression or os.environ.get("TERMINAL_NOTES_COMPRESS") or None
+        if self.compression is not None and self.compression not in CODECS:
+            raise ValueError(f"Unknown compression codec '{self.compression}' (use {', '.join(CODECS)})")
+        self.content_cache = ContentCache(lock=self._storage_lock)  # resident lazy bodies
         self.ensure_notebooks_root()
+        # REGISTRY - resident, re-read only when the file changes behind our back
+        self.registry = NotebookRegistry(self.get_registry_file(), self.writer)
+        # STARTUP SNAPSHOT - parsed trees of unchanged folders, read in one go
+        self.snapshot = SnapshotCache(self.notebooks_root, self.writer)
+        self._snapshot_stamps = {}  # folder path -> stamp the snapshot file holds
+        # EXTERNAL CHANGES - stamp of each folder as we last read or wrote it
+        self._folder_stamps = {}  # folder path -> snapshot.stamp() tuple
         self.notebooks = []
         self.git_managers = {}  # ADDED: Git managers dictionary
-        self.load_all_notebooks()
+        # UUID INDEX - kept in sync by the mutation helpers below
+        self._notebooks_by_id = {}  # notebook id -> Notebook
+        self._notes_by_id = {}  # note id -> Note
+        self._note_parents = {}  # note id -> containing Notebook
+        self._notebook_parents = {}  # notebook id -> parent Notebook (None for roots)
+        # FOLDER RESOLUTION - filled from the registry, updated on (un)register
+        self._folders_by_id = {}  # root notebook id -> folder path
+        self._root_ids_by_name = {}  # root notebook name -> [root ids], registration order
+        self._root_ids_by_folder = {}  # folder path -> root notebook id
+        # CROSS-PROCESS LOCKS - shared to load a folder, exclusive to save/commit it.
+        # Always taken before _storage_lock.
+        self._folder_locks = {}  # folder path -> FileLock
+        # DIRTY TRACKING - root notebook id -> parts of NOTEBOOK_PARTS to rewrite.
+        # A missing entry means "unknown" and save_notebook writes all three files.
+        self._dirty = {}
+        # TRANSACTIONS - root notebook id -> {"depth", "uuids"} while one is open
+        self._transactions = {}
+        if autoload:
+            self.load_all_notebooks()
     
     # 🆕 ADD THIS METHOD HERE:
     def get_registry_file(self):
@@ -150,20 +326,62 @@ class NoteManager:
         if not os.path.exists(self.notebooks_root):
             os.makedirs(self.notebooks_root)
 
-    def get_notebook_folder_path(self, notebook_name):
-        """Override to handle custom locations"""
-        # First check if we have a notebook with custom path
-        for notebook in self.notebooks:
-            if notebook.name == notebook_name and hasattr(notebook, 'custom_path'):
-                return notebook.custom_path
-    
-        # Fallback to default location
+    def get_notebook_folder_path(self, notebook):
+        """Folder of a root notebook - pass the Notebook (any level) or a root name"""
+        custom_path = None
+        if isinstance(notebook, Notebook):
+            root_notebook = self._find_root_notebook(notebook)
+            folder_path = self._folders_by_id.get(root_notebook.id)
+            if folder_path is not None:
+                return folder_path
+            notebook_name = root_notebook.name
+            custom_path = root_notebook.custom_path
+        else:
+            notebook_name = notebook
+            root_ids = self._root_ids_by_name.get(notebook_name)
+            if root_ids:
+                # Same-named notebooks: pass the Notebook to pick the right one
+                return self._folders_by_id[root_ids[0]]
+
+        # Not registered (yet) - custom location or the default folder
+        if custom_path:
+            return custom_path
+        return self._default_folder_path(notebook_name)
+
+    def _default_folder_path(self, notebook_name):
         folder_name = notebook_name.replace(" ", "-")
         return os.path.join(self.notebooks_root, folder_name)
 
-    def get_notebook_file_paths(self, notebook_name):
+    def _set_notebook_folder(self, notebook, folder_path):
+        """Point the resolver for a root notebook at folder_path"""
+        self._forget_notebook_folder(notebook.id)
+        self._folders_by_id[notebook.id] = folder_path
+        self._root_ids_by_name.setdefault(notebook.name, []).append(notebook.id)
+        self._root_ids_by_folder[folder_path] = notebook.id
+
+    def _forget_notebook_folder(self, notebook_id):
+        folder_path = self._folders_by_id.pop(notebook_id, None)
+        if folder_path is None:
+            return
+        if self._root_ids_by_folder.get(folder_path) == notebook_id:
+            del self._root_ids_by_folder[folder_path]
+        for name, root_ids in list(self._root_ids_by_name.items()):
+            if notebook_id in root_ids:
+                root_ids.remove(notebook_id)
+                if not root_ids:
+                    del self._root_ids_by_name[name]
+
+    def _folder_lock(self, folder_path):
+        with self._storage_lock:
+            lock = self._folder_locks.get(folder_path)
+            if lock is None:
+                lock = folder_lock(folder_path)
+                self._folder_locks[folder_path] = lock
+            return lock
+
+    def get_notebook_file_paths(self, notebook):
         """Return paths for all three JSON files"""
-        folder_path = self.get_notebook_folder_path(notebook_name)
+        folder_path = self.get_notebook_folder_path(notebook)
         structure_file = os.path.join(folder_path, "structure.json")
         notes_file = os.path.join(folder_path, "notes.json")      # 🆕
         files_file = os.path.join(folder_path, "files.json")      # 🆕
@@ -171,47 +389,8 @@ class NoteManager:
 
     def notebook_exists(self, notebook_name):
         """Check if notebook exists by name in registry ONLY"""
-        registry_data = self.load_registry()
-    
-        # Check registry ONLY for existing notebook with same name
-        for notebook_info in registry_data["notebooks"].values():
-            if notebook_info["name"] == notebook_name:
-                return True
-    
-        return False  # 🆕 NO FALLBACK TO FILE SYSTEM CHECK
-
-    def save_notebook(self, notebook):
-        # Only root notebooks get their own folders
-        if notebook.parent_id is not None:
-            # This is a subnotebook - save through its root parent
-            root_notebook = self._find_root_notebook(notebook)
-            if root_notebook:
-                self.save_notebook(root_notebook)  # Save the entire hierarchy
-            return
-
-        # Only root notebooks reach this point
-        folder_path = self.get_notebook_folder_path(notebook.name)
-        os.makedirs(folder_path, exist_ok=True)
-
-        structure_file, notes_file, files_file = self.get_notebook_file_paths(notebook.name)
-
-        # SAVE STRUCTURE (metadata only - no content)
-        structure_data = notebook.to_dict()
-        with open(structure_file, "w") as f:
-            json.dump(structure_data, f, indent=2)
-
-        # 🆕 FIX: Use the correct method with THREE parameters
-        notes_map = {}
-        files_map = {}
-        self._extract_file_content_from_notebook(notebook, notes_map, files_map)  # ✅ CORRECT
-
-        # SAVE NOTES.JSON (internal notes only)
-        with open(notes_file, "w") as f:
-            json.dump(notes_map, f, indent=2)
-
-        # SAVE FILES.JSON (file notes only)  
-        with open(files_file, "w") as f:
-            json.dump(files_map, f, indent=2)
+        # 🆕 NO FALLBACK TO FILE SYSTEM CHECK
+        return self.registry.has_name(notebook_name)
 
     def _extract_file_content_from_notebook(self, notebook, notes_map, files_map):
         """Separate note content and file content"""
@@ -226,7 +405,8 @@ class NoteManager:
         for sub_nb in notebook.subnotebooks:
             self._extract_file_content_from_notebook(sub_nb, notes_map, files_map)
 
-    def _apply_file_content_to_notebook(self, notebook, notes_map, files_map):
+    @staticmethod
+    def _apply_file_content_to_notebook(notebook, notes_map, files_map):
         """Apply separated content back to notes"""
         for note in notebook.notes:
             if note.is_file_note and note.id in files_map:
@@ -235,54 +415,69 @@ class NoteManager:
                 note.content = notes_map[note.id]
 
         for sub_nb in notebook.subnotebooks:
-            self._apply_file_content_to_notebook(sub_nb, notes_map, files_map)
+            NoteManager._apply_file_content_to_notebook(sub_nb, notes_map, files_map)
 
     def load_notebook(self, notebook_name):
-        structure_file, notes_file, files_file = self.get_notebook_file_paths(notebook_name)
-
-        if not os.path.exists(structure_file):
-            return None
-
-        with open(structure_file, "r") as f:
-            structure_data = json.load(f)
-
-        notebook = Notebook.from_dict(structure_data)
-
-        # 🆕 CLEAN SEPARATED LOADING
-        notes_map = {}
-        files_map = {}
-
-        if os.path.exists(notes_file):
-            with open(notes_file, "r") as f:
-                notes_map = json.load(f)
-
-        if os.path.exists(files_file):
-            with open(files_file, "r") as f:
-                files_map = json.load(f)
-
-        self._apply_file_content_to_notebook(notebook, notes_map, files_map)  # ✅ CORRECT
-        return notebook
+        """Load a root notebook by name from whichever storage layout it uses"""
+        return self.load_notebook_from_path(self.get_notebook_folder_path(notebook_name))
 
+    @timed("load_all_notebooks")
     def load_all_notebooks(self):
         """Load notebooks from registry ONLY and clean missing entries"""
         self.notebooks = []
+        self._clear_index()
+        self._dirty = {}
+        self._folders_by_id = {}
+        self._root_ids_by_name = {}
+        self._root_ids_by_folder = {}
+        self._folder_stamps = {}
     
         # 🆕 LOAD FROM REGISTRY AND CLEAN MISSING NOTEBOOKS
         registry_data = self.load_registry()
         notebooks_to_remove = []
     
+        entries = list(registry_data["notebooks"].items())
+        snapshot_entries = self.snapshot.load(self.lazy_content)
+        fresh_entries = {}  # what the snapshot should hold after this load
+
+        def load_entry(entry):
+            folder_path = entry[1]["path"]
+            if not os.path.exists(folder_path):
+                return False, None, None, None
+            try:
+                # Stamp before reading so a concurrent write invalidates the entry
+                stamp = self.snapshot.stamp(folder_path)
+                tree = self.snapshot.lookup(snapshot_entries, folder_path, stamp)
+                if tree is not None:
+                    return True, self._restore_snapshot_tree(tree, folder_path), None, (stamp, tree)
+                return True, self.load_notebook_from_path(folder_path), None, (stamp, None)
+            except Exception as e:
+                return True, None, e, None
+
+        # PARALLEL LOAD - file I/O of different notebooks overlaps well; map keeps registry order
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(entries)))) as pool:
+            results = list(pool.map(load_entry, entries))
+
         # Load all notebooks from registry and track missing ones
-        for notebook_id, notebook_info in registry_data["notebooks"].items():
+        for (notebook_id, notebook_info), (exists, notebook, error, cached) in zip(entries, results):
             folder_path = notebook_info["path"]
         
-            if os.path.exists(folder_path):
-                try:
-                    notebook = self.load_notebook_from_path(folder_path)
-                    if notebook and notebook.parent_id is None:
-                        self.notebooks.append(notebook)
+            if exists:
+                if error is not None:
+                    print(f"Error: Could not load notebook '{notebook_info['name']}': {error}")
+                elif notebook and notebook.parent_id is None:
+                    self.notebooks.append(notebook)
+                    self._index_notebook(notebook)
+                    self._set_notebook_folder(notebook, folder_path)
+                    self._folder_stamps[folder_path] = cached[0]
+                    if notebook.id not in self._replayed_roots:
+                        self._dirty[notebook.id] = set()  # matches disk
+                        stamp, tree = cached
+                        fresh_entries[folder_path] = (stamp, notebook if tree is None else tree)
+                    elif self.journal_enabled:
+                        self._dirty[notebook.id] = set()  # JSON + journal tail, as on disk
+                    if self.verbose:
                         print(f"Loaded notebook: {notebook.name} from {folder_path}")
-                except Exception as e:
-                    print(f"Error: Could not load notebook '{notebook_info['name']}': {e}")
             else:
                 # 🆕 NOTEBOOK PATH MISSING - MARK FOR REMOVAL
                 print(f"Removing missing notebook: {notebook_info['name']} (path: {folder_path})")
@@ -290,11 +485,17 @@ class NoteManager:
     
         # 🆕 REMOVE MISSING NOTEBOOKS FROM REGISTRY
         if notebooks_to_remove:
-            for notebook_id in notebooks_to_remove:
-                del registry_data["notebooks"][notebook_id]
-            self.save_registry(registry_data)
+            self.registry.remove(*notebooks_to_remove)
             print(f"Cleaned {len(notebooks_to_remove)} missing notebooks from registry")
+
+        # Rebuild the snapshot only when some folder missed it or the set changed
+        missed = any(isinstance(tree, Notebook) for _, tree in fresh_entries.values())
+        if missed or fresh_entries.keys() != snapshot_entries.keys():
+            self._save_snapshot(fresh_entries)
+        else:
+            self._snapshot_stamps = {folder: stamp for folder, (stamp, _) in fresh_entries.items()}
                         
+    @timed("load_notebook")
     def load_notebook_from_path(self, folder_path):
         """Load notebook from any folder path"""
         structure_file = os.path.join(folder_path, "structure.json")
@@ -304,8 +505,11 @@ class NoteManager:
         if not os.path.exists(structure_file):
             return None
 
-        with open(structure_file, "r") as f:
-            structure_data = json.load(f)
+        with self._folder_lock(folder_path).shared():
+            return self._load_notebook_locked(folder_path, structure_file, notes_file, files_file)
+
+    def _load_notebook_locked(self, folder_path, structure_file, notes_file, files_file):
+        structure_data = load_file(structure_file)
 
         notebook = Notebook.from_dict(structure_data)
 
@@ -315,29 +519,700 @@ class NoteManager:
             pass
         else:
             # Determine if this is a custom path
-            default_path = self.get_notebook_folder_path(notebook.name)
+            default_path = self._default_folder_path(notebook.name)
             if folder_path != default_path:
                 notebook.custom_path = folder_path
 
         # 🆕 FIX: Use the new three-file loading system
-        notes_map = {}
-        files_map = {}
-    
-        if os.path.exists(notes_file):
-            with open(notes_file, "r") as f:
-                notes_map = json.load(f)
+        if notebook.storage == LAYOUT_BLOBS:
+            self._attach_blob_content(notebook, folder_path)
+        elif not (self.lazy_content and self._attach_lazy_content(notebook, notes_file, files_file)):
+            self._load_content_maps(notebook, notes_file, files_file)
 
-        if os.path.exists(files_file):
-            with open(files_file, "r") as f:
-                files_map = json.load(f)
+        # REPLAY any journal tail that was not compacted yet
+        records = self._get_journal(folder_path).read()
+        if records:
+            self._replay_journal(notebook, records)
+            self._replayed_roots.add(notebook.id)
 
-        self._apply_file_content_to_notebook(notebook, notes_map, files_map)  # ✅ CORRECT
+        return notebook
+
+    def _load_content_maps(self, notebook, notes_file, files_file, parts=("notes", "files")):
+        """Eager load: small maps parse in one go, big ones stream into the notes.
+
+        Streaming keeps peak memory near the bodies actually retained; ids the
+        structure does not know are read past and dropped.
+        """
+        notes_by_part = {"notes": {}, "files": {}}
+        for note in self._iter_notes(notebook):
+            notes_by_part[self._content_part(note)][note.id] = note
+
+        for part, content_file in (("notes", notes_file), ("files", files_file)):
+            if part not in parts or not os.path.exists(content_file):
+                continue
+            if os.path.getsize(content_file) < STREAM_THRESHOLD:
+                entries = load_file(content_file).items()
+            else:
+                entries = iter_content_map(content_file)
+            notes = notes_by_part[part]
+            for note_id, content in entries:
+                note = notes.get(note_id)
+                if note is not None:
+                    note.content = decode_body(content)
+                    if isinstance(content, dict) and content.get("codec") == self.compression:
+                        note._encoded = self.serializer.dump_value(content)  # saves reuse it
+
+    def _attach_lazy_content(self, notebook, notes_file, files_file):
+        """Point every note at its body on disk, indexing content maps that have
+        no current index; False if one cannot be read as a content map"""
+        offsets_by_part = {}
+        for part, content_file in (("notes", notes_file), ("files", files_file)):
+            if not os.path.exists(content_file):
+                offsets_by_part[part] = {}
+                continue
+            offsets = read_content_index(content_file)
+            if offsets is None:
+                # Never indexed (saved eagerly) or changed behind our back: scan it.
+                # Only the derived index is written, so the shared lock is enough.
+                try:
+                    offsets = index_content_map(content_file)
+                except (OSError, ValueError):
+                    return False  # Eager load reports what is wrong with the file
+                write_content_index(self.writer, content_file, offsets)
+            offsets_by_part[part] = offsets
+
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            for note in current.notes:
+                if note.is_file_note:
+                    content_file, offsets = files_file, offsets_by_part["files"]
+                else:
+                    content_file, offsets = notes_file, offsets_by_part["notes"]
+                if note.id in offsets:
+                    offset, length, size = offsets[note.id]
+                    note._content_ref = LazyContent(content_file, offset, length, size, self.content_cache)
+            stack.extend(current.subnotebooks)
+        return True
+
+    def _attach_blob_content(self, notebook, folder_path):
+        """BLOB LAYOUT: every note points at blobs/<digest> (read now unless lazy)"""
+        store = BlobStore(folder_path, self.writer)
+        for note in self._iter_notes(notebook):
+            self._attach_blob(note, store)
+
+    def _attach_blob(self, note, store):
+        digest = note.blob
+        if not digest:
+            return
+        if self.lazy_content:
+            note._content_ref = BlobContent(store, digest, self.content_cache)
+        else:
+            note.content = store.get(digest)
+            note.blob = digest
+
+    def _iter_notes(self, notebook):
+        """Every note in a notebook and its subnotebooks"""
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            yield from current.notes
+            stack.extend(current.subnotebooks)
+
+    # STARTUP SNAPSHOT - trees as plain tuples (layout versioned in snapshot_cache.py)
+    def _snapshot_tree(self, notebook):
+        notes = []
+        for note in notebook.notes:
+            ref = note._content_ref
+            if ref is None and not self.lazy_content:
+                # EAGER: bodies stay in notes.json / files.json (or blobs/), not here too
+                content = None if note.blob else False
+            elif ref is None:
+                content = note._content
+            elif isinstance(ref, LazyContent):
+                content = (ref.offset, ref.length, ref.body_size)
+            elif isinstance(ref, BlobContent):
+                content = None  # note.blob says where
+            else:
+                content = note.content  # some other ref: keep the body itself
+            notes.append((
+                note.id, note.title, note._created, note._updated,
+                note.created_with, note.file_extension, note.blob, content,
+            ))
+        subnotebooks = [self._snapshot_tree(sub_nb) for sub_nb in notebook.subnotebooks]
+        return (
+            notebook.id, notebook.name, notebook.parent_id,
+            notebook.custom_path, notebook.storage, notes, subnotebooks,
+        )
 
+    def _restore_snapshot_tree(self, tree, folder_path, store=None):
+        """Rebuild a tree without parsing structure.json (mirror of _snapshot_tree).
+        Eager mode still reads the bodies, from the content maps or blobs/."""
+        notebook_id, name, parent_id, custom_path, storage, notes, subnotebooks = tree
+        root = store is None
+        if root:
+            store = BlobStore(folder_path, self.writer)
+        notes_file = os.path.join(folder_path, "notes.json")
+        files_file = os.path.join(folder_path, "files.json")
+
+        notebook = Notebook.__new__(Notebook)
+        notebook.id = intern_str(notebook_id)
+        notebook.name = name
+        notebook.parent_id = intern_str(parent_id)
+        notebook.custom_path = custom_path
+        notebook.storage = storage
+        notebook._totals = None
+        notebook.notes = []
+        for note_id, title, created, updated, created_with, extension, blob, content in notes:
+            note = Note.__new__(Note)
+            note.id = note_id
+            note.title = title
+            note._created = created
+            note._updated = updated
+            note.created_with = intern_str(created_with)
+            note._file_extension = intern_str(extension)
+            note.blob = blob
+            note._content = None
+            note._content_ref = None
+            note._encoded = None
+            if isinstance(content, str):
+                note._content = content
+            elif content is False:
+                note._content = ""  # filled in by _load_content_maps below
+            elif content is None:
+                self._attach_blob(note, store)
+            else:
+                content_file = files_file if extension is not None else notes_file
+                note._content_ref = LazyContent(content_file, *content, self.content_cache)
+            notebook.notes.append(note)
+        notebook.subnotebooks = [
+            self._restore_snapshot_tree(sub_tree, folder_path, store) for sub_tree in subnotebooks
+        ]
+        if root and not self.lazy_content and storage != LAYOUT_BLOBS:
+            with self._folder_lock(folder_path).shared():
+                self._load_content_maps(notebook, notes_file, files_file)
         return notebook
-    
-    def save_data(self):
+
+    def _save_snapshot(self, known=None):
+        """Write the snapshot; known maps folder -> (stamp, tuple tree or Notebook)"""
+        if known is None:
+            known = {}
+            registry_notebooks = self.registry.data["notebooks"]
+            for notebook in self.notebooks:
+                info = registry_notebooks.get(notebook.id)
+                if info is None or notebook.id in self._replayed_roots:
+                    continue
+                stamp = self.snapshot.stamp(info["path"])
+                if stamp != self._folder_stamps.get(info["path"]):
+                    continue  # Changed behind our back - this tree is not what is on disk
+                known[info["path"]] = (stamp, notebook)
+            if {folder: stamp for folder, (stamp, _) in known.items()} == self._snapshot_stamps:
+                return  # Nothing changed on disk since the snapshot was written
+
+        entries = {}
+        for folder_path, (stamp, tree) in known.items():
+            if isinstance(tree, Notebook):
+                tree = self._snapshot_tree(tree)
+            entries[folder_path] = (stamp, tree)
+        try:
+            self.snapshot.save(entries, self.lazy_content)
+            self._snapshot_stamps = {folder: stamp for folder, (stamp, _) in entries.items()}
+        except Exception as e:
+            print(f"Warning: Could not save startup snapshot: {e}")
+
+    @staticmethod
+    def fold_journal_data(structure_data, notes_map, files_map, records):
+        """(structure, notes, files) dicts with records replayed onto them: what
+        compaction would have written. History views use it for commits that
+        still carry a journal tail."""
+        notebook = Notebook.from_dict(structure_data)
+        NoteManager._apply_file_content_to_notebook(notebook, notes_map, files_map)
+        NoteManager._replay_journal(notebook, records)
+        notes_map, files_map = {}, {}
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            for note in current.notes:
+                (files_map if note.is_file_note else notes_map)[note.id] = note.content
+            stack.extend(current.subnotebooks)
+        return notebook.to_dict(), notes_map, files_map
+
+    @staticmethod
+    def _replay_journal(notebook, records):
+        """Apply journal records to a freshly loaded tree (records are idempotent)"""
+        notebooks_by_id = {}
+        notes_by_id = {}
+
+        def walk(nb):
+            notebooks_by_id[nb.id] = nb
+            for note in nb.notes:
+                notes_by_id[note.id] = (note, nb)
+            for sub_nb in nb.subnotebooks:
+                walk(sub_nb)
+
+        def drop_note(note_id):
+            found = notes_by_id.pop(note_id, None)
+            if found:
+                found[1].notes.remove(found[0])
+
+        def drop_notebook(notebook_id):
+            nb = notebooks_by_id.get(notebook_id)
+            parent = notebooks_by_id.get(nb.parent_id) if nb else None
+            if nb is None or parent is None:
+                return
+            parent.subnotebooks.remove(nb)
+            walk(nb)  # make sure we know every descendant before dropping
+            stack = [nb]
+            while stack:
+                current = stack.pop()
+                notebooks_by_id.pop(current.id, None)
+                for note in current.notes:
+                    notes_by_id.pop(note.id, None)
+                stack.extend(current.subnotebooks)
+
+        walk(notebook)
+        for record in records:
+            op = record.get("op")
+            if op == "add_note":
+                parent = notebooks_by_id.get(record["parent"])
+                if parent is None:
+                    continue
+                note = Note.from_dict(record["note"])
+                note.content = record.get("content", "")
+                drop_note(note.id)
+                parent.notes.append(note)
+                notes_by_id[note.id] = (note, parent)
+            elif op == "remove_note":
+                drop_note(record["id"])
+            elif op in ("rename_note", "edit_note"):
+                found = notes_by_id.get(record["id"])
+                if not found:
+                    continue
+                note = found[0]
+                if "title" in record:
+                    note.title = record["title"]
+                if "content" in record:
+                    note.content = record["content"]
+                note.updated = datetime.fromisoformat(record["updated"])
+            elif op == "add_notebook":
+                parent = notebooks_by_id.get(record["parent"])
+                if parent is None:
+                    continue
+                sub_nb = Notebook.from_dict(record["notebook"])
+                contents = record.get("contents", {})
+                NoteManager._apply_file_content_to_notebook(sub_nb, contents, contents)
+                drop_notebook(sub_nb.id)
+                parent.subnotebooks.append(sub_nb)
+                walk(sub_nb)
+            elif op == "remove_notebook":
+                drop_notebook(record["id"])
+
+    # JOURNAL
+    def _get_journal(self, folder_path):
+        with self._storage_lock:  # notebooks load on several threads
+            journal = self._journals.get(folder_path)
+            if journal is None:
+                journal = NotebookJournal(folder_path)
+                self._journals[folder_path] = journal
+            return journal
+
+    def _journal_op(self, notebook, record):
+        """Queue a journal record for the root of notebook (journal mode only)"""
+        if self._journaling(notebook):
+            self._pending_ops.setdefault(self._find_root_notebook(notebook).id, []).append(record)
+
+    def _journaling(self, notebook):
+        """Whether the next save of notebook's root appends journal records.
+
+        Not while its dirty parts are unknown: that save rewrites all three
+        files anyway, so records (and the bodies they copy) would be dropped.
+        """
+        if not self.journal_enabled:
+            return False
+        root_notebook = self._find_root_notebook(notebook)
+        return root_notebook is not None and self._dirty.get(root_notebook.id) is not None
+
+    def compact_journal(self, notebook):
+        """Fold the journal of a root notebook into the three JSON files and commit them.
+
+        Runs on close() and once the journal passes its size or age threshold,
+        never per commit: commits take journal.jsonl as it is. Returns True if
+        there was anything to fold.
+        """
+        root_notebook = self._find_root_notebook(notebook)
+        folder_path = self.get_notebook_folder_path(root_notebook)
+        journal = self._get_journal(folder_path)
+        with self._folder_lock(folder_path).exclusive(), self._storage_lock:
+            if not journal.has_records() and root_notebook.id not in self._replayed_roots:
+                return False
+            self._write_notebook_parts(root_notebook, NOTEBOOK_PARTS)
+            self.writer.flush()  # JSON must be durable before the journal goes
+            journal.clear()
+            self._pending_ops.pop(root_notebook.id, None)  # the live tree was just written
+            self._replayed_roots.discard(root_notebook.id)
+            self._remember_folder_stamp(folder_path)
+        try:
+            # Same content, new files: the repo should not be left behind them
+            self.get_git_manager(root_notebook).commit_journal_compaction(root_notebook.id, root_notebook.name)
+        except Exception:
+            pass
+        return True
+
+    def _compact_in_background(self, notebook):
+        thread = threading.Thread(target=self.compact_journal, args=(notebook,), daemon=True)
+        self._compactions = [running for running in self._compactions if running.is_alive()]
+        self._compactions.append(thread)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Flush pending state before the app exits"""
+        self.check_for_external_changes()
         for notebook in self.notebooks:
             self.save_notebook(notebook)
+        for thread in self._compactions:  # their commits must land before git shuts down
+            thread.join()
+        for notebook in self.notebooks:
+            self.compact_journal(notebook)
+            if notebook.storage == LAYOUT_BLOBS:
+                self.collect_blob_garbage(notebook)
+        if self.autoload:  # a partial load would drop the other folders' entries
+            with self._storage_lock:
+                self._save_snapshot()  # next launch skips JSON for every notebook
+        for git_manager in self.git_managers.values():
+            git_manager.close()  # ends fast-import streams, resyncs their index
+
+    # EXTERNAL CHANGES - git pull, another instance, a sync tool
+    def _remember_folder_stamp(self, folder_path):
+        self._folder_stamps[folder_path] = self.snapshot.stamp(folder_path)
+
+    def _stamp_after_commit(self, folder_path):
+        """Record the folder's stamp once our pending writes are on disk"""
+        self.writer.on_commit(lambda: self._remember_folder_stamp(folder_path))
+
+    def _has_unsaved_changes(self, notebook):
+        return (
+            self._dirty.get(notebook.id) != set()
+            or notebook.id in self._pending_ops
+            or notebook.id in self._transactions
+        )
+
+    def check_for_external_changes(self):
+        """Patch in whatever changed on disk since this instance read or wrote it.
+
+        Costs a few stat() calls per notebook, so callers can poll it on every
+        screen refresh. Only changed files are parsed, and the live tree is
+        patched by UUID. Roots with unsaved changes here are left alone (the
+        next save wins). Returns the root notebooks that were updated, added
+        or dropped.
+        """
+        changed = []
+        registered = self.registry.data["notebooks"]
+
+        # Notebooks another instance registered or deleted
+        loaded_ids = {notebook.id for notebook in self.notebooks}
+        for notebook_id, info in list(registered.items()):
+            if self.autoload and notebook_id not in loaded_ids:
+                notebook = self._load_registered_root(notebook_id, info["path"])
+                if notebook is not None:
+                    changed.append(notebook)
+        for notebook in list(self.notebooks):
+            if notebook.id not in registered and not self._has_unsaved_changes(notebook):
+                self.notebooks.remove(notebook)
+                self._unindex_notebook(notebook)
+                self._forget_notebook_folder(notebook.id)
+                self._dirty.pop(notebook.id, None)
+                changed.append(notebook)
+
+        for notebook in self.notebooks:
+            folder_path = self.get_notebook_folder_path(notebook)
+            stamp = self.snapshot.stamp(folder_path)
+            known = self._folder_stamps.get(folder_path)
+            if stamp == known or stamp[0] is None or self._has_unsaved_changes(notebook):
+                continue
+            try:
+                self._reload_changed_files(notebook, folder_path, known, stamp)
+            except Exception as e:
+                # Most likely a half-written file from a non-atomic tool; retry next poll
+                print(f"Warning: Could not reload '{notebook.name}': {e}")
+                continue
+            changed.append(notebook)
+        return changed
+
+    def open_notebook(self, name_or_id):
+        """The root notebook with this id or name, loaded on demand (None if unknown)"""
+        notebook = self._notebooks_by_id.get(name_or_id)
+        if notebook is not None and notebook.parent_id is None:
+            return notebook
+        root_ids = self._root_ids_by_name.get(name_or_id)
+        if root_ids:
+            return self._notebooks_by_id.get(root_ids[0])
+
+        registered = self.registry.data["notebooks"]
+        if name_or_id in registered:
+            candidates = [name_or_id]
+        else:
+            candidates = [notebook_id for notebook_id, info in registered.items() if info["name"] == name_or_id]
+        for notebook_id in candidates:
+            notebook = self._load_registered_root(notebook_id, registered[notebook_id]["path"])
+            if notebook is not None:
+                return notebook
+        return None
+
+    def _load_registered_root(self, notebook_id, folder_path):
+        if not os.path.exists(folder_path):
+            return None
+        stamp = self.snapshot.stamp(folder_path)
+        try:
+            notebook = self.load_notebook_from_path(folder_path)
+        except Exception:
+            return None  # Still being written; the next poll tries again
+        if notebook is None or notebook.id != notebook_id or notebook.parent_id is not None:
+            return None
+        self.add_root_notebook(notebook)
+        self._set_notebook_folder(notebook, folder_path)
+        self._folder_stamps[folder_path] = stamp
+        if notebook.id not in self._replayed_roots or self.journal_enabled:
+            self._dirty[notebook.id] = set()
+        return notebook
+
+    def _reload_changed_files(self, root_notebook, folder_path, known, stamp):
+        """Re-read only the files of the three whose stamp moved and patch the tree"""
+        changed_files = {
+            filename for filename, old, new in zip(STAMPED_FILES, known or (None,) * len(stamp), stamp)
+            if known is None or old != new
+        }
+        structure_file = os.path.join(folder_path, "structure.json")
+        notes_file = os.path.join(folder_path, "notes.json")
+        files_file = os.path.join(folder_path, "files.json")
+
+        with self._folder_lock(folder_path).shared(), self._storage_lock:
+            journal = self._get_journal(folder_path)
+            if journal.has_records():
+                # Journal-mode writer: its records carry the bodies, take the full tree
+                fresh = self._load_notebook_locked(folder_path, structure_file, notes_file, files_file)
+                self._merge_tree(root_notebook, fresh, take_content=True)
+                self._replayed_roots.add(root_notebook.id)
+            else:
+                if "structure.json" in changed_files or "journal.jsonl" in changed_files:
+                    fresh = Notebook.from_dict(load_file(structure_file))
+                    needs_content = self._merge_tree(root_notebook, fresh)
+                else:
+                    needs_content = []
+
+                if root_notebook.storage == LAYOUT_BLOBS:
+                    store = BlobStore(folder_path, self.writer)
+                    for note in needs_content:
+                        self._attach_blob(note, store)
+                else:
+                    parts = {self._content_part(note) for note in needs_content}
+                    parts.update(part for part in ("notes", "files") if f"{part}.json" in changed_files)
+                    if parts and not (self.lazy_content and self._attach_lazy_content(root_notebook, notes_file, files_file)):
+                        self._load_content_maps(root_notebook, notes_file, files_file, parts)
+                    if parts:
+                        self._forget_totals(root_notebook)  # content bytes counted the old bodies
+                self._replayed_roots.discard(root_notebook.id)
+                self._dirty[root_notebook.id] = set()
+
+            if self._root_ids_by_folder.get(folder_path) == root_notebook.id:
+                self._set_notebook_folder(root_notebook, folder_path)  # picks up a rename
+            if folder_path in self.git_managers:  # another instance may have migrated it
+                self.git_managers[folder_path].blob_layout = root_notebook.storage == LAYOUT_BLOBS
+            self._folder_stamps[folder_path] = stamp  # stamped before reading, so a racing write shows up next poll
+
+    def _merge_tree(self, root_notebook, fresh, take_content=False):
+        """Make the live tree look like fresh, keeping every object whose UUID survives.
+
+        Returns the notes whose body must be (re)loaded: new ones, ones that
+        moved between notes.json and files.json, and blobs with a new digest.
+        """
+        if fresh.id != root_notebook.id:
+            raise ValueError("structure.json now holds a different notebook")
+
+        old_notebooks = {}
+        old_notes = {}
+        stack = [root_notebook]
+        while stack:
+            current = stack.pop()
+            old_notebooks[current.id] = current
+            for note in current.notes:
+                old_notes[note.id] = note
+            stack.extend(current.subnotebooks)
+
+        needs_content = []
+
+        def adopt_note(fresh_note, parent):
+            note = old_notes.pop(fresh_note.id, None)
+            if note is None:
+                note = fresh_note
+                needs_content.append(note)
+            else:
+                if note.is_file_note != fresh_note.is_file_note or note.blob != fresh_note.blob:
+                    needs_content.append(note)
+                note.title = fresh_note.title
+                note._created = fresh_note._created
+                note._updated = fresh_note._updated
+                note.created_with = fresh_note.created_with
+                note._file_extension = fresh_note._file_extension
+                if take_content:
+                    note._content_ref = fresh_note._content_ref
+                    note._content = fresh_note._content
+                    note._encoded = fresh_note._encoded
+                note.blob = fresh_note.blob
+            self._notes_by_id[note.id] = note
+            self._note_parents[note.id] = parent
+            return note
+
+        def adopt_notebook(fresh_notebook, parent):
+            notebook = old_notebooks.pop(fresh_notebook.id, None)
+            if notebook is None:
+                notebook = fresh_notebook
+            else:
+                notebook.name = fresh_notebook.name
+                notebook.parent_id = fresh_notebook.parent_id
+                notebook.custom_path = fresh_notebook.custom_path
+                notebook.storage = fresh_notebook.storage
+            self._notebooks_by_id[notebook.id] = notebook
+            self._notebook_parents[notebook.id] = parent
+            notebook.notes = [adopt_note(note, notebook) for note in fresh_notebook.notes]
+            notebook.subnotebooks = [adopt_notebook(sub_nb, notebook) for sub_nb in fresh_notebook.subnotebooks]
+            notebook._totals = None  # recounted on the next request
+            return notebook
+
+        adopt_notebook(fresh, self._notebook_parents.get(root_notebook.id))
+
+        # Whatever was not adopted is gone
+        for note_id in old_notes:
+            self._notes_by_id.pop(note_id, None)
+            self._note_parents.pop(note_id, None)
+        for notebook_id in old_notebooks:
+            self._notebooks_by_id.pop(notebook_id, None)
+            self._notebook_parents.pop(notebook_id, None)
+        return needs_content
+
+    def _forget_totals(self, notebook):
+        """Drop the cached aggregates of a whole subtree (recounted on the next request)"""
+        stack = [notebook]
+        while stack:
+            current = stack.pop()
+            current._totals = None
+            stack.extend(current.subnotebooks)
+
+    # STORAGE LAYOUTS
+    def migrate_notebook_storage(self, notebook, layout):
+        """Rewrite a root notebook in another layout; False if it already uses it"""
+        root_notebook = self._find_root_notebook(notebook)
+        if root_notebook.storage == layout:
+            return False
+
+        folder_path = self.get_notebook_folder_path(root_notebook)
+        with self._folder_lock(folder_path).exclusive(), self._storage_lock:
+            # Pull every body into memory before the old layout goes away
+            for note in self._iter_notes(root_notebook):
+                note.content = note.content
+
+            root_notebook.storage = layout
+            self.get_git_manager(root_notebook).blob_layout = layout == LAYOUT_BLOBS
+            with self.writer.batch():
+                self._write_notebook_parts(root_notebook, NOTEBOOK_PARTS)
+                if layout == LAYOUT_BLOBS:
+                    # Keep the three-file schema intact for importers and git add
+                    for content_file in ("notes.json", "files.json"):
+                        self.writer.write(os.path.join(folder_path, content_file), "{}")
+
+            if layout == LAYOUT_BLOBS:
+                for index_file in ("notes.index.json", "files.index.json"):
+                    index_path = os.path.join(folder_path, index_file)
+                    if os.path.exists(index_path):
+                        os.remove(index_path)
+            self.collect_blob_garbage(root_notebook)
+
+            self._dirty[root_notebook.id] = set()
+            self._pending_ops.pop(root_notebook.id, None)
+            self._get_journal(folder_path).clear()
+            self._replayed_roots.discard(root_notebook.id)
+            self._remember_folder_stamp(folder_path)
+        return True
+
+    def collect_blob_garbage(self, notebook):
+        """Drop blobs no note of this root notebook references any more"""
+        root_notebook = self._find_root_notebook(notebook)
+        live_digests = set()
+        if root_notebook.storage == LAYOUT_BLOBS:
+            live_digests = {note.blob for note in self._iter_notes(root_notebook) if note.blob}
+        folder_path = self.get_notebook_folder_path(root_notebook)
+        with self._folder_lock(folder_path).exclusive(), self._storage_lock:
+            return BlobStore(folder_path, self.writer).collect_garbage(live_digests)
+
+    @timed("save_data")
+    def save_data(self):
+        # One group commit for the whole burst instead of a barrier per file.
+        # Every folder stays locked until the batch is on disk; sorted so two
+        # instances saving everything never wait on each other in a cycle.
+        folders = sorted({self.get_notebook_folder_path(notebook) for notebook in self.notebooks})
+        with ExitStack() as locks:
+            for folder_path in folders:
+                locks.enter_context(self._folder_lock(folder_path).exclusive())
+            with self._storage_lock, self.writer.batch():
+                for notebook in self.notebooks:
+                    self.save_notebook(notebook)
+
+    @contextmanager
+    def transaction(self, notebook, description=""):
+        """Group any number of mutations under one root notebook into one save
+        and one git commit:
+
+            with manager.transaction(notebook):
+                manager.add_note(notebook, note)
+                git_manager.commit_note_creation(...)
+
+        Inside the block save_notebook() only leaves the notebook dirty and
+        commit_* calls are held back; on exit the notebook is saved once and a
+        single BATCH commit lists every deferred message and affected UUID.
+        Nested blocks join the outer one. There is no rollback: if the block
+        raises, whatever it already changed is still saved and committed.
+        A failed commit is printed as a warning; LockTimeout propagates.
+        """
+        root_notebook = self._find_root_notebook(notebook)
+        state = self._transactions.get(root_notebook.id)
+        if state is not None:
+            state["depth"] += 1
+            try:
+                yield state
+            finally:
+                state["depth"] -= 1
+            return
+
+        state = {"depth": 1, "uuids": {}}
+        git_manager = self.get_git_manager(root_notebook)
+        self._transactions[root_notebook.id] = state
+        git_manager.defer_commits()
+        try:
+            yield state
+        finally:
+            del self._transactions[root_notebook.id]
+            messages = git_manager.take_deferred()
+            with git_manager.lock.exclusive():  # no other instance between save and commit
+                self.save_notebook(root_notebook)
+                if messages or state["uuids"]:
+                    error = "git failed"
+                    try:
+                        committed = git_manager.commit_batch(
+                            root_notebook.id, root_notebook.name, messages, state["uuids"], description
+                        )
+                    except LockTimeout:
+                        raise  # saved but not committed: the caller must know the folder is busy
+                    except Exception as e:
+                        committed, error = None, e
+                    if committed is None:
+                        print(f"Warning: Could not commit changes to '{root_notebook.name}': {error}")
+
+    def _track_change(self, notebook, item_id):
+        """Note item_id as affected by the open transaction of notebook's root"""
+        if self._transactions:
+            state = self._transactions.get(self._find_root_notebook(notebook).id)
+            if state is not None:
+                state["uuids"][item_id] = None
 
     def save_notebook(self, notebook):
         # Only root notebooks get their own folders
@@ -347,54 +1222,204 @@ class NoteManager:
                 self.save_notebook(root_notebook)
             return
 
-        folder_path = self.get_notebook_folder_path(notebook.name)
+        if notebook.id in self._transactions:
+            return  # Still dirty; the transaction saves once when it ends
+
+        folder_path = self.get_notebook_folder_path(notebook)
+        with span("save_notebook"), self._folder_lock(folder_path).exclusive(), self._storage_lock:
+            # Only rewrite the files touched since the last load/save
+            parts = self._dirty.get(notebook.id)
+
+            # JOURNAL MODE: append the change records instead of rewriting JSON
+            if self.journal_enabled and parts is not None:
+                records = self._pending_ops.pop(notebook.id, [])
+                if records:
+                    journal = self._get_journal(folder_path)
+                    journal.append(records)
+                    if journal.needs_compaction():
+                        self._compact_in_background(notebook)
+                    self._remember_folder_stamp(folder_path)
+                self._dirty[notebook.id] = set()
+                return
+
+            if parts is None:
+                parts = set(NOTEBOOK_PARTS)
+            if parts:
+                self._write_notebook_parts(notebook, parts)
+            self._dirty[notebook.id] = set()
+            self._pending_ops.pop(notebook.id, None)
+            if set(parts) == set(NOTEBOOK_PARTS):
+                # Everything on disk is current, so any journal tail is folded in
+                self.writer.flush()
+                self._get_journal(folder_path).clear()
+                self._replayed_roots.discard(notebook.id)
+            if parts:
+                self._stamp_after_commit(folder_path)
+
+    def _write_notebook_parts(self, notebook, parts, folder_path=None):
+        """Write the requested files of the three-file schema for a root notebook"""
+        if folder_path is None:
+            folder_path = self.get_notebook_folder_path(notebook)
         os.makedirs(folder_path, exist_ok=True)
 
-        structure_file, notes_file, files_file = self.get_notebook_file_paths(notebook.name)
-
-        # SAVE STRUCTURE (metadata only)
-        structure_data = notebook.to_dict()
-        with open(structure_file, "w") as f:
-            json.dump(structure_data, f, indent=2)
+        structure_file = os.path.join(folder_path, "structure.json")
+        notes_file = os.path.join(folder_path, "notes.json")
+        files_file = os.path.join(folder_path, "files.json")
+
+        # All parts land together: temp files synced, renamed, one folder barrier
+        with self._storage_lock, self.writer.batch():
+            if notebook.storage == LAYOUT_BLOBS:
+                # Content parts become blobs; their digests live in structure.json
+                if "notes" in parts or "files" in parts:
+                    store = BlobStore(folder_path, self.writer)
+                    for note in self._iter_notes(notebook):
+                        if note.blob is None:
+                            note.blob = store.put(note.content)
+                    parts = set(parts) | {"structure"}
+                if "structure" in parts:
+                    self.writer.write(structure_file, self.serializer.dumps(notebook.to_dict()))
+                return
+
+            # SAVE STRUCTURE (metadata only)
+            if "structure" in parts:
+                self.writer.write(structure_file, self.serializer.dumps(notebook.to_dict()))
+
+            # 🆕 SEPARATE CONTENT SAVING
+            if "notes" in parts or "files" in parts:
+                note_list = []
+                file_list = []
+                self._collect_notes_by_part(notebook, note_list, file_list)
+
+                # Save notes.json (internal/vim notes only)
+                if "notes" in parts:
+                    self._write_content_map(notes_file, note_list)
+
+                # Save files.json (file notes only)
+                if "files" in parts:
+                    self._write_content_map(files_file, file_list)
+
+    def _collect_notes_by_part(self, notebook, note_list, file_list):
+        """Like _extract_file_content_from_notebook, but without touching content"""
+        for note in notebook.notes:
+            if note.is_file_note:
+                file_list.append(note)
+            else:
+                note_list.append(note)
 
-        # 🆕 SEPARATE CONTENT SAVING
-        notes_map = {}
-        files_map = {}
-        self._extract_file_content_from_notebook(notebook, notes_map, files_map)
-    
-        # Save notes.json (internal/vim notes only)
-        with open(notes_file, "w") as f:
-            json.dump(notes_map, f, indent=2)
-    
-        # Save files.json (file notes only)
-        with open(files_file, "w") as f:
-            json.dump(files_map, f, indent=2)
+        for sub_nb in notebook.subnotebooks:
+            self._collect_notes_by_part(sub_nb, note_list, file_list)
+
+    def _write_content_map(self, content_file, notes):
+        """Write notes.json/files.json, plus the offset index when lazy loading reads it"""
+        entries = []
+        for note in notes:
+            if note.is_content_loaded:
+                raw = self._encoder_for(note)
+            else:
+                raw = note._content_ref.read_raw  # copy the bytes, never decode them
+            entries.append((note.id, raw, note.content_size()))
+        # Each body is encoded/read as the temp file reaches it, never all at once
+        data, offsets = self.serializer.stream_content_map(entries)
+
+        def after_commit():
+            # Lazy notes now live at new offsets in the new file
+            for note in notes:
+                if not note.is_content_loaded:
+                    offset, length, size = offsets[note.id]
+                    note._content_ref = LazyContent(content_file, offset, length, size, self.content_cache)
+            if self.lazy_content:  # eager loads never read it; skip the extra write + fsync
+                write_content_index(self.writer, content_file, offsets)
+
+        self.writer.write(content_file, data, after=after_commit)
+
+    def _encoder_for(self, note):
+        def encode():
+            if note._encoded is not None:
+                return note._encoded  # body unchanged since it was compressed
+            value = note.content
+            if self.compression and note.is_file_note and len(value) >= COMPRESS_THRESHOLD:
+                # Kept on the note: the next save of files.json copies it as is
+                note._encoded = self.serializer.dump_value(compress_body(value, self.compression))
+                return note._encoded
+            return self.serializer.dump_value(value)
+        return encode
+
+    def mark_dirty(self, notebook, *parts):
+        """Record which of structure/notes/files changed under a notebook"""
+        root_notebook = self._find_root_notebook(notebook)
+        if root_notebook is None:
+            return
+        dirty = self._dirty.get(root_notebook.id)
+        if dirty is not None:  # None already means "write everything"
+            dirty.update(parts)
+
+    def mark_all_dirty(self, notebook):
+        """Forget which parts changed: the next save rewrites all three files,
+        in journal mode too (bulk imports queue no records meanwhile)"""
+        root_notebook = self._find_root_notebook(notebook)
+        if root_notebook is not None:
+            with self._storage_lock:
+                self._dirty.pop(root_notebook.id, None)
+                self._pending_ops.pop(root_notebook.id, None)  # the rewrite covers them
+
+    def _content_part(self, note):
+        return "files" if note.is_file_note else "notes"
+
+    def _subtree_content_parts(self, notebook):
+        parts = set()
+        for note in notebook.notes:
+            parts.add(self._content_part(note))
+        for sub_nb in notebook.subnotebooks:
+            parts |= self._subtree_content_parts(sub_nb)
+        return parts
 
     def delete_notebook(self, notebook_to_delete):
         """Delete notebook using registry as single source of truth"""
         # GET PATH FROM REGISTRY BEFORE UNREGISTERING
-        registry_data = self.load_registry()
-        notebook_path = None
-    
-        if notebook_to_delete.id in registry_data["notebooks"]:
-            notebook_path = registry_data["notebooks"][notebook_to_delete.id]["path"]
+        notebook_info = self.registry.get(notebook_to_delete.id)
+        notebook_path = notebook_info["path"] if notebook_info else None
     
         # Remove from memory list
         for i, notebook in enumerate(self.notebooks):
             if notebook.id == notebook_to_delete.id:
                 self.notebooks.pop(i)
+                self._unindex_notebook(notebook)
+                self._dirty.pop(notebook.id, None)
+                self._pending_ops.pop(notebook.id, None)
                 break
     
         # Unregister from registry (this removes the entry)
         self.unregister_notebook(notebook_to_delete.id)
+        git_manager = self.git_managers.pop(notebook_path, None)
+        if git_manager is not None:
+            git_manager.close()
     
         # DELETE FROM DISK using registry path
         if notebook_path and os.path.exists(notebook_path):
-            shutil.rmtree(notebook_path)
+            close_object_reader(notebook_path)  # its cat-file process lives in the folder
+            with self._folder_lock(notebook_path).exclusive():
+                shutil.rmtree(notebook_path)
+            self._folder_locks.pop(notebook_path, None)
+
+    def pending_commits(self):
+        """Commits queued for the background workers, all repos"""
+        return sum(git_manager.pending_commits() for git_manager in list(self.git_managers.values()))
+
+    def failed_commits(self):
+        """Queued commits dropped after every retry failed, all repos"""
+        return sum(git_manager.failed_commits() for git_manager in list(self.git_managers.values()))
+
+    def wait_for_commits(self):
+        """Block until queued commits are in git (history views read from it).
+        Not with a folder lock held: index commits wait for that lock."""
+        for git_manager in list(self.git_managers.values()):
+            if git_manager.queue is not None:
+                git_manager.queue.drain()
 
     def find_notebook_by_id(self, notebook_id, notebooks=None):
         if notebooks is None:
-            notebooks = self.notebooks
+            # Whole tree - answered from the index
+            return self._notebooks_by_id.get(notebook_id)
 
         for notebook in notebooks:
             if notebook.id == notebook_id:
@@ -406,45 +1431,155 @@ class NoteManager:
 
     def find_note_by_id(self, notebook_id, note_id):
         """Find note by ID in the entire notebook tree"""
-
-        def search_recursive(notebooks):
-            for notebook in notebooks:
-                # Check notes in current notebook
-                for note in notebook.notes:
-                    if note.id == note_id:
-                        return note, notebook
-
-                # Check subnotebooks recursively
-                if notebook.subnotebooks:
-                    found_note, found_notebook = search_recursive(notebook.subnotebooks)
-                    if found_note:
-                        return found_note, found_notebook
+        note = self._notes_by_id.get(note_id)
+        if note is None:
             return None, None
-
-        # If specific notebook provided, search there first (faster)
-        if notebook_id:
-            notebook = self.find_notebook_by_id(notebook_id)
-            if notebook:
-                for note in notebook.notes:
-                    if note.id == note_id:
-                        return note, notebook
-
-        # Search entire tree
-        return search_recursive(self.notebooks)
+        return note, self._note_parents.get(note_id)
 
     def get_notebook_hierarchy(self, notebook_id):
-        def find_hierarchy(current_id, current_notebooks, current_path):
-            for notebook in current_notebooks:
-                if notebook.id == current_id:
-                    return current_path + [notebook]
-                found = find_hierarchy(
-                    current_id, notebook.subnotebooks, current_path + [notebook]
-                )
-                if found:
-                    return found
+        """Return [root, ..., notebook] for a notebook id, or None"""
+        notebook = self._notebooks_by_id.get(notebook_id)
+        if notebook is None:
             return None
 
-        return find_hierarchy(notebook_id, self.notebooks, [])
+        hierarchy = []
+        while notebook is not None:
+            hierarchy.append(notebook)
+            notebook = self._notebook_parents.get(notebook.id)
+        hierarchy.reverse()
+        return hierarchy
+
+    # INDEX MAINTENANCE
+    def _clear_index(self):
+        self._notebooks_by_id = {}
+        self._notes_by_id = {}
+        self._note_parents = {}
+        self._notebook_parents = {}
+
+    def _index_notebook(self, notebook, parent=None):
+        """Add a notebook and everything below it to the index"""
+        self._notebooks_by_id[notebook.id] = notebook
+        self._notebook_parents[notebook.id] = parent
+        for note in notebook.notes:
+            self._notes_by_id[note.id] = note
+            self._note_parents[note.id] = notebook
+        for sub_nb in notebook.subnotebooks:
+            self._index_notebook(sub_nb, notebook)
+
+    def _unindex_notebook(self, notebook):
+        """Drop a notebook and everything below it from the index"""
+        self._notebooks_by_id.pop(notebook.id, None)
+        self._notebook_parents.pop(notebook.id, None)
+        for note in notebook.notes:
+            self._notes_by_id.pop(note.id, None)
+            self._note_parents.pop(note.id, None)
+        for sub_nb in notebook.subnotebooks:
+            self._unindex_notebook(sub_nb)
+
+    def rebuild_index(self):
+        """Re-index the whole tree (for code that edited the lists directly)"""
+        self._clear_index()
+        for notebook in self.notebooks:
+            self._index_notebook(notebook)
+
+    # MUTATION HELPERS - use these instead of touching the lists directly.
+    # They hold _storage_lock, so a background compaction never serializes a
+    # half-applied change or drops a record queued while it was writing.
+    def add_root_notebook(self, notebook):
+        """Attach an already loaded root notebook (imports)"""
+        self.notebooks.append(notebook)
+        self._index_notebook(notebook)
+
+    def _adjust_totals(self, notebook, notes=0, file_notes=0, subnotebooks=0, content_bytes=0):
+        """Apply a delta to the aggregates of notebook and every ancestor"""
+        current = notebook
+        while current is not None:
+            totals = current._totals
+            if totals is not None:  # unknown totals are counted fresh when asked for
+                totals[0] += notes
+                totals[1] += file_notes
+                totals[2] += subnotebooks
+                totals[3] += content_bytes
+            current = self._notebook_parents.get(current.id)
+
+    def add_note(self, notebook, note):
+        with self._storage_lock:
+            notebook.notes.append(note)
+            self._notes_by_id[note.id] = note
+            self._note_parents[note.id] = notebook
+            self._adjust_totals(notebook, 1, int(note.is_file_note), 0, note.content_size())
+            self.mark_dirty(notebook, "structure", self._content_part(note))
+            self._track_change(notebook, note.id)
+            if self._journaling(notebook):  # note.content would read a lazy body for nothing
+                self._journal_op(notebook, {
+                    "op": "add_note", "parent": notebook.id,
+                    "note": note.to_dict(), "content": note.content,
+                })
+
+    def remove_note(self, notebook, note):
+        with self._storage_lock:
+            notebook.notes.remove(note)
+            self._notes_by_id.pop(note.id, None)
+            self._note_parents.pop(note.id, None)
+            self._adjust_totals(notebook, -1, -int(note.is_file_note), 0, -note.content_size())
+            self.mark_dirty(notebook, "structure", self._content_part(note))
+            self._track_change(notebook, note.id)
+            self._journal_op(notebook, {"op": "remove_note", "id": note.id})
+
+    def rename_note(self, note, new_title):
+        with self._storage_lock:
+            note.title = new_title
+            note.updated = datetime.now()
+            notebook = self._note_parents.get(note.id)
+            if notebook is not None:
+                self.mark_dirty(notebook, "structure")
+                self._track_change(notebook, note.id)
+                self._journal_op(notebook, {
+                    "op": "rename_note", "id": note.id,
+                    "title": new_title, "updated": note.updated.isoformat(),
+                })
+
+    def update_note_content(self, note, content):
+        with self._storage_lock:
+            old_size = note.content_size()
+            note.content = content
+            note.updated = datetime.now()
+            notebook = self._note_parents.get(note.id)
+            if notebook is not None:
+                self._adjust_totals(notebook, content_bytes=note.content_size() - old_size)
+                # "updated" lives in structure.json, so it is rewritten too
+                self.mark_dirty(notebook, "structure", self._content_part(note))
+                self._track_change(notebook, note.id)
+                self._journal_op(notebook, {
+                    "op": "edit_note", "id": note.id,
+                    "content": content, "updated": note.updated.isoformat(),
+                })
+
+    def add_subnotebook(self, parent_notebook, subnotebook):
+        with self._storage_lock:
+            parent_notebook.subnotebooks.append(subnotebook)
+            self._index_notebook(subnotebook, parent_notebook)
+            notes, file_notes, subnotebooks, content_bytes = subnotebook.subtree_totals()
+            self._adjust_totals(parent_notebook, notes, file_notes, subnotebooks + 1, content_bytes)
+            self.mark_dirty(parent_notebook, "structure", *self._subtree_content_parts(subnotebook))
+            self._track_change(parent_notebook, subnotebook.id)
+            if self._journaling(parent_notebook):
+                contents = {}
+                self._extract_file_content_from_notebook(subnotebook, contents, contents)
+                self._journal_op(parent_notebook, {
+                    "op": "add_notebook", "parent": parent_notebook.id,
+                    "notebook": subnotebook.to_dict(), "contents": contents,
+                })
+
+    def remove_subnotebook(self, parent_notebook, subnotebook):
+        with self._storage_lock:
+            notes, file_notes, subnotebooks, content_bytes = subnotebook.subtree_totals()
+            self._adjust_totals(parent_notebook, -notes, -file_notes, -(subnotebooks + 1), -content_bytes)
+            parent_notebook.subnotebooks.remove(subnotebook)
+            self._unindex_notebook(subnotebook)
+            self.mark_dirty(parent_notebook, "structure", *self._subtree_content_parts(subnotebook))
+            self._track_change(parent_notebook, subnotebook.id)
+            self._journal_op(parent_notebook, {"op": "remove_notebook", "id": subnotebook.id})
 
     def get_total_note_count(self):
         count = 0
@@ -452,17 +1587,30 @@ class NoteManager:
             count += notebook.get_total_note_count()
         return count
 
+    def get_total_file_note_count(self):
+        count = 0
+        for notebook in self.notebooks:
+            count += notebook.get_file_note_count()
+        return count
+
     def get_total_notebook_count(self):
         count = 0
         for notebook in self.notebooks:
             count += 1 + notebook.get_total_subnotebook_count()
         return count
 
-    def get_git_manager(self, notebook_name):
-        """Get or create Git manager for notebook"""
-        folder_path = self.get_notebook_folder_path(notebook_name)
+    def get_git_manager(self, notebook):
+        """Get or create Git manager for notebook (Notebook or root name)"""
+        folder_path = self.get_notebook_folder_path(notebook)
         if folder_path not in self.git_managers:
-            self.git_managers[folder_path] = GitManager(folder_path)
+            git_manager = GitManager(folder_path)
+            git_manager.lock = self._folder_lock(folder_path)
+            root_notebook = self._notebooks_by_id.get(self._root_ids_by_folder.get(folder_path))
+            if root_notebook is not None:
+                git_manager.blob_layout = root_notebook.storage == LAYOUT_BLOBS
+            if self.background_commits:
+                git_manager.queue = CommitQueue(git_manager)
+            self.git_managers[folder_path] = git_manager
         return self.git_managers[folder_path]
     
     def create_notebook(self, name, custom_path=None):
@@ -471,7 +1619,7 @@ class NoteManager:
             raise ValueError(f"Notebook '{name}' already exists")
 
         notebook = Notebook(name)
-        self.notebooks.append(notebook)
+        self.add_root_notebook(notebook)
 
         # Use custom path if provided, otherwise default
         if custom_path:
@@ -483,7 +1631,7 @@ class NoteManager:
             # 🆕 REGISTER IN REGISTRY
             self.register_notebook(notebook, folder_path)
         else:
-            folder_path = self.get_notebook_folder_path(notebook.name)
+            folder_path = self.get_notebook_folder_path(notebook)
             self.save_notebook(notebook)
         
             # 🆕 REGISTER IN REGISTRY  
@@ -491,7 +1639,7 @@ class NoteManager:
 
         # SMART GIT INITIALIZATION
         try:
-            git_manager = self.get_git_manager(notebook.name)
+            git_manager = self.get_git_manager(notebook)
             git_manager.commit_notebook_creation(notebook.id, notebook.name, 0, 0, custom_path)
         except Exception:
             pass
@@ -503,96 +1651,38 @@ class NoteManager:
         # Expand user directory (~/ becomes /home/user/)
         custom_path = os.path.expanduser(custom_path)
 
-        # Create custom directory if it doesn't exist
-        os.makedirs(custom_path, exist_ok=True)
-
-        structure_file = os.path.join(custom_path, "structure.json")
-        notes_file = os.path.join(custom_path, "notes.json")  # 🆕 CHANGE
-        files_file = os.path.join(custom_path, "files.json")  # 🆕 CHANGE
-
-        # Save structure file
-        structure_data = notebook.to_dict()
-        with open(structure_file, "w") as f:
-            json.dump(structure_data, f, indent=2)
-
-        # 🆕 FIX: Use the new three-file system
-        notes_map = {}
-        files_map = {}
-        self._extract_file_content_from_notebook(notebook, notes_map, files_map)  # ✅ CORRECT
-
-        # Save notes.json
-        with open(notes_file, "w") as f:
-            json.dump(notes_map, f, indent=2)
-
-        # Save files.json
-        with open(files_file, "w") as f:
-            json.dump(files_map, f, indent=2)
+        # 🆕 FIX: Same atomic three-file write as the default location
+        with self._folder_lock(custom_path).exclusive():
+            self._write_notebook_parts(notebook, NOTEBOOK_PARTS, folder_path=custom_path)
+            self._stamp_after_commit(custom_path)
             
-    def get_notebook_folder_path(self, notebook_name):
-        """Override to handle custom locations"""
-        # First check if we have a notebook with custom path
-        for notebook in self.notebooks:
-            if (notebook.name == notebook_name and 
-                hasattr(notebook, 'custom_path') and 
-                notebook.custom_path is not None):  # 🆕 ADD THIS CHECK
-                return notebook.custom_path
-
-        # Fallback to default location
-        folder_name = notebook_name.replace(" ", "-")
-        return os.path.join(self.notebooks_root, folder_name)
-      # 🆕 ADD THESE NEW METHODS:
-    
     def load_registry(self):
-        """Load the notebook registry - create if doesn't exist"""
-        registry_file = self.get_registry_file()
-    
-        # 🆕 CREATE REGISTRY FILE IF IT DOESN'T EXIST
-        if not os.path.exists(registry_file):
-            self.save_registry({"notebooks": {}})
-            return {"notebooks": {}}
-    
-        try:
-            with open(registry_file, 'r') as f:
-                return json.load(f)
-        except:
-            # 🆕 IF CORRUPTED, CREATE FRESH REGISTRY
-            self.save_registry({"notebooks": {}})
-            return {"notebooks": {}}
+        """The notebook registry (resident; created if it doesn't exist)"""
+        return self.registry.data
     
     def save_registry(self, registry_data):
         """Save the notebook registry"""
-        registry_file = self.get_registry_file()
-        try:
-            with open(registry_file, 'w') as f:
-                json.dump(registry_data, f, indent=2)
-        except Exception as e:
-            print(f"Warning: Could not save registry: {e}")
+        self.registry.replace(registry_data)
     
     def register_notebook(self, notebook, folder_path):
         """Register a notebook in the registry"""
-        registry_data = self.load_registry()
-        
-        registry_data["notebooks"][notebook.id] = {
+        self._set_notebook_folder(notebook, folder_path)
+        self.registry.add(notebook.id, {
             "name": notebook.name,
             "path": folder_path,
             "created": datetime.now().isoformat()
-        }
-        
-        self.save_registry(registry_data)
+        })
     
     def unregister_notebook(self, notebook_id):
         """Remove a notebook from the registry"""
-        registry_data = self.load_registry()
-        
-        if notebook_id in registry_data["notebooks"]:
-            del registry_data["notebooks"][notebook_id]
-            self.save_registry(registry_data)
+        self._forget_notebook_folder(notebook_id)
+        self.registry.remove(notebook_id)
 
     def create_subnotebook(self, parent_notebook, name):
         """Create subnotebook (NO BRANCHES)"""
         # 1. Create subnotebook object
         subnotebook = Notebook(name, parent_id=parent_notebook.id)
-        parent_notebook.subnotebooks.append(subnotebook)
+        self.add_subnotebook(parent_notebook, subnotebook)
 
         # 2. Save the structure change
         root_notebook = self._find_root_notebook(parent_notebook)
@@ -600,7 +1690,7 @@ class NoteManager:
 
         # SMART COMMIT - CREATE SUBNOTEBOOK
         try:
-            git_manager = self.get_git_manager(root_notebook.name)
+            git_manager = self.get_git_manager(root_notebook)
             git_manager.commit_subnotebook_creation(subnotebook.id, name, root_notebook.name, 0)
         except Exception:
             pass
@@ -618,29 +1708,22 @@ class NoteManager:
         """Find the root notebook for any nested notebook"""
         current = notebook
         while current.parent_id:
-            current = self.find_notebook_by_id(current.parent_id)
-            if not current:
+            parent = self._notebook_parents.get(current.id)
+            if parent is None:
+                parent = self._notebooks_by_id.get(current.parent_id)
+            if parent is None:
                 break
+            current = parent
         return current
     
     # ADD TO NoteManager class in terminal_notes_core.py
     def notebook_exists_by_path(self, folder_path):
         """Check if path already registered"""
-        registry_data = self.load_registry()
-        normalized_path = self.normalize_path_for_comparison(folder_path)
-    
-        for notebook_info in registry_data["notebooks"].values():
-            registered_path = self.normalize_path_for_comparison(notebook_info["path"])
-            if registered_path == normalized_path:
-                return True
-        return False
+        return self.registry.id_for_path(folder_path) is not None
 
     def normalize_path_for_comparison(self, path):
         """Normalize path for cross-platform comparison"""
-        expanded = os.path.expanduser(path)
-        absolute = os.path.abspath(expanded)
-        normalized = os.path.normcase(absolute)
-        return normalized
+        return normalize_path_for_comparison(path)
             
 class SimpleNav:
     """One stack to rule them all - follows the single path"""
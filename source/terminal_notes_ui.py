@@ -13,11 +13,12 @@ from search_system import SimpleSearch
 from comprehensive_search import ComprehensiveSearch  # 🆕 ADD THIS IMPORT
 from notebook_importer import NotebookImporter  # 🆕 ADD THIS
 from recovery_system import RecoverySystem
+import instrumentation
 import threading  # 🆕 ADD THIS IMPORT
 
 class TerminalNotes:
     def __init__(self):
-        self.manager = NoteManager()
+        self.manager = NoteManager(background_commits=True)  # saves never wait on git
         # SIMPLE SINGLE STACK NAVIGATION
         self.nav = SimpleNav()
         self.nav.push("home")  # Start at home
@@ -257,6 +258,28 @@ class TerminalNotes:
     def clear_screen(self):
         os.system("clear")
 
+    def show_stats_screen(self):
+        """Per-operation latency histograms (TERMINAL_NOTES_STATS=1)"""
+        self.clear_screen()
+        self.print_header("Stats")
+
+        if not instrumentation.ENABLED:
+            print("Timing is off. Start with TERMINAL_NOTES_STATS=1 to record it,")
+            print("or TERMINAL_NOTES_STATS=/path/stats.json to also dump it on exit.")
+        else:
+            for line in instrumentation.STATS.report_lines():
+                print(line)
+            commands = instrumentation.STATS.slowest_commands(5)
+            if commands:
+                print()
+                print("Slowest recent git commands:")
+                for argv, seconds in commands:
+                    command = " ".join(argv)[: self.terminal_width - 14]
+                    print(f"{instrumentation.format_seconds(seconds):>9}  {command}")
+
+        self.print_footer("")
+        self.get_input("Press Enter to continue...")
+
     def print_header(self, title):
         self.update_terminal_size()
         separator = "=" * self.terminal_width
@@ -267,7 +290,18 @@ class TerminalNotes:
 
     def print_footer(self, options):
         print()
-        print("-" * self.terminal_width)
+        pending = self.manager.pending_commits()
+        failed = self.manager.failed_commits()
+        if pending or failed:  # background commits not yet in git, or given up on
+            counts = []
+            if pending:
+                counts.append(f"{pending} commit{'s' if pending != 1 else ''} pending")
+            if failed:
+                counts.append(f"{failed} failed")
+            status = f"- git: {', '.join(counts)} "
+            print(status + "-" * max(0, self.terminal_width - len(status)))
+        else:
+            print("-" * self.terminal_width)
         print(options)
         print()
 
@@ -475,6 +509,11 @@ class TerminalNotes:
             else:
                 return "exit"
 
+        # STATS - latency histograms, from any screen
+        if cmd == "stats":
+            self.show_stats_screen()
+            return "continue"
+
         # Helper function to check jump history
         def has_jump_history():
             return (
@@ -911,6 +950,10 @@ class TerminalNotes:
             elif choice == "3":
                 self.nav.push("subnotebooks", notebook_id, 0)
                 return "navigate"
+            elif choice == "4":
+                self.importer.ingest_directory_flow(notebook)
+                self.nav.replace_page(0)
+                return "navigate"
             else:
                 print("Invalid choice.")
                 self.get_input("Press Enter to continue...")
@@ -969,13 +1012,13 @@ class TerminalNotes:
                 note = paginated_notes[idx]
                 confirm = self.get_input(f"Delete note '{note.title}'? [y/N]: ")
                 if confirm.lower() == "y":
-                    notebook.notes.remove(note)
+                    self.manager.remove_note(notebook, note)
                     self.manager.save_data()
 
                     # SMART COMMIT - DELETE NOTE
                     try:
                         root_notebook = self.manager._find_root_notebook(notebook)
-                        git_manager = self.manager.get_git_manager(root_notebook.name)
+                        git_manager = self.manager.get_git_manager(root_notebook)
                         git_manager.commit_note_deletion(note.id, note.title, root_notebook.name, note.is_file_note)
                     except Exception:
                         pass
@@ -1113,12 +1156,12 @@ class TerminalNotes:
                     f"Delete notebook '{notebook.name}' and all its contents? [y/N]: "
                 )
                 if confirm.lower() == "y":
-                    parent_notebook.subnotebooks.remove(notebook)
+                    self.manager.remove_subnotebook(parent_notebook, notebook)
                     self.manager.save_data()
 
                     try:
                         root_notebook = self.manager._find_root_notebook(parent_notebook)
-                        git_manager = self.manager.get_git_manager(root_notebook.name)
+                        git_manager = self.manager.get_git_manager(root_notebook)
                         git_manager.commit_subnotebook_deletion(notebook.id, notebook.name, root_notebook.name)
                     except Exception:
                         pass
@@ -1207,13 +1250,12 @@ class TerminalNotes:
                 )
 
             if new_content is not None and new_content != original_content:
-                note.content = new_content
-                note.updated = datetime.now()
+                self.manager.update_note_content(note, new_content)
                 self.manager.save_data()
 
                 try:
                     root_notebook = self.manager._find_root_notebook(notebook)
-                    git_manager = self.manager.get_git_manager(root_notebook.name)
+                    git_manager = self.manager.get_git_manager(root_notebook)
                     git_manager.commit_note_edit(note.id, note.title, root_notebook.name, original_content, new_content)
                 except Exception:
                     pass
@@ -1975,13 +2017,13 @@ class TerminalNotes:
             content = self.internal_editor()
         
             note = Note(title, content, created_with="internal")
-            notebook.notes.append(note)
+            self.manager.add_note(notebook, note)
             self.manager.save_data()            
 
             # SMART COMMIT - DELETE NOTE
             try:
                 root_notebook = self.manager._find_root_notebook(notebook)
-                git_manager = self.manager.get_git_manager(root_notebook.name)
+                git_manager = self.manager.get_git_manager(root_notebook)
                 git_manager.commit_note_deletion(note.title, root_notebook.name, note.is_file_note)
             except Exception:
                 pass
@@ -2010,13 +2052,13 @@ class TerminalNotes:
 
             # 🆕 UPDATE THE NOTE WITH ACTUAL CONTENT
             note.content = content.strip()
-            notebook.notes.append(note)
+            self.manager.add_note(notebook, note)
             self.manager.save_data()
             
             # SMART COMMIT - CREATE NOTE
             try:
                 root_notebook = self.manager._find_root_notebook(notebook)
-                git_manager = self.manager.get_git_manager(root_notebook.name)
+                git_manager = self.manager.get_git_manager(root_notebook)
                 git_manager.commit_note_creation(note.id, title, root_notebook.name, note.created_with, content)
             except Exception:
                 pass
@@ -2042,8 +2084,7 @@ class TerminalNotes:
 
                 if new_filename and new_filename.strip():
                     new_title = f"{new_filename.strip()}.{current_extension}"
-                    note.title = new_title
-                    note.updated = datetime.now()
+                    self.manager.rename_note(note, new_title)
                     self.manager.save_data()
 
                     # 🆕 FIX: Use consistent structured commit
@@ -2051,7 +2092,7 @@ class TerminalNotes:
                     if notebook:
                         try:
                             root_notebook = self.manager._find_root_notebook(notebook)
-                            git_manager = self.manager.get_git_manager(root_notebook.name)
+                            git_manager = self.manager.get_git_manager(root_notebook)
                             git_manager.commit_note_rename(note.id, old_title, new_title, root_notebook.name, note.is_file_note)
                         except Exception:
                             pass
@@ -2062,8 +2103,7 @@ class TerminalNotes:
             else:
                 new_title = self.get_input("New name: ")
                 if new_title and new_title.strip():
-                    note.title = new_title.strip()
-                    note.updated = datetime.now()
+                    self.manager.rename_note(note, new_title.strip())
                     self.manager.save_data()
 
                     # 🆕 FIX: Use consistent structured commit
@@ -2071,7 +2111,7 @@ class TerminalNotes:
                     if notebook:
                         try:
                             root_notebook = self.manager._find_root_notebook(notebook)
-                            git_manager = self.manager.get_git_manager(root_notebook.name)
+                            git_manager = self.manager.get_git_manager(root_notebook)
                             git_manager.commit_note_rename(note.id, old_title, new_title, root_notebook.name, note.is_file_note)
                         except Exception:
                             pass
@@ -2082,8 +2122,7 @@ class TerminalNotes:
         else:
             new_title = self.get_input("New title: ")
             if new_title and new_title.strip():
-                note.title = new_title.strip()
-                note.updated = datetime.now()
+                self.manager.rename_note(note, new_title.strip())
                 self.manager.save_data()
 
                 # 🆕 FIX: Use consistent structured commit
@@ -2091,7 +2130,7 @@ class TerminalNotes:
                 if notebook:
                     try:
                         root_notebook = self.manager._find_root_notebook(notebook)
-                        git_manager = self.manager.get_git_manager(root_notebook.name)
+                        git_manager = self.manager.get_git_manager(root_notebook)
                         git_manager.commit_note_rename(note.id, old_title, new_title, root_notebook.name, note.is_file_note)
                     except Exception:
                         pass
@@ -2156,9 +2195,10 @@ class TerminalNotes:
         print("1 - Regular Note (internal/vim editor)")
         print("2 - Specialized File (.py, .html, .sh, etc.)")
         print("3 - Sub-notebook (nested container)")
+        print("4 - Ingest Directory (files -> file notes, folders -> sub-notebooks)")
         print()
 
-        return self.get_input("Choose [1-3]: ")
+        return self.get_input("Choose [1-4]: ")
 
     def create_file_note(self, notebook):
         while True:
@@ -2206,13 +2246,13 @@ class TerminalNotes:
             # 🆕 KEEP YOUR EXISTING VALIDATION LOGIC
             if content is not None and content.strip() and content != initial_content:
                 note.content = content.strip()
-                notebook.notes.append(note)
+                self.manager.add_note(notebook, note)
                 self.manager.save_data()
 
                 # SMART COMMIT - CREATE FILE NOTE
                 try:
                     root_notebook = self.manager._find_root_notebook(notebook)
-                    git_manager = self.manager.get_git_manager(root_notebook.name)
+                    git_manager = self.manager.get_git_manager(root_notebook)
                     git_manager.commit_file_creation(note.id, filename, root_notebook.name, extension, content)
                 except Exception:
                     pass
@@ -2294,20 +2334,7 @@ class TerminalNotes:
 
     def count_total_files(self):
         """Count total file notes across all notebooks"""
-        file_count = 0
-
-        def count_files_in_notebook(notebook):
-            nonlocal file_count
-            for note in notebook.notes:
-                if note.is_file_note:
-                    file_count += 1
-            for sub_nb in notebook.subnotebooks:
-                count_files_in_notebook(sub_nb)
-
-        for notebook in self.manager.notebooks:
-            count_files_in_notebook(notebook)
-
-        return file_count
+        return self.manager.get_total_file_note_count()
 
     def export_file_note(self, note):
         if not note.is_file_note:
@@ -2417,6 +2444,9 @@ class TerminalNotes:
                 last_terminal_size = (current_width, current_height)
                 continue  # ← USE continue INSTEAD OF return
 
+            # Pick up edits made outside this instance (git pull, other panes)
+            self.manager.check_for_external_changes()
+
             current = self.nav.current()
             current_screen = current["screen"]
             if current_screen == "home":
@@ -2460,6 +2490,9 @@ class TerminalNotes:
             elif result == "navigate":
                 continue     
 
+        # Flush anything still buffered (journal tails etc.) before exiting
+        self.manager.close()
+
 if __name__ == "__main__":
     import traceback
 
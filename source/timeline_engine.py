@@ -9,6 +9,8 @@ import tempfile
 import subprocess
 from datetime import datetime
 from pathlib import Path
+from notebook_history import historical_json
+from instrumentation import timed
 
 class TimelineEngine:
     def __init__(self, note_manager):
@@ -88,19 +90,19 @@ class TimelineEngine:
             timeline_structure = self._build_complete_hierarchy(full_structure, item_uuid, item_info)
             
             # Save structure
-            with open(os.path.join(temp_dir, "structure.json"), "w") as f:
-                json.dump(timeline_structure, f, indent=2)
+            with open(os.path.join(temp_dir, "structure.json"), "wb") as f:
+                f.write(self.manager.serializer.dumps(timeline_structure))
             
             # Save content
             content_filename = "files.json" if item_type == 'file' else "notes.json"
             temp_content = {item_uuid: content}
-            with open(os.path.join(temp_dir, content_filename), "w") as f:
-                json.dump(temp_content, f, indent=2)
+            with open(os.path.join(temp_dir, content_filename), "wb") as f:
+                f.write(self.manager.serializer.dumps(temp_content))
             
             # Empty counterpart file
             counterpart_filename = "notes.json" if item_type == 'file' else "files.json"
-            with open(os.path.join(temp_dir, counterpart_filename), "w") as f:
-                json.dump({}, f, indent=2)
+            with open(os.path.join(temp_dir, counterpart_filename), "wb") as f:
+                f.write(self.manager.serializer.dumps({}))
             
             return {
                 'type': 'timeline_version',
@@ -144,15 +146,15 @@ class TimelineEngine:
             self._collect_notebook_content(notebook_structure, notes_data, files_data, notebook_notes, notebook_files)
             
             # Save structure
-            with open(os.path.join(temp_dir, "structure.json"), "w") as f:
-                json.dump(notebook_structure, f, indent=2)
+            with open(os.path.join(temp_dir, "structure.json"), "wb") as f:
+                f.write(self.manager.serializer.dumps(notebook_structure))
             
             # Save content files
-            with open(os.path.join(temp_dir, "notes.json"), "w") as f:
-                json.dump(notebook_notes, f, indent=2)
+            with open(os.path.join(temp_dir, "notes.json"), "wb") as f:
+                f.write(self.manager.serializer.dumps(notebook_notes))
             
-            with open(os.path.join(temp_dir, "files.json"), "w") as f:
-                json.dump(notebook_files, f, indent=2)
+            with open(os.path.join(temp_dir, "files.json"), "wb") as f:
+                f.write(self.manager.serializer.dumps(notebook_files))
             
             return {
                 'type': 'timeline_version',
@@ -274,15 +276,7 @@ class TimelineEngine:
     
     def _get_historical_json(self, notebook_path, commit_hash, filename):
         """Get JSON file content from specific commit"""
-        try:
-            cmd = ["git", "show", f"{commit_hash}:{filename}"]
-            result = subprocess.run(cmd, cwd=notebook_path, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-        except Exception:
-            pass
-        return None
+        return historical_json(notebook_path, commit_hash, filename)
     
     def _find_item_in_structure(self, structure_data, target_uuid):
         """Find any item by UUID in structure"""
@@ -310,16 +304,18 @@ class TimelineEngine:
         
         return search_recursive(structure_data)
     
+    @timed("timeline.item")
     def get_item_timeline(self, item_uuid, notebook_id):
         """Get complete timeline for any item"""
         timeline_versions = []
+        self.manager.wait_for_commits()  # the last edits may still be queued
     
         notebook = self.manager.find_notebook_by_id(notebook_id)
         if not notebook:
             return timeline_versions
        
         root_notebook = self.manager._find_root_notebook(notebook)
-        notebook_path = self.manager.get_notebook_folder_path(root_notebook.name) if root_notebook else self.manager.get_notebook_folder_path(notebook.name)
+        notebook_path = self.manager.get_notebook_folder_path(root_notebook or notebook)
     
         # Get all commits mentioning this UUID
         cmd = [
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.dont_write_bytecode = True
+import pytest
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source")
+sys.path.insert(0, os.path.abspath(SOURCE))
+
+# Commits need an identity even where git has none configured
+for variable, value in (("GIT_AUTHOR_NAME", "tests"), ("GIT_AUTHOR_EMAIL", "tests@localhost"),
+                        ("GIT_COMMITTER_NAME", "tests"), ("GIT_COMMITTER_EMAIL", "tests@localhost")):
+    os.environ.setdefault(variable, value)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """NoteManager keeps notebooks_root under the cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def manager(workdir):
+    from terminal_notes_core import NoteManager
+
+    manager = NoteManager(verbose=False)
+    yield manager
+    manager.close()
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from storage_engine import AtomicWriter, ChunkedData
+
+
+def listing(folder):
+    return sorted(os.listdir(folder))
+
+
+def test_failed_write_keeps_the_old_file_and_no_temp_files(tmp_path):
+    target = tmp_path / "notes.json"
+    target.write_text("old")
+
+    def chunks():
+        yield b"half of the new"
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        AtomicWriter().write(target, ChunkedData(chunks()))
+    assert target.read_text() == "old"
+    assert listing(tmp_path) == ["notes.json"]
+
+
+def test_failed_rename_removes_the_temp_files_left(tmp_path):
+    (tmp_path / "structure.json").write_text("old")
+    (tmp_path / "blocked").mkdir()  # a file cannot replace a directory
+
+    with pytest.raises(OSError):
+        AtomicWriter().write_many({tmp_path / "blocked": b"x", tmp_path / "structure.json": b"new"})
+    assert listing(tmp_path) == ["blocked", "structure.json"]
+    assert (tmp_path / "structure.json").read_text() == "old"
+
+
+def test_batch_commits_once_with_one_barrier_per_folder(tmp_path, monkeypatch):
+    writer = AtomicWriter()
+    synced, after = [], []
+    monkeypatch.setattr(writer, "_fsync_folder", synced.append)
+    (tmp_path / "sub").mkdir()
+
+    with writer.batch():
+        writer.write(tmp_path / "a.json", "first")
+        writer.write(tmp_path / "a.json", "last", after=lambda: after.append("a"))
+        writer.write(tmp_path / "sub" / "b.json", "b")
+        with writer.batch():  # nested blocks join the outer one
+            writer.on_commit(lambda: after.append("committed"))
+        assert not (tmp_path / "a.json").exists() and after == []
+
+    assert (tmp_path / "a.json").read_text() == "last"
+    assert (tmp_path / "sub" / "b.json").read_text() == "b"
+    assert sorted(after) == ["a", "committed"]
+    assert sorted(synced) == [str(tmp_path), str(tmp_path / "sub")]
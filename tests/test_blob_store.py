@@ -0,0 +1,47 @@
+import os
+import subprocess
+
+import pytest
+
+import git_manager as git_manager_module
+from blob_store import LAYOUT_BLOBS, LAYOUT_JSON
+from terminal_notes_core import Note, NoteManager
+
+
+def tree(folder):
+    result = subprocess.run(["git", "ls-tree", "-r", "--name-only", "HEAD"], cwd=folder, capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def migrate(manager, root, layout):
+    previous = root.storage
+    assert manager.migrate_notebook_storage(root, layout)
+    manager.get_git_manager(root).commit_storage_migration(root.id, root.name, previous, layout)
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["fast", "slow"])
+def test_migrating_back_to_json_drops_blobs_and_restores_fast_commits(workdir, monkeypatch, fast):
+    monkeypatch.setattr(git_manager_module, "FAST_COMMITS", fast)
+    manager = NoteManager(verbose=False)
+    root = manager.create_notebook("Layouts")
+    note = Note("body", "stored as a blob")
+    manager.add_note(root, note)
+    manager.save_notebook(root)
+    folder = manager.get_notebook_folder_path(root)
+    git_manager = manager.get_git_manager(root)
+
+    migrate(manager, root, LAYOUT_BLOBS)
+    assert any(path.startswith("blobs/") for path in tree(folder))
+    assert not git_manager._fast_path()
+
+    migrate(manager, root, LAYOUT_JSON)
+    assert not os.path.exists(os.path.join(folder, "blobs"))
+    assert not any(path.startswith("blobs/") for path in tree(folder))
+    assert git_manager._fast_path() == fast
+    assert subprocess.run(["git", "status", "--porcelain"], cwd=folder, capture_output=True, text=True).stdout == ""
+    manager.close()
+
+    reloaded = NoteManager(verbose=False)
+    assert reloaded.find_note_by_id(None, note.id)[0].content == "stored as a blob"
+    assert reloaded.get_git_manager(reloaded.notebooks[0])._fast_path() == fast
+    reloaded.close()
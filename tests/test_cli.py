@@ -0,0 +1,67 @@
+import io
+import json
+import subprocess
+
+import pytest
+
+from terminal_notes_cli import main
+from terminal_notes_core import NoteManager
+
+
+@pytest.fixture
+def cli(workdir, monkeypatch, capsys):
+    setup = NoteManager(verbose=False)
+    folder = setup.get_notebook_folder_path(setup.create_notebook("Work"))
+    setup.close()
+
+    def run(*argv, stdin=""):
+        monkeypatch.setattr("sys.stdin", io.StringIO("".join(json.dumps(record) + "\n" for record in stdin)))
+        status = main(list(argv))
+        captured = capsys.readouterr()
+        return status, [json.loads(line) for line in captured.out.splitlines()], captured.err
+
+    run.folder = folder
+    return run
+
+
+def commit_count(folder):
+    result = subprocess.run(["git", "rev-list", "--count", "HEAD"], cwd=folder, capture_output=True, text=True)
+    return int(result.stdout)
+
+
+def test_add_append_cat_ls_round_trip(cli):
+    commits = commit_count(cli.folder)
+    status, added, _ = cli("add", "Work", stdin=[
+        {"title": "standup", "content": "first line"},
+        {"title": "script", "content": "print()", "extension": ".py", "path": "Code"},
+    ])
+    assert status == 0
+    assert [(record["title"], record["notebook"], record["type"]) for record in added] == [
+        ("standup", "Work", "note"), ("script", "Work/Code", "file"),
+    ]
+    assert commit_count(cli.folder) == commits + 1  # one save, one commit per run
+
+    status, _, _ = cli("append", "Work", stdin=[{"title": "standup", "content": "second line"}])
+    assert status == 0
+
+    status, notes, _ = cli("cat", "Work")
+    assert {note["title"]: note["content"] for note in notes} == {
+        "standup": "first line\nsecond line", "script": "print()",
+    }
+    status, one, _ = cli("cat", "Work", added[1]["id"])
+    assert [note["extension"] for note in one] == ["py"]
+
+    status, listed, _ = cli("ls", "Work", "-r")
+    assert [(item["title"], item["type"]) for item in listed] == [
+        ("Code", "notebook"), ("standup", "note"), ("script", "file"),
+    ]
+    status, roots, _ = cli("ls")
+    assert [root["name"] for root in roots] == ["Work"]
+
+
+def test_errors_go_to_stderr_as_json(cli):
+    status, out, err = cli("append", "Work", stdin=[{"title": "missing", "content": "x"}])
+    assert status == 1 and out == []
+    assert json.loads(err) == {"error": "No note titled 'missing' in 'Work'"}
+    status, _, err = cli("cat", "Nowhere")
+    assert status == 1 and "Unknown notebook 'Nowhere'" in err
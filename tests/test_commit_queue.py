@@ -0,0 +1,166 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+import commit_queue
+import git_manager as git_manager_module
+from commit_queue import CommitQueue
+from file_locks import folder_lock
+from git_manager import GitManager
+
+
+def git_log(path):
+    result = subprocess.run(["git", "log", "--format=%s"], cwd=path, capture_output=True, text=True)
+    return result.stdout.splitlines()
+
+
+def show(path, revision, name):
+    result = subprocess.run(["git", "show", f"{revision}:{name}"], cwd=path, capture_output=True, text=True)
+    return result.stdout
+
+
+@pytest.fixture(params=["fast", "staged"])
+def repo(request, tmp_path, monkeypatch):
+    """A notebook folder whose GitManager commits through a CommitQueue"""
+    monkeypatch.setattr(git_manager_module, "FAST_COMMITS", request.param == "fast")
+    for name in ("structure.json", "notes.json", "files.json"):
+        (tmp_path / name).write_text("{}")
+    manager = GitManager(tmp_path)
+    manager.init_repo()
+    manager.lock = folder_lock(str(tmp_path))
+    manager.queue = CommitQueue(manager)
+    yield manager
+    manager.close()
+
+
+def save(manager, body, message):
+    with manager.lock.exclusive():
+        (manager.notebook_path / "notes.json").write_text(body)
+    manager.commit_silently(message)
+
+
+def hold_worker(manager, monkeypatch):
+    """Keep the first commit waiting until the returned event is set"""
+    release = threading.Event()
+    commit_snapshot = manager.commit_snapshot
+
+    def held(message, snapshot):
+        release.wait(10)
+        return commit_snapshot(message, snapshot)
+
+    monkeypatch.setattr(manager, "commit_snapshot", held)
+    return release
+
+
+def test_snapshots_commit_in_order_with_their_own_bytes(repo, monkeypatch):
+    release = hold_worker(repo, monkeypatch)
+    for index in range(5):
+        save(repo, f'{{"version": {index}}}', f"save {index}")
+    release.set()  # the working tree already holds version 4
+    assert repo.queue.drain()
+
+    assert git_log(repo.notebook_path)[:5] == [f"save {index}" for index in reversed(range(5))]
+    for index in range(5):
+        assert show(repo.notebook_path, f"HEAD~{4 - index}", "notes.json") == f'{{"version": {index}}}'
+
+
+def test_fallback_commits_the_snapshot_not_the_working_tree(repo, monkeypatch):
+    monkeypatch.setattr(repo, "_fast_commit", lambda message, snapshot: None)
+    release = hold_worker(repo, monkeypatch)
+    save(repo, '{"version": "old"}', "old")
+    save(repo, '{"version": "new"}', "new")
+    release.set()
+    assert repo.queue.drain()
+
+    assert git_log(repo.notebook_path)[:2] == ["new", "old"]
+    assert show(repo.notebook_path, "HEAD~1", "notes.json") == '{"version": "old"}'
+    assert show(repo.notebook_path, "HEAD", "notes.json") == '{"version": "new"}'
+
+
+def test_fast_commits_run_without_the_folder_lock(repo, monkeypatch):
+    if not git_manager_module.FAST_COMMITS:
+        pytest.skip("staged commits write the index, under the lock")
+    taken = []
+    monkeypatch.setattr(repo, "_commit_idents", lambda: taken.append(try_lock(repo)) or ("a <a@b>", "a <a@b>"))
+    save(repo, '{"version": 1}', "one")
+    assert repo.queue.drain()
+    assert taken == [True]  # a UI save in another instance would not wait on the worker
+    assert git_log(repo.notebook_path)[0] == "one"
+
+
+def test_staged_commits_hold_the_folder_lock(repo, monkeypatch):
+    taken = []
+    run_git_command = repo._run_git_command
+
+    def other_instance_commits(command, *args, **kwargs):
+        if command[1] == "commit":
+            thread = threading.Thread(target=lambda: taken.append(try_lock(repo)))
+            thread.start()
+            thread.join()
+        return run_git_command(command, *args, **kwargs)
+
+    monkeypatch.setattr(repo, "_run_git_command", other_instance_commits)
+    monkeypatch.setattr(repo, "_fast_commit", lambda message, snapshot: None)
+    save(repo, '{"version": 1}', "one")
+    assert repo.queue.drain()
+    assert taken == [False]  # its git commit would have hit index.lock
+
+
+def test_staged_commit_waits_for_another_instance(repo, monkeypatch):
+    monkeypatch.setattr(repo, "_fast_commit", lambda message, snapshot: None)
+    release = hold_worker(repo, monkeypatch)
+    save(repo, '{"version": 1}', "after the other instance")
+    other = folder_lock(str(repo.notebook_path))
+    with other.exclusive():
+        release.set()
+        time.sleep(0.3)  # the worker is waiting on the lock now
+        assert git_log(repo.notebook_path)[0] != "after the other instance"
+    assert repo.queue.drain()
+    assert git_log(repo.notebook_path)[0] == "after the other instance"
+    assert repo.failed_commits() == 0
+
+
+def test_queued_snapshots_hold_blob_ids_not_bytes(repo, monkeypatch):
+    snapshots = []
+    commit_snapshot = repo.commit_snapshot
+
+    def recording(message, snapshot):
+        snapshots.append(snapshot)
+        return commit_snapshot(message, snapshot)
+
+    monkeypatch.setattr(repo, "commit_snapshot", recording)
+    save(repo, '{"version": "queued"}', "queued")
+    assert repo.queue.drain()
+    assert set(snapshots[0]) == {"structure.json", "notes.json", "files.json", ".gitignore"}
+    assert all(isinstance(blob_id, str) and len(blob_id) == 40 for _, blob_id in snapshots[0].values())
+    assert show(repo.notebook_path, "HEAD", "notes.json") == '{"version": "queued"}'
+
+
+def try_lock(manager):
+    lock = folder_lock(str(manager.notebook_path), timeout=0.5)
+    try:
+        with lock.exclusive():
+            return True
+    except TimeoutError:
+        return False
+
+
+def test_dropped_commits_are_counted_and_reported(repo, monkeypatch, capsys):
+    with monkeypatch.context() as patch:
+        patch.setattr(commit_queue, "RETRY_DELAY", 0.001)
+        patch.setattr(repo, "commit_snapshot", lambda message, snapshot: None)
+        save(repo, '{"version": 1}', "lost message")
+        assert repo.queue.drain()
+
+    assert repo.failed_commits() == 1
+    assert repo.pending_commits() == 0
+    error = capsys.readouterr().err
+    assert "lost message" in error and str(commit_queue.COMMIT_RETRIES) in error
+
+    # git works again: the next commit carries the dropped changes
+    save(repo, '{"version": 2}', "next")
+    assert repo.queue.drain()
+    assert git_log(repo.notebook_path)[0] == "next"
+    assert repo.failed_commits() == 1
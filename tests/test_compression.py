@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import terminal_notes_core
+from storage_engine import COMPRESS_THRESHOLD
+from terminal_notes_core import Note, NoteManager
+
+BODY = "line of a large source file\n" * (COMPRESS_THRESHOLD // 20)
+
+
+@pytest.fixture
+def compress_calls(monkeypatch):
+    calls = []
+    compress_body = terminal_notes_core.compress_body
+
+    def counting(text, codec):
+        calls.append(codec)
+        return compress_body(text, codec)
+
+    monkeypatch.setattr(terminal_notes_core, "compress_body", counting)
+    return calls
+
+
+def save_files(manager, root):
+    manager.mark_dirty(root, "files")
+    manager.save_notebook(root)
+    with open(os.path.join(manager.get_notebook_folder_path(root), "files.json"), "rb") as f:
+        return f.read()
+
+
+def test_unchanged_bodies_are_compressed_once(workdir, compress_calls):
+    manager = NoteManager(verbose=False, compression="zlib")
+    root = manager.create_notebook("Packed")
+    note = Note("big.txt", BODY)
+    note.file_extension = "txt"
+    manager.add_note(root, note)
+    first = save_files(manager, root)
+    assert compress_calls == ["zlib"]
+
+    assert save_files(manager, root) == first
+    assert compress_calls == ["zlib"]
+
+    note.content = BODY + "edited\n"
+    save_files(manager, root)
+    assert compress_calls == ["zlib", "zlib"]
+    manager.close()
+
+
+def test_loaded_bodies_keep_their_compressed_form(workdir, compress_calls):
+    manager = NoteManager(verbose=False, compression="zlib")
+    root = manager.create_notebook("Packed")
+    note = Note("big.txt", BODY)
+    note.file_extension = "txt"
+    manager.add_note(root, note)
+    first = save_files(manager, root)
+    manager.close()
+    os.remove(manager.snapshot.path)  # parse files.json, not the startup snapshot
+    compress_calls.clear()
+
+    reloaded = NoteManager(verbose=False, compression="zlib")
+    root = next(notebook for notebook in reloaded.notebooks if notebook.name == "Packed")
+    assert root.notes[0].content == BODY
+    assert save_files(reloaded, root) == first
+    assert compress_calls == []
+    reloaded.close()
@@ -0,0 +1,49 @@
+import pytest
+
+from terminal_notes_core import Note
+
+
+@pytest.fixture
+def written(manager, monkeypatch):
+    """Parts each save_notebook call rewrote"""
+    calls = []
+    write_parts = manager._write_notebook_parts
+
+    def record(notebook, parts, folder_path=None):
+        calls.append(set(parts))
+        return write_parts(notebook, parts, folder_path)
+
+    monkeypatch.setattr(manager, "_write_notebook_parts", record)
+    return calls
+
+
+def saved_notebook(manager):
+    root = manager.create_notebook("Parts")
+    note, file_note = Note("text", "body"), Note("code.py", "print()")
+    file_note.file_extension = "py"
+    manager.add_note(root, note)
+    manager.add_note(root, file_note)
+    manager.save_notebook(root)
+    return root, note, file_note
+
+
+def test_edits_rewrite_structure_and_their_content_map(manager, written):
+    root, note, file_note = saved_notebook(manager)
+    written.clear()
+
+    manager.update_note_content(note, "new body")
+    manager.save_notebook(root)
+    manager.update_note_content(file_note, "print('new')")
+    manager.save_notebook(root)
+    assert written == [{"structure", "notes"}, {"structure", "files"}]
+
+
+def test_renames_rewrite_structure_only(manager, written):
+    root, note, file_note = saved_notebook(manager)
+    written.clear()
+
+    manager.rename_note(note, "renamed")
+    manager.rename_note(file_note, "renamed.py")
+    manager.save_notebook(root)
+    manager.save_notebook(root)  # nothing left to write
+    assert written == [{"structure"}]
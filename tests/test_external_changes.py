@@ -0,0 +1,75 @@
+import pytest
+
+from terminal_notes_core import Note, NoteManager
+
+
+@pytest.fixture(params=[{}, {"lazy": True}, {"journal": True}], ids=["eager", "lazy", "journal"])
+def instances(request, workdir):
+    """Two managers on the same notebooks_root, as two terminals would have"""
+    writer = NoteManager(verbose=False, **request.param)
+    root = writer.create_notebook("Shared")
+    sub = writer.create_subnotebook(root, "Sub")
+    kept = Note("kept", "old body")
+    writer.add_note(sub, kept)
+    gone = Note("gone", "bye")
+    writer.add_note(root, gone)
+    writer.save_notebook(root)
+    reader = NoteManager(verbose=False, **request.param)
+    yield writer, reader, root, kept, gone
+    writer.close()
+    reader.close()
+
+
+def test_body_only_edit_refreshes_totals(instances):
+    writer, reader, root, kept, gone = instances
+    if writer.journal_enabled:
+        pytest.skip("a journal writer never rewrites notes.json alone")
+    reader_root = reader.open_notebook(root.id)
+    assert reader_root.get_total_content_bytes() == len("old body") + len("bye")
+
+    # Only notes.json changes, as after a sync tool or `git checkout -- notes.json`
+    kept.content = "a much longer body than before"
+    writer.mark_dirty(root, "notes")
+    writer.save_notebook(root)
+
+    assert reader.check_for_external_changes() == [reader_root]
+    reader_note = reader.find_note_by_id(None, kept.id)[0]
+    assert reader_note.content == "a much longer body than before"
+    assert reader_root.get_total_content_bytes() == len("a much longer body than before") + len("bye")
+    assert reader.find_notebook_by_id(reader.find_note_by_id(None, kept.id)[1].id).get_total_content_bytes() == len(
+        "a much longer body than before"
+    )
+
+
+def test_structure_merge_keeps_surviving_objects(instances):
+    writer, reader, root, kept, gone = instances
+    reader_root = reader.open_notebook(root.id)
+    reader_kept, reader_sub = reader.find_note_by_id(None, kept.id)
+
+    writer.rename_note(kept, "renamed")
+    writer.remove_note(root, gone)
+    added = writer.create_subnotebook(root, "Added")
+    fresh = Note("fresh.py", "print(1)")
+    fresh.file_extension = "py"
+    writer.add_note(added, fresh)
+    writer.save_notebook(root)
+
+    assert reader.check_for_external_changes() == [reader_root]
+    assert reader.find_note_by_id(None, kept.id) == (reader_kept, reader_sub)  # same objects, patched
+    assert reader_kept.title == "renamed" and reader_kept.content == "old body"
+    assert reader.find_note_by_id(None, gone.id) == (None, None)
+    note, parent = reader.find_note_by_id(None, fresh.id)
+    assert note.content == "print(1)" and parent.name == "Added"
+    assert reader_root.get_total_note_count() == 2 and reader_root.get_file_note_count() == 1
+
+
+def test_unsaved_changes_are_not_overwritten(instances):
+    writer, reader, root, kept, gone = instances
+    reader_kept = reader.find_note_by_id(None, kept.id)[0]
+    reader.rename_note(reader_kept, "local edit")
+
+    writer.rename_note(kept, "remote edit")
+    writer.save_notebook(root)
+
+    assert reader.check_for_external_changes() == []
+    assert reader_kept.title == "local edit"
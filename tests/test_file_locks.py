@@ -0,0 +1,60 @@
+import json
+import time
+import threading
+
+import pytest
+
+from file_locks import FileLock, LockTimeout, LockUpgradeError
+from notebook_registry import NotebookRegistry
+from storage_engine import AtomicWriter
+
+
+def test_upgrade_is_refused_and_keeps_the_shared_lock(tmp_path):
+    path = str(tmp_path / "a.lock")
+    holder = FileLock(path)
+    with holder.shared():
+        with pytest.raises(LockUpgradeError):
+            with holder.exclusive():
+                pass
+        # Still held shared: a writer in "another instance" cannot get in
+        with pytest.raises(LockTimeout):
+            with FileLock(path, timeout=0.1).exclusive():
+                pass
+        with FileLock(path, timeout=0.1).shared():
+            pass
+    with FileLock(path, timeout=0.1).exclusive():
+        pass
+
+
+def test_shared_inside_exclusive_is_reentrant(tmp_path):
+    lock = FileLock(str(tmp_path / "a.lock"))
+    with lock.exclusive(), lock.shared(), lock.exclusive():
+        pass
+    with FileLock(str(tmp_path / "a.lock"), timeout=0.1).exclusive():
+        pass
+
+
+def test_registry_created_while_another_instance_reads(tmp_path):
+    path = tmp_path / "notebooks_registry.json"
+    holding = threading.Event()
+
+    def read_for_a_while():
+        with FileLock(str(tmp_path / "notebooks_registry.lock")).shared():
+            holding.set()
+            time.sleep(0.2)
+
+    reader = threading.Thread(target=read_for_a_while)
+    reader.start()
+    holding.wait()
+    registry = NotebookRegistry(str(path), AtomicWriter())
+    assert registry.data == {"notebooks": {}}
+    assert json.loads(path.read_text()) == {"notebooks": {}}
+    reader.join()
+
+
+def test_corrupted_registry_is_replaced(tmp_path):
+    path = tmp_path / "notebooks_registry.json"
+    path.write_text("{not json")
+    registry = NotebookRegistry(str(path), AtomicWriter())
+    registry.add("id-1", {"name": "A", "path": str(tmp_path / "A"), "created": "now"})
+    assert list(json.loads(path.read_text())["notebooks"]) == ["id-1"]
@@ -0,0 +1,43 @@
+import json
+import os
+
+from terminal_notes_core import Note, NoteManager
+
+
+def rename_on_disk(manager, notebook, new_name):
+    """What another tool (or a hand edit) can leave behind: two roots sharing a name"""
+    folder = manager.get_notebook_folder_path(notebook)
+    with open(os.path.join(folder, "structure.json")) as f:
+        structure = json.load(f)
+    structure["name"] = new_name
+    with open(os.path.join(folder, "structure.json"), "w") as f:
+        json.dump(structure, f)
+    registry = manager.registry.data
+    registry["notebooks"][notebook.id]["name"] = new_name
+    manager.registry.replace(registry)
+    return folder
+
+
+def test_same_named_notebooks_resolve_to_their_own_folders(workdir, tmp_path):
+    first = NoteManager(verbose=False)
+    work = first.create_notebook("Work")
+    other = first.create_notebook("Other", custom_path=str(tmp_path / "elsewhere"))
+    work_folder = first.get_notebook_folder_path(work)
+    first.close()
+    other_folder = rename_on_disk(first, other, "Work")
+    os.remove(first.snapshot.path)
+
+    manager = NoteManager(verbose=False)
+    roots = {notebook.id: notebook for notebook in manager.notebooks}
+    assert {notebook.name for notebook in roots.values()} == {"Work"}
+    folders = {work.id: work_folder, other.id: other_folder}
+    for notebook_id, notebook in roots.items():
+        sub = manager.create_subnotebook(notebook, "Inner")
+        assert manager.get_notebook_folder_path(sub) == folders[notebook_id]
+        assert str(manager.get_git_manager(sub).notebook_path.resolve()) == os.path.realpath(folders[notebook_id])
+        note = Note(f"note of {notebook_id}", "body")
+        manager.add_note(sub, note)
+        manager.save_notebook(sub)
+        with open(os.path.join(folders[notebook_id], "structure.json")) as f:
+            assert note.id in f.read()
+    manager.close()
@@ -0,0 +1,95 @@
+import os
+import subprocess
+
+import pytest
+
+import git_manager as git_manager_module
+from file_locks import LockTimeout
+from terminal_notes_core import Note, NoteManager
+
+
+def git_status(path):
+    result = subprocess.run(["git", "status", "--porcelain"], cwd=path, capture_output=True, text=True)
+    return result.stdout.splitlines()
+
+
+def edit_and_commit(manager, root):
+    note = Note("a note", "some body", created_with="internal")
+    manager.add_note(root, note)
+    manager.save_notebook(root)
+    manager.get_git_manager(root).commit_note_creation(note.id, note.title, root.name, "internal", note.content)
+    return note
+
+
+def test_eager_saves_write_no_content_index(manager):
+    root = manager.create_notebook("Eager")
+    edit_and_commit(manager, root)
+    folder = manager.get_notebook_folder_path(root)
+    assert not os.path.exists(os.path.join(folder, "notes.index.json"))
+
+
+def test_lazy_index_is_ignored_by_git(workdir):
+    manager = NoteManager(verbose=False, lazy=True)
+    root = manager.create_notebook("Lazy")
+    edit_and_commit(manager, root)
+    manager.close()
+    folder = manager.get_notebook_folder_path(root)
+    assert os.path.exists(os.path.join(folder, "notes.index.json"))
+    assert git_status(folder) == []  # index files and .notebook.lock are ignored
+    tracked = subprocess.run(["git", "ls-files"], cwd=folder, capture_output=True, text=True).stdout
+    assert ".gitignore" in tracked.split()
+
+
+def open_transaction(manager, commit_batch, monkeypatch):
+    root = manager.create_notebook("Batch")
+    monkeypatch.setattr(manager.get_git_manager(root), "commit_batch", commit_batch)
+    with manager.transaction(root):
+        edit_and_commit(manager, root)
+
+
+@pytest.mark.parametrize("outcome", [None, RuntimeError("hook rejected")])
+def test_failed_transaction_commit_is_reported(manager, monkeypatch, capsys, outcome):
+    def commit_batch(*args):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    open_transaction(manager, commit_batch, monkeypatch)
+    warning = capsys.readouterr().out
+    assert "Could not commit changes to 'Batch'" in warning
+    assert str(outcome or "git failed") in warning
+
+
+def test_transaction_lock_timeout_propagates(manager, monkeypatch):
+    def commit_batch(*args):
+        raise LockTimeout("busy")
+
+    with pytest.raises(LockTimeout):
+        open_transaction(manager, commit_batch, monkeypatch)
+
+
+def test_fast_commits_keep_the_index_in_step(manager, monkeypatch):
+    monkeypatch.setattr(git_manager_module, "FAST_COMMITS", True)
+    root = manager.create_notebook("Indexed")
+    folder = manager.get_notebook_folder_path(root)
+    for _ in range(2):
+        edit_and_commit(manager, root)
+        assert git_status(folder) == []  # before close(): no reversed staged changes
+
+
+def test_index_left_behind_by_a_crash_is_resynced(workdir, monkeypatch):
+    monkeypatch.setattr(git_manager_module, "FAST_COMMITS", True)
+    crashed = NoteManager(verbose=False)
+    root = crashed.create_notebook("Crashed")
+    git_manager = crashed.get_git_manager(root)
+    monkeypatch.setattr(git_manager, "_update_index", lambda changed: None)
+    edit_and_commit(crashed, root)
+    folder = crashed.get_notebook_folder_path(root)
+    assert git_status(folder) != []
+    git_manager._close_fast_import()  # the process dies: no close()
+
+    reopened = NoteManager(verbose=False)
+    reopened.get_git_manager(reopened.notebooks[0]).init_repo()
+    assert git_status(folder) == []
+    assert not os.path.exists(os.path.join(folder, ".git", git_manager_module.STALE_INDEX_MARKER))
+    reopened.close()
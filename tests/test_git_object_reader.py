@@ -0,0 +1,42 @@
+import subprocess
+
+import pytest
+
+from git_object_reader import GitObjectReader
+
+
+@pytest.fixture
+def reader(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "notes.json").write_text('{"id": "body"}')
+    git("add", "notes.json")
+    git("commit", "-q", "-m", "first")
+    reader = GitObjectReader(str(tmp_path))
+    yield reader
+    reader.close()
+
+
+@pytest.mark.parametrize("reaped", [True, False], ids=["exited", "still-reaping"])
+def test_reader_restarts_after_its_process_is_killed(reader, reaped):
+    assert reader.read_text("HEAD", "notes.json") == '{"id": "body"}'
+    process = reader._process
+    process.kill()
+    if reaped:
+        process.wait()  # poll() sees it: a fresh process is started up front
+    # otherwise the write or read fails and the request is retried once
+
+    assert reader.read_text("HEAD", "notes.json") == '{"id": "body"}'
+    assert reader._process is not process and reader._process.poll() is None
+
+
+def test_missing_objects_keep_the_process(reader):
+    assert reader.resolve("HEAD") is not None
+    process = reader._process
+    assert reader.read_text("HEAD", "absent.json") is None
+    assert reader.read_bytes("no-such-commit", "notes.json") is None
+    assert reader.read("HEAD:notes.json\nHEAD") is None  # one name per line, never two
+    assert reader._process is process
+    assert reader.read_bytes("HEAD", "notes.json") == b'{"id": "body"}'
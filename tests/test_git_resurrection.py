@@ -0,0 +1,64 @@
+import pytest
+
+from terminal_notes_core import Note
+from git_resurrection import GitHistoryMiner
+
+
+def delete_note(manager, root, title):
+    git_manager = manager.get_git_manager(root)
+    note = Note(title, "body", created_with="internal")
+    manager.add_note(root, note)
+    manager.save_notebook(root)
+    git_manager.commit_note_creation(note.id, note.title, root.name, "internal", note.content)
+    manager.remove_note(root, note)
+    manager.save_notebook(root)
+    git_manager.commit_note_deletion(note.id, note.title, root.name, note.is_file_note)
+    return note
+
+
+@pytest.mark.parametrize("query", ["foo(", "a[", "*x", "c++", "(?P<"])
+def test_metacharacter_queries_do_not_raise(manager, query):
+    root = manager.create_notebook("Regex")
+    delete_note(manager, root, "plain title")
+    miner = GitHistoryMiner(manager)
+    try:
+        assert miner.find_deleted_items(query) == []
+    finally:
+        miner.cleanup_temp_files()
+
+
+def found_ids(manager, query):
+    miner = GitHistoryMiner(manager)
+    try:
+        return sorted(item["uuid"] for item in miner.find_deleted_items(query))
+    finally:
+        miner.cleanup_temp_files()
+
+
+def test_queries_are_regular_expressions(manager):
+    root = manager.create_notebook("Regex")
+    notes = delete_note(manager, root, "meeting notes"), delete_note(manager, root, "meeting agenda")
+    literal = delete_note(manager, root, "call foo(x)")
+    assert found_ids(manager, "meeting.*notes") == [notes[0].id]
+    assert found_ids(manager, "meeting [an]") == sorted(note.id for note in notes)
+    assert found_ids(manager, "foo(x)") == [literal.id]  # git's basic regex: parentheses are literal
+
+
+def test_batch_deletions_match_their_own_line(manager):
+    root = manager.create_notebook("Batch")
+    git_manager = manager.get_git_manager(root)
+    notes = [Note(title, "body") for title in ("alpha report", "beta report", "call foo(x)")]
+    with manager.transaction(root):
+        for note in notes:
+            manager.add_note(root, note)
+            git_manager.commit_note_creation(note.id, note.title, root.name, "internal", note.content)
+    with manager.transaction(root):
+        for note in notes:
+            manager.remove_note(root, note)
+            git_manager.commit_note_deletion(note.id, note.title, root.name)
+    alpha, beta, literal = notes
+
+    assert found_ids(manager, "alpha") == [alpha.id]
+    assert found_ids(manager, "b.ta rep") == [beta.id]
+    assert found_ids(manager, "report") == sorted([alpha.id, beta.id])
+    assert found_ids(manager, "foo(x)") == [literal.id]
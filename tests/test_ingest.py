@@ -0,0 +1,81 @@
+import os
+import glob
+import subprocess
+import tracemalloc
+
+import pytest
+
+from terminal_notes_core import NoteManager
+from notebook_importer import NotebookImporter
+from storage_engine import LazyContent
+
+FILES = 400
+BODY = 40 * 1024
+
+
+def make_tree(path):
+    for i in range(FILES):
+        folder = path / f"dir{i % 4}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"file{i}.txt").write_text(f"{i}:" + "x" * BODY)
+    return str(path)
+
+
+def ingest(manager, root, source):
+    return NotebookImporter(manager, None).ingest_directory(root, source, extensions={"txt"})
+
+
+def contents(manager):
+    return {note.title: note.content for note in manager._iter_notes(manager.notebooks[0])}
+
+
+@pytest.mark.parametrize("options", [{}, {"journal": True}], ids=["json", "journal"])
+def test_ingest_keeps_bodies_out_of_memory(workdir, tmp_path, options):
+    source = make_tree(tmp_path / "src")
+    manager = NoteManager(verbose=False, **options)
+    root = manager.create_notebook("Ingest")
+    tracemalloc.start()
+    try:
+        stats = ingest(manager, root, source)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert stats["files"] == FILES
+    corpus = FILES * BODY
+    assert peak < corpus / 2, f"peak {peak} for a {corpus} byte corpus"
+
+    folder = manager.get_notebook_folder_path(root)
+    assert not glob.glob(os.path.join(folder, ".ingest-*"))
+    notes = list(manager._iter_notes(root))
+    assert all(isinstance(note._content_ref, LazyContent) for note in notes)
+    assert {note._content_ref.path for note in notes} == {os.path.join(folder, "files.json")}
+    assert not os.path.exists(os.path.join(folder, "journal.jsonl"))
+    manager.close()
+
+
+@pytest.mark.parametrize("options", [{}, {"journal": True}, {"lazy": True}])
+def test_ingested_bodies_survive_reload(workdir, tmp_path, options):
+    source = make_tree(tmp_path / "src")
+    manager = NoteManager(verbose=False, **options)
+    root = manager.create_notebook("Ingest")
+    ingest(manager, root, source)
+    expected = contents(manager)
+    manager.close()
+    assert len(expected) == FILES and expected["file7.txt"] == "7:" + "x" * BODY
+
+    folder = manager.get_notebook_folder_path(root)
+    assert not glob.glob(os.path.join(folder, ".ingest-*"))
+    status = subprocess.run(["git", "status", "--porcelain"], cwd=folder, capture_output=True, text=True)
+    assert status.stdout == ""
+
+    reloaded = NoteManager(verbose=False)
+    assert contents(reloaded) == expected
+    reloaded.close()
+
+
+def test_reingest_adds_nothing(manager, tmp_path):
+    source = make_tree(tmp_path / "src")
+    root = manager.create_notebook("Ingest")
+    ingest(manager, root, source)
+    stats = ingest(manager, root, source)
+    assert stats["files"] == 0 and stats["existing"] == FILES
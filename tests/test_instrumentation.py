@@ -0,0 +1,54 @@
+import pytest
+
+import instrumentation
+from instrumentation import LatencyHistogram, STATS, command_span, span, timed
+from terminal_notes_core import Note
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    STATS.reset()
+    yield STATS
+    STATS.reset()
+
+
+def test_disabled_spans_are_one_shared_no_op(stats):
+    assert span("save_notebook") is span("load_notebook", ["git", "status"])
+    assert command_span([]) is span("x")  # argv is not even looked at
+
+    def func():
+        return 42
+
+    assert timed("func")(func) is func
+    with span("save_notebook"), command_span(["git", "commit"]):
+        pass
+    assert stats.summary() == {}
+
+
+@pytest.mark.skipif(instrumentation.ENABLED, reason="TERMINAL_NOTES_STATS is set")
+def test_a_save_records_nothing_with_stats_off(manager, stats):
+    root = manager.create_notebook("Quiet")
+    manager.add_note(root, Note("title", "body"))
+    manager.save_notebook(root)
+    assert stats.summary() == {}
+    assert list(stats.commands) == []
+
+
+def test_enabled_spans_record_durations_and_commands(stats, monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    for _ in range(3):
+        with command_span(["git", "commit", "-m", "x"]):
+            pass
+    summary = stats.summary()["git commit"]
+    assert summary["count"] == 3 and summary["p50"] <= summary["max"]
+    assert stats.commands[-1][0] == ["git", "commit", "-m", "x"]
+
+
+def test_percentiles_land_within_a_bucket():
+    histogram = LatencyHistogram()
+    for milliseconds in range(1, 101):
+        histogram.record(milliseconds / 1000)
+    assert 0.050 <= histogram.percentile(0.5) <= 0.050 * 1.1
+    assert 0.095 <= histogram.percentile(0.95) <= 0.1
+    assert histogram.percentile(1.0) == pytest.approx(0.1)
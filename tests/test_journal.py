@@ -0,0 +1,161 @@
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from git_manager import GitManager
+from notebook_history import historical_json
+from terminal_notes_core import Note, NoteManager
+
+
+def git(folder, *args):
+    return subprocess.run(["git", *args], cwd=folder, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def journaled(workdir):
+    manager = NoteManager(verbose=False, journal=True)
+    root = manager.create_notebook("Logged")
+    sub = manager.create_subnotebook(root, "Sub")
+    folder = manager.get_notebook_folder_path(root)
+    return manager, root, sub, folder
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_edits_append_records_and_replay_on_load(journaled):
+    manager, root, sub, folder = journaled
+    notes_json = read(os.path.join(folder, "notes.json"))
+    note = Note("draft", "first")
+    manager.add_note(sub, note)
+    manager.save_notebook(root)
+    manager.rename_note(note, "final")
+    manager.update_note_content(note, "second")
+    gone = Note("gone", "bye")
+    manager.add_note(root, gone)
+    manager.remove_note(root, gone)
+    manager.save_notebook(root)
+
+    assert read(os.path.join(folder, "notes.json")) == notes_json  # JSON untouched
+    reloaded = NoteManager(verbose=False, journal=True)
+    found, parent = reloaded.find_note_by_id(None, note.id)
+    assert (found.title, found.content, parent.name) == ("final", "second", "Sub")
+    assert reloaded.find_note_by_id(None, gone.id) == (None, None)
+
+
+def test_torn_tail_is_ignored_and_cut_before_the_next_append(journaled):
+    manager, root, sub, folder = journaled
+    note = Note("kept", "body")
+    manager.add_note(sub, note)
+    manager.save_notebook(root)
+    with open(os.path.join(folder, "journal.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"op":"remove_no')  # crash mid-append
+
+    second = NoteManager(verbose=False, journal=True)
+    assert second.find_note_by_id(None, note.id)[0].content == "body"
+    second_sub = second.find_notebook_by_id(sub.id)
+    second.remove_subnotebook(second.open_notebook(root.id), second_sub)
+    second.save_notebook(second.open_notebook(root.id))
+
+    third = NoteManager(verbose=False, journal=True)
+    assert third.find_notebook_by_id(sub.id) is None
+    assert third.find_note_by_id(None, note.id) == (None, None)
+
+
+def test_commits_carry_the_tail_and_history_replays_it(journaled):
+    manager, root, sub, folder = journaled
+    note = Note("logged", "in the journal")
+    manager.add_note(sub, note)
+    manager.save_notebook(root)
+    manager.get_git_manager(root).commit_note_creation(note.id, note.title, root.name, "internal", note.content)
+
+    assert os.path.exists(os.path.join(folder, "journal.jsonl"))  # no compaction per commit
+    assert "journal.jsonl" in git(folder, "ls-tree", "--name-only", "HEAD").split()
+    assert note.id not in read(os.path.join(folder, "notes.json"))
+    assert historical_json(folder, "HEAD", "notes.json")[note.id] == "in the journal"
+    structure = historical_json(folder, "HEAD", "structure.json")
+    assert [n["title"] for n in structure["subnotebooks"][0]["notes"]] == ["logged"]
+
+
+def test_size_threshold_compacts_and_commits(journaled):
+    manager, root, sub, folder = journaled
+    manager._get_journal(folder).max_bytes = 1
+    note = Note("big enough", "x" * 100)
+    manager.add_note(sub, note)
+    manager.save_notebook(root)  # compacts on a background thread
+
+    deadline = time.monotonic() + 10
+    while os.path.exists(os.path.join(folder, "journal.jsonl")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    while "COMPACTED" not in git(folder, "log", "-1", "--format=%s") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert note.id in read(os.path.join(folder, "notes.json"))
+    assert git(folder, "log", "-1", "--format=%s").startswith("COMPACTED NOTEBOOK: Logged")
+
+
+def test_close_compacts_and_leaves_the_repo_clean(journaled):
+    manager, root, sub, folder = journaled
+    note = Note("last", "edit")
+    manager.add_note(sub, note)
+    manager.save_notebook(root)
+    manager.get_git_manager(root).commit_note_creation(note.id, note.title, root.name, "internal", note.content)
+    manager.close()
+
+    assert not os.path.exists(os.path.join(folder, "journal.jsonl"))
+    assert note.id in read(os.path.join(folder, "notes.json"))
+    assert git(folder, "status", "--porcelain") == ""
+    assert "journal.jsonl" not in git(folder, "ls-tree", "--name-only", "HEAD").split()
+
+
+def test_close_waits_for_a_background_compaction(journaled, monkeypatch):
+    manager, root, sub, folder = journaled
+    manager._get_journal(folder).max_bytes = 1
+    commit_journal_compaction = GitManager.commit_journal_compaction
+
+    def slow(self, *args):
+        time.sleep(0.3)  # the thread has cleared the journal but not committed yet
+        return commit_journal_compaction(self, *args)
+
+    monkeypatch.setattr(GitManager, "commit_journal_compaction", slow)
+    manager.add_note(sub, Note("racing", "x" * 100))
+    manager.save_notebook(root)  # starts a compaction thread
+    deadline = time.monotonic() + 10
+    while os.path.exists(os.path.join(folder, "journal.jsonl")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.close()  # nothing left to fold here, but the thread's commit is pending
+
+    assert git(folder, "status", "--porcelain") == ""
+    assert git(folder, "log", "-1", "--format=%s").startswith("COMPACTED NOTEBOOK: Logged")
+
+
+def test_edit_during_background_compaction_is_kept(journaled, monkeypatch):
+    manager, root, sub, folder = journaled
+    manager._get_journal(folder).max_bytes = 1
+    writing = threading.Event()
+    write_notebook_parts = NoteManager._write_notebook_parts
+
+    def slow(self, *args, **kwargs):
+        result = write_notebook_parts(self, *args, **kwargs)
+        if threading.current_thread() is not threading.main_thread():
+            writing.set()
+            time.sleep(0.3)  # serialized, pending records not dropped yet: the UI edits now
+        return result
+
+    monkeypatch.setattr(NoteManager, "_write_notebook_parts", slow)
+    manager.add_note(sub, Note("first", "x" * 100))
+    manager.save_notebook(root)  # starts a compaction thread
+    assert writing.wait(10)
+    late = Note("late", "added while compacting")
+    manager.add_note(sub, late)
+    manager.save_notebook(root)
+    manager.close()
+    os.remove(manager.snapshot.path)  # parse the folder, not the startup snapshot
+
+    reloaded = NoteManager(verbose=False, journal=True)
+    assert reloaded.find_note_by_id(None, late.id)[0].content == "added while compacting"
+    assert git(folder, "status", "--porcelain") == ""
@@ -0,0 +1,35 @@
+import os
+
+from storage_engine import LazyContent
+from terminal_notes_core import Note, NoteManager
+
+
+def lazy_notes(manager):
+    return [note for root in manager.notebooks for note in manager._iter_notes(root)]
+
+
+def test_eagerly_saved_notebooks_load_lazily(workdir):
+    eager = NoteManager(verbose=False)
+    root = eager.create_notebook("Saved eagerly")
+    bodies = {"plain.txt": "plain body", "unicode.md": "ünïcødé \"quoted\"\n{}"}
+    for title, body in bodies.items():
+        note = Note(title, body)
+        note.file_extension = title.rsplit(".", 1)[1]
+        eager.add_note(root, note)
+    eager.add_note(root, Note("text note", "kept in notes.json"))
+    eager.save_notebook(root)
+    folder = eager.get_notebook_folder_path(root)
+    eager.close()
+    assert not os.path.exists(os.path.join(folder, "files.index.json"))
+    bodies["text note"] = "kept in notes.json"
+
+    for _ in range(2):
+        if os.path.exists(eager.snapshot.path):
+            os.remove(eager.snapshot.path)  # load from the folder, not the startup snapshot
+        lazy = NoteManager(verbose=False, lazy=True)
+        notes = lazy_notes(lazy)
+        assert all(isinstance(note._content_ref, LazyContent) for note in notes)
+        assert {note.title: note.content for note in notes} == bodies
+        assert lazy.notebooks[0].get_total_content_bytes() == sum(len(body.encode()) for body in bodies.values())
+        lazy.close()
+        assert os.path.exists(os.path.join(folder, "files.index.json"))
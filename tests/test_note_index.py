@@ -0,0 +1,50 @@
+from terminal_notes_core import Note, Notebook
+
+
+def test_lookups_follow_rename_delete_and_move(manager):
+    root = manager.create_notebook("Indexed")
+    first = manager.create_subnotebook(root, "First")
+    second = manager.create_subnotebook(root, "Second")
+    note = Note("title", "body")
+    manager.add_note(first, note)
+
+    manager.rename_note(note, "renamed")
+    assert manager.find_note_by_id(None, note.id) == (note, first)
+    assert manager.find_note_by_id(None, note.id)[0].title == "renamed"
+
+    manager.remove_note(first, note)  # moving a note is remove + add
+    manager.add_note(second, note)
+    assert manager.find_note_by_id(None, note.id) == (note, second)
+
+    manager.remove_note(second, note)
+    assert manager.find_note_by_id(None, note.id) == (None, None)
+
+
+def test_moving_a_subnotebook_reindexes_everything_below_it(manager):
+    root = manager.create_notebook("Indexed")
+    source, target = manager.create_subnotebook(root, "Source"), manager.create_subnotebook(root, "Target")
+    moved = Notebook("Moved", parent_id=source.id)
+    manager.add_subnotebook(source, moved)
+    note = Note("deep", "body")
+    manager.add_note(moved, note)
+
+    manager.remove_subnotebook(source, moved)
+    assert manager.find_notebook_by_id(moved.id) is None
+    assert manager.find_note_by_id(None, note.id) == (None, None)
+
+    moved.parent_id = target.id
+    manager.add_subnotebook(target, moved)
+    assert manager.get_notebook_hierarchy(moved.id) == [root, target, moved]
+    assert manager.find_note_by_id(None, note.id) == (note, moved)
+
+
+def test_deleting_a_root_notebook_drops_its_tree(manager):
+    root = manager.create_notebook("Doomed")
+    sub = manager.create_subnotebook(root, "Inner")
+    note = Note("gone", "body")
+    manager.add_note(sub, note)
+
+    manager.delete_notebook(root)
+    assert manager.find_notebook_by_id(root.id) is None
+    assert manager.find_notebook_by_id(sub.id) is None
+    assert manager.find_note_by_id(None, note.id) == (None, None)
@@ -0,0 +1,38 @@
+import json
+
+from notebook_registry import NotebookRegistry
+from storage_engine import AtomicWriter
+
+
+def registry(tmp_path):
+    return NotebookRegistry(str(tmp_path / "notebooks_registry.json"), AtomicWriter())
+
+
+def test_external_writes_are_picked_up_and_unchanged_files_are_not_reparsed(tmp_path, monkeypatch):
+    ours, theirs = registry(tmp_path), registry(tmp_path)
+    ours.add("a", {"name": "Alpha", "path": str(tmp_path / "Alpha")})
+    assert ours.has_name("Alpha")
+
+    reloads = []
+    reload = ours._reload
+    monkeypatch.setattr(ours, "_reload", lambda stamp: reloads.append(stamp) or reload(stamp))
+    for _ in range(3):
+        assert ours.get("a")["name"] == "Alpha"
+    assert reloads == []  # stamp unchanged: the resident copy answers
+
+    theirs.add("b", {"name": "Beta", "path": str(tmp_path / "Beta")})  # another instance
+    assert ours.has_name("Beta")
+    assert ours.id_for_path(str(tmp_path / "Beta")) == "b"
+    assert len(reloads) == 1
+
+    with open(ours.path, "w") as f:  # edited by hand
+        json.dump({"notebooks": {"a": {"name": "Renamed", "path": str(tmp_path / "Alpha")}}}, f)
+    assert not ours.has_name("Alpha") and ours.has_name("Renamed")
+    assert ours.get("b") is None
+
+
+def test_corrupted_registry_is_replaced(tmp_path):
+    path = tmp_path / "notebooks_registry.json"
+    path.write_text("{truncated")
+    assert registry(tmp_path).data == {"notebooks": {}}
+    assert json.loads(path.read_text()) == {"notebooks": {}}
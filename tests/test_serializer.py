@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from terminal_notes_core import Note, NoteManager
+
+
+def read(manager, notebook, name):
+    with open(os.path.join(manager.get_notebook_folder_path(notebook), name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.skipif("TERMINAL_NOTES_JSON" in os.environ, reason="the environment picks the format")
+def test_default_format_stays_pretty(workdir):
+    manager = NoteManager(verbose=False)
+    root = manager.create_notebook("Indented")
+    manager.add_note(root, Note("title", "body"))
+    manager.save_notebook(root)
+
+    assert read(manager, root, "structure.json").startswith('{\n  "')
+    assert manager.serializer.format == "pretty"
+    manager.close()
+
+
+def test_compact_folders_still_load_in_pretty_mode(workdir):
+    compact = NoteManager(verbose=False, json_format="compact")
+    root = compact.create_notebook("Packed")
+    note = Note("title", "body")
+    compact.add_note(root, note)
+    compact.save_notebook(root)
+    assert "\n  " not in read(compact, root, "structure.json")
+    compact.close()
+
+    pretty = NoteManager(verbose=False, json_format="pretty")
+    assert pretty.find_note_by_id(None, note.id)[0].content == "body"
+    pretty.close()
+
+
+def test_pretty_files_match_the_stdlib_indent_format(workdir):
+    manager = NoteManager(verbose=False, json_format="pretty")
+    root = manager.create_notebook("Ünïcødé")
+    manager.add_note(root, Note("café", "naïve body — “quoted” ✓\n"))
+    manager.add_note(root, Note("ascii", "plain"))
+    manager.save_notebook(root)
+
+    for name in ("structure.json", "notes.json"):
+        text = read(manager, root, name)
+        assert text.isascii()
+        assert text == json.dumps(json.loads(text), indent=2)  # what older versions wrote
+    manager.close()
@@ -0,0 +1,36 @@
+import pytest
+
+from blob_store import LAYOUT_BLOBS
+from terminal_notes_core import Note, NoteManager
+
+BODY = "a body the snapshot must not copy " * 50
+
+
+def snapshot_bytes(manager):
+    with open(manager.snapshot.path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("layout", [None, LAYOUT_BLOBS], ids=["json", "blobs"])
+def test_eager_snapshot_holds_structure_not_bodies(workdir, monkeypatch, layout):
+    manager = NoteManager(verbose=False)
+    root = manager.create_notebook("Snapshotted")
+    sub = manager.create_subnotebook(root, "Inner")
+    note, file_note = Note("text", BODY), Note("file.py", "print('file body')\n" * 20)
+    file_note.file_extension = "py"
+    manager.add_note(root, note)
+    manager.add_note(sub, file_note)
+    manager.save_notebook(root)
+    if layout:
+        assert manager.migrate_notebook_storage(root, layout)
+    manager.close()
+
+    data = snapshot_bytes(manager)
+    assert BODY.encode() not in data and b"file body" not in data
+
+    monkeypatch.setattr(NoteManager, "load_notebook_from_path", lambda self, path: pytest.fail("JSON parsed"))
+    reloaded = NoteManager(verbose=False)
+    assert reloaded.find_note_by_id(None, note.id)[0].content == BODY
+    assert reloaded.find_note_by_id(None, file_note.id)[0].content == file_note.content
+    assert all(n.is_content_loaded for n in reloaded._iter_notes(reloaded.notebooks[0]))
+    reloaded.close()
@@ -0,0 +1,45 @@
+import os
+import time
+
+from terminal_notes_core import Note, NoteManager
+
+
+def make_notebooks(names):
+    manager = NoteManager(verbose=False)
+    for name in names:
+        root = manager.create_notebook(name)
+        manager.add_note(root, Note(f"{name} note", "body"))
+        manager.save_notebook(root)
+    manager.close()
+    os.remove(manager.snapshot.path)  # every folder is parsed again
+    return manager
+
+
+def test_parallel_load_keeps_registry_order(workdir, monkeypatch):
+    names = [f"Notebook {i}" for i in range(6)]
+    make_notebooks(names)
+    load = NoteManager.load_notebook_from_path
+
+    def slow_first(self, folder_path):
+        # The first registered notebooks finish last
+        time.sleep(0.05 * (len(names) - int(folder_path.rstrip("/")[-1])))
+        return load(self, folder_path)
+
+    monkeypatch.setattr(NoteManager, "load_notebook_from_path", slow_first)
+    manager = NoteManager(verbose=False)
+    assert [notebook.name for notebook in manager.notebooks] == names
+    manager.close()
+
+
+def test_a_broken_notebook_is_reported_and_the_rest_load(workdir, capsys):
+    first = make_notebooks(["Good", "Broken", "Also good"])
+    folder = first.get_notebook_folder_path(next(nb for nb in first.notebooks if nb.name == "Broken"))
+    with open(os.path.join(folder, "structure.json"), "w") as f:
+        f.write("{not json")
+    capsys.readouterr()
+
+    manager = NoteManager(verbose=False)
+    assert [notebook.name for notebook in manager.notebooks] == ["Good", "Also good"]
+    assert "Could not load notebook 'Broken'" in capsys.readouterr().out
+    assert "Broken" in [info["name"] for info in manager.registry.data["notebooks"].values()]
+    manager.close()
@@ -0,0 +1,55 @@
+from terminal_notes_core import Note, Notebook
+
+
+def recount(notebook):
+    """(notes, file notes, subnotebooks, content bytes) counted from scratch"""
+    totals = [
+        len(notebook.notes),
+        sum(note.is_file_note for note in notebook.notes),
+        len(notebook.subnotebooks),
+        sum(len(note.content.encode("utf-8")) for note in notebook.notes),
+    ]
+    for sub_nb in notebook.subnotebooks:
+        for i, value in enumerate(recount(sub_nb)):
+            totals[i] += value
+    return totals
+
+
+def assert_totals(manager, root):
+    stack = [root]
+    while stack:
+        notebook = stack.pop()
+        assert notebook._totals is not None  # kept up to date, not dropped
+        assert list(notebook.subtree_totals()) == recount(notebook), notebook.name
+        stack.extend(notebook.subnotebooks)
+
+
+def test_totals_follow_add_edit_remove_and_move(manager):
+    root = manager.create_notebook("Counted")
+    left, right = manager.create_subnotebook(root, "Left"), manager.create_subnotebook(root, "Right")
+    root.subtree_totals()  # cached from here on
+
+    note, file_note = Note("text", "ünïcødé body"), Note("code.py", "print()\n")
+    file_note.file_extension = "py"
+    manager.add_note(left, note)
+    manager.add_note(left, file_note)
+    deep = Notebook("Deep", parent_id=left.id)
+    manager.add_subnotebook(left, deep)
+    manager.add_note(deep, Note("deep", "x" * 100))
+    assert_totals(manager, root)
+
+    manager.update_note_content(note, "shorter")
+    assert_totals(manager, root)
+
+    manager.remove_note(left, file_note)  # move a note
+    manager.add_note(right, file_note)
+    manager.remove_subnotebook(left, deep)  # move a subtree
+    deep.parent_id = right.id
+    manager.add_subnotebook(right, deep)
+    assert_totals(manager, root)
+    assert root.subtree_totals()[:3] == [3, 1, 3]
+
+    manager.remove_note(left, note)
+    manager.remove_subnotebook(root, right)
+    assert_totals(manager, root)
+    assert root.subtree_totals() == [0, 0, 1, 0]